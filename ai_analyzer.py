@@ -1,36 +1,478 @@
 import openai
 import json
 import re
-from typing import Dict, Optional, List
+import threading
+import time
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 
 from config import Config
+from analysis_cache import AnalysisCache
+from ats_extractors import find_extractor
+from keyword_matcher import has_job_keywords
+from near_duplicates import NearDuplicateIndex
+from rate_limiter import RateLimiter
+from text_compaction import compact_email_body, count_tokens
+
+
+SYSTEM_PROMPT = """You are an AI assistant specialized in analyzing job-related emails. 
+                        Your task is to extract structured information from emails about job applications, 
+                        interviews, rejections, offers, and other job-related communications.
+                        
+                        Always respond with valid JSON format. Be precise and extract only information 
+                        that is clearly stated in the email."""
+
+
+# Tier name for the local keyword heuristics in the model cascade
+HEURISTIC_TIER = 'heuristic'
+
+# Confidence of a heuristic answer for an email with no job signal at all; other
+# heuristic answers keep the fallback's low confidence and go to the next tier
+HEURISTIC_NO_SIGNAL_CONFIDENCE = 0.9
+
+# Completion budget per analysis request
+MAX_COMPLETION_TOKENS = 1000
+
+# Completion budget per email when several emails share one request
+BATCH_COMPLETION_TOKENS_PER_EMAIL = 400
+
+# JSON fields requested from the model for every email
+ANALYSIS_SCHEMA = """        {
+            "is_job_related": boolean,
+            "email_type": "application_confirmation|interview_invitation|interview_reminder|status_update|rejection|offer|assessment|other",
+            "company_name": "string or null",
+            "position_title": "string or null",
+            "job_status": "Applied|Under Review|Phone Screen|Technical Interview|Final Interview|Offer|Rejected|Withdrawn|null",
+            "contact_person": "string or null",
+            "contact_email": "string or null",
+            "interview_date": "YYYY-MM-DD HH:MM or null",
+            "interview_type": "phone|video|in_person|technical|behavioral|null",
+            "salary_range": "string or null",
+            "location": "string or null",
+            "job_url": "string or null",
+            "next_steps": "string or null",
+            "job_id": "string or null",
+            "key_information": "string summary of important details",
+            "confidence_score": float between 0 and 1
+        }
+"""
+
+ANALYSIS_GUIDELINES = """        Guidelines:
+        - Set is_job_related to true only if this is clearly about a job application or career opportunity
+        - Extract company name from sender domain or email content
+        - Identify position title from subject line or email body
+        - Determine current status based on email content
+        - Extract any mentioned dates, deadlines, or next steps
+        - Provide a confidence score based on how certain you are about the extracted information
+        - If information is not clearly stated, use null
+"""
+
+# JSON schema for one analysis; mirrors ANALYSIS_SCHEMA and the fields _validate_and_clean_analysis expects
+ANALYSIS_JSON_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'is_job_related': {'type': 'boolean'},
+        'email_type': {
+            'type': 'string',
+            'enum': ['application_confirmation', 'interview_invitation', 'interview_reminder',
+                     'status_update', 'rejection', 'offer', 'assessment', 'other']
+        },
+        'company_name': {'type': ['string', 'null']},
+        'position_title': {'type': ['string', 'null']},
+        'job_status': {
+            'type': ['string', 'null'],
+            'enum': ['Applied', 'Under Review', 'Phone Screen', 'Technical Interview',
+                     'Final Interview', 'Offer', 'Rejected', 'Withdrawn', None]
+        },
+        'contact_person': {'type': ['string', 'null']},
+        'contact_email': {'type': ['string', 'null']},
+        'interview_date': {'type': ['string', 'null'], 'description': 'YYYY-MM-DD HH:MM'},
+        'interview_type': {
+            'type': ['string', 'null'],
+            'enum': ['phone', 'video', 'in_person', 'technical', 'behavioral', None]
+        },
+        'salary_range': {'type': ['string', 'null']},
+        'location': {'type': ['string', 'null']},
+        'job_url': {'type': ['string', 'null']},
+        'next_steps': {'type': ['string', 'null']},
+        'job_id': {'type': ['string', 'null']},
+        'key_information': {'type': 'string'},
+        'confidence_score': {'type': 'number', 'minimum': 0, 'maximum': 1}
+    },
+    'required': ['is_job_related', 'email_type', 'company_name', 'position_title', 'job_status',
+                 'contact_person', 'contact_email', 'key_information', 'confidence_score']
+}
+
+# Function definitions the model is forced to call, so responses are arguments JSON instead of prose
+ANALYSIS_FUNCTION = {
+    'name': 'record_email_analysis',
+    'description': 'Record the structured analysis of one email',
+    'parameters': ANALYSIS_JSON_SCHEMA
+}
+
+BATCH_ANALYSIS_FUNCTION = {
+    'name': 'record_email_analyses',
+    'description': 'Record the structured analysis of each email, one entry per email in order',
+    'parameters': {
+        'type': 'object',
+        'properties': {
+            'analyses': {
+                'type': 'array',
+                'items': dict(
+                    ANALYSIS_JSON_SCHEMA,
+                    properties=dict(ANALYSIS_JSON_SCHEMA['properties'], index={'type': 'integer'}),
+                    required=['index'] + ANALYSIS_JSON_SCHEMA['required']
+                )
+            }
+        },
+        'required': ['analyses']
+    }
+}
+
+
+def repair_json(text: str) -> str:
+    """Best-effort fix-up of near-valid JSON from a model response.
+
+    Strips code fences and surrounding prose, drops trailing commas, converts
+    Python literals and closes brackets left open by a truncated response.
+    """
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip(), flags=re.IGNORECASE)
+
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    # Walk the text to find where the top-level value ends, or what is left open
+    stack = []
+    in_string = False
+    escaped = False
+    end = None
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                end = i + 1
+                break
+
+    if end is not None:
+        text = text[:end]
+    else:
+        if in_string:
+            text += '"'
+        text = re.sub(r'[,:]\s*$', '', text.rstrip())
+        text += ''.join(reversed(stack))
+
+    text = re.sub(r',\s*([}\]])', r'\1', text)
+    text = re.sub(r'([:\[,]\s*)True(?=\s*[,}\]])', r'\1true', text)
+    text = re.sub(r'([:\[,]\s*)False(?=\s*[,}\]])', r'\1false', text)
+    text = re.sub(r'([:\[,]\s*)None(?=\s*[,}\]])', r'\1null', text)
+    return text
 
 
 class JobEmailAnalyzer:
     """AI-powered email analyzer for job application tracking"""
     
+    # Bump whenever the prompt or post-processing changes in a way that should
+    # cause already-processed emails to be analyzed again
+    PROMPT_VERSION = '4'
+    
     def __init__(self):
         openai.api_key = Config.OPENAI_API_KEY
         self.client = openai.OpenAI()
+        self.model = Config.OPENAI_MODEL
+        # Cascade tiers, cheapest first; HEURISTIC_TIER is the local keyword path
+        self.tiers = Config.ANALYSIS_MODEL_TIERS or [self.model]
+        self.cache = AnalysisCache() if Config.ANALYSIS_CACHE_ENABLED else None
+        self.duplicates = NearDuplicateIndex() if Config.NEAR_DUPLICATE_ENABLED else None
+        # Shared by every worker thread so concurrent analysis stays within API limits
+        self.rate_limiter = RateLimiter()
+        self._stats_lock = threading.Lock()
+        self.usage_stats = self._empty_usage_stats()
+        self.tier_stats = {}
+        # Per-platform counts of emails seen and fully handled by template extractors
+        self.extractor_stats = {}
     
     def analyze_email(self, email_data: Dict) -> Dict:
         """Analyze an email to extract job application information"""
+        return self.analyze_emails_batch([email_data])[0]
+    
+    def plan_batches(self, emails: List[Dict]) -> List[List[Dict]]:
+        """Group emails, in order, into batches that fit the batch input token budget"""
+        batches = []
+        current = []
+        # The shared instructions are paid once per request
+        instruction_tokens = self.estimate_tokens(SYSTEM_PROMPT + self._create_batch_analysis_prompt([]))
+        current_tokens = instruction_tokens
+        
+        for email_data in emails:
+            tokens = self.estimate_tokens(self._create_batch_email_section(len(current), email_data))
+            if current and (current_tokens + tokens > Config.ANALYSIS_BATCH_TOKEN_BUDGET
+                            or len(current) >= Config.ANALYSIS_BATCH_MAX_EMAILS):
+                batches.append(current)
+                current = []
+                current_tokens = instruction_tokens
+            current.append(email_data)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def analyze_emails_batch(self, emails: List[Dict]) -> List[Dict]:
+        """Analyze several emails, sharing model requests; returns analyses in input order.
+
+        Emails from a known ATS template are parsed locally, and cached emails and
+        near-duplicates of recent emails reuse earlier answers. The rest go through
+        the tier cascade, where each model tier analyzes its emails in one batched
+        request. Every analysis records the tier that answered it in 'analysis_tier';
+        fallback answers and answers whose escalation failed are also flagged 'degraded'.
+        """
+        analyses = [None] * len(emails)
+        cache_keys = [None] * len(emails)
+        pending = []
+        
+        for i, email_data in enumerate(emails):
+            extracted = self._extract_from_template(email_data)
+            if extracted is not None:
+                analyses[i] = self._finalize_analysis(extracted, email_data)
+                continue
+            
+            # Identical prompt content, model cascade and prompt version -> reuse the earlier answer
+            cache_keys[i] = self._cache_key(self._create_analysis_prompt(email_data))
+            cached = self.cache.get(cache_keys[i]) if self.cache else None
+            if cached is not None:
+                cached['analysis_tier'] = 'cache'
+                analyses[i] = self._finalize_analysis(cached, email_data)
+                continue
+            
+            # Near-identical digests and reminders reuse the analysis of a recent look-alike
+            duplicate = self.duplicates.find(email_data) if self.duplicates else None
+            if duplicate is not None:
+                duplicate['analysis_tier'] = 'near_duplicate'
+                analyses[i] = self._finalize_analysis(duplicate, email_data)
+            else:
+                pending.append(i)
+        
+        if pending:
+            answers, final = self._run_cascade([emails[i] for i in pending])
+            
+            for i, answer, is_final in zip(pending, answers, final):
+                if answer is None:
+                    analyses[i] = self._create_fallback_analysis(emails[i])
+                    analyses[i]['analysis_tier'] = 'fallback'
+                    analyses[i]['degraded'] = True
+                    continue
+                # A lower-tier answer kept because escalation failed is used once, not reused
+                if is_final and self.cache:
+                    self.cache.put(cache_keys[i], answer)
+                if is_final and self.duplicates:
+                    self.duplicates.add(emails[i], answer)
+                analyses[i] = self._finalize_analysis(answer, emails[i])
+                if not is_final:
+                    analyses[i]['degraded'] = True
+        
+        return analyses
+    
+    def _extract_from_template(self, email_data: Dict) -> Optional[Dict]:
+        """Analysis parsed by the sender's ATS extractor, or None if the email needs the model"""
+        if not Config.ATS_EXTRACTORS_ENABLED:
+            return None
+        
+        extractor = find_extractor(email_data)
+        if extractor is None:
+            return None
         
-        prompt = self._create_analysis_prompt(email_data)
+        analysis = extractor.extract(email_data)
+        with self._stats_lock:
+            stats = self.extractor_stats.setdefault(extractor.name, {'seen': 0, 'handled': 0})
+            stats['seen'] += 1
+            if analysis is not None:
+                stats['handled'] += 1
+        
+        if analysis is not None:
+            analysis = self._validate_and_clean_analysis(analysis)
+            analysis['analysis_tier'] = f'ats:{extractor.name}'
+        return analysis
+    
+    def _run_cascade(self, emails: List[Dict]) -> Tuple[List[Optional[Dict]], List[bool]]:
+        """Run emails through the tiers, escalating low-confidence and high-stakes answers.
+
+        Returns the best answer per email (None if every tier failed) and whether
+        each answer is final: accepted without escalation or given by the last
+        tier. An answer from an earlier tier is kept, not final, if a later tier fails.
+        """
+        answers = [None] * len(emails)
+        final = [False] * len(emails)
+        remaining = list(range(len(emails)))
+        
+        for level, tier in enumerate(self.tiers):
+            is_last_tier = level == len(self.tiers) - 1
+            
+            started = time.perf_counter()
+            tier_answers = self._run_tier(tier, [emails[i] for i in remaining])
+            elapsed = time.perf_counter() - started
+            
+            still_remaining = []
+            failed = 0
+            escalated = 0
+            for i, answer in zip(remaining, tier_answers):
+                if answer is None:
+                    failed += 1
+                    still_remaining.append(i)
+                    continue
+                answer['analysis_tier'] = tier
+                answers[i] = answer
+                if not is_last_tier and self._needs_escalation(answer, emails[i]):
+                    escalated += 1
+                    still_remaining.append(i)
+                else:
+                    final[i] = True
+            
+            self._record_tier(tier, len(remaining), failed, escalated, elapsed)
+            remaining = still_remaining
+            if not remaining:
+                break
+        
+        return answers, final
+    
+    def _run_tier(self, tier: str, emails: List[Dict]) -> List[Optional[Dict]]:
+        """Get cleaned (not yet finalized) analyses from one tier, None where it failed"""
+        if tier == HEURISTIC_TIER:
+            return [self._heuristic_analysis(email_data) for email_data in emails]
+        
+        if len(emails) == 1:
+            return [self._request_analysis(self._create_analysis_prompt(emails[0]), tier)]
+        
+        items = self._request_batch_analysis(emails, tier)
+        answers = []
+        for position, email_data in enumerate(emails):
+            item = items.get(position)
+            if isinstance(item, dict) and 'is_job_related' in item:
+                item.pop('index', None)
+                answers.append(self._validate_and_clean_analysis(item))
+            else:
+                # Missing or malformed element: analyze just this email on its own
+                answers.append(self._request_analysis(self._create_analysis_prompt(email_data), tier))
+        return answers
+    
+    def _needs_escalation(self, answer: Dict, email_data: Dict) -> bool:
+        """True if a lower tier's answer should be checked by the next tier"""
+        final = self._finalize_analysis(dict(answer), email_data)
+        if final.get('confidence_score', 0) < Config.ANALYSIS_ESCALATION_CONFIDENCE:
+            return True
+        return bool(final.get('is_job_related')) and final.get('email_type') in Config.ANALYSIS_HIGH_STAKES_TYPES
+    
+    def _record_tier(self, tier: str, attempted: int, failed: int, escalated: int, elapsed: float):
+        """Accumulate per-tier counters and latency"""
+        with self._stats_lock:
+            stats = self.tier_stats.setdefault(tier, {
+                'emails': 0, 'answered': 0, 'escalated': 0, 'failed': 0, 'latency_seconds': 0.0
+            })
+            stats['emails'] += attempted
+            stats['answered'] += attempted - failed - escalated
+            stats['escalated'] += escalated
+            stats['failed'] += failed
+            stats['latency_seconds'] += elapsed
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Cache key for a single-email prompt under the current model cascade and prompt version"""
+        return AnalysisCache.make_key(','.join(self.tiers), self.PROMPT_VERSION, SYSTEM_PROMPT, prompt)
+    
+    def _request_analysis(self, prompt: str, model: Optional[str] = None) -> Optional[Dict]:
+        """Send the prompt to the model; return the cleaned analysis or None on failure"""
+        result = self._call_model(prompt, MAX_COMPLETION_TOKENS, model, ANALYSIS_FUNCTION)
+        if result is None:
+            return None
+        
+        analysis = self._parse_model_json(result)
+        if not isinstance(analysis, dict):
+            return None
+        return self._validate_and_clean_analysis(analysis)
+    
+    def _request_batch_analysis(self, emails: List[Dict], model: Optional[str] = None) -> Dict[int, Dict]:
+        """Send one prompt for several emails; return the parsed elements keyed by email position"""
+        prompt = self._create_batch_analysis_prompt(emails)
+        result = self._call_model(prompt, BATCH_COMPLETION_TOKENS_PER_EMAIL * len(emails), model,
+                                  BATCH_ANALYSIS_FUNCTION)
+        if result is None:
+            return {}
+        
+        parsed = self._parse_model_json(result)
+        if parsed is None:
+            return {}
+        
+        if isinstance(parsed, dict):
+            # Some responses wrap the array in an object
+            parsed = next((value for value in parsed.values() if isinstance(value, list)), [])
+        if not isinstance(parsed, list):
+            return {}
+        
+        items = {}
+        for position, item in enumerate(parsed):
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index')
+            if isinstance(index, int) and 0 <= index < len(emails):
+                items.setdefault(index, item)
+            elif len(parsed) == len(emails):
+                # No usable index; rely on the order only when the counts line up
+                items.setdefault(position, item)
+        return items
+    
+    def _parse_model_json(self, text: str):
+        """Parse a model response as JSON, repairing near-valid output; None if it can't be salvaged"""
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        
+        try:
+            parsed = json.loads(repair_json(text))
+        except json.JSONDecodeError:
+            with self._stats_lock:
+                self.usage_stats['parse_failures'] += 1
+            print(f"Failed to parse AI response as JSON: {text[:200]}")
+            return None
+        
+        with self._stats_lock:
+            self.usage_stats['repaired_responses'] += 1
+        return parsed
+    
+    def _call_model(self, prompt: str, max_tokens: int, model: Optional[str] = None,
+                    function: Optional[Dict] = None) -> Optional[str]:
+        """Send a prompt under the rate limiter; return the response text or None on failure.
+
+        With `function` and structured output enabled, the model is forced to call
+        that function and the returned text is the call's JSON arguments.
+        """
+        request_args = {}
+        estimated_tokens = self.estimate_tokens(SYSTEM_PROMPT + prompt) + max_tokens
+        if function and Config.ANALYSIS_STRUCTURED_OUTPUT:
+            request_args['tools'] = [{'type': 'function', 'function': function}]
+            request_args['tool_choice'] = {'type': 'function', 'function': {'name': function['name']}}
+            estimated_tokens += self.estimate_tokens(json.dumps(function))
+        debited_tokens = self.rate_limiter.acquire(estimated_tokens)
         
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4",
+                model=model or self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": """You are an AI assistant specialized in analyzing job-related emails. 
-                        Your task is to extract structured information from emails about job applications, 
-                        interviews, rejections, offers, and other job-related communications.
-                        
-                        Always respond with valid JSON format. Be precise and extract only information 
-                        that is clearly stated in the email."""
+                        "content": SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -38,44 +480,76 @@ class JobEmailAnalyzer:
                     }
                 ],
                 temperature=0.1,
-                max_tokens=1000
+                max_tokens=max_tokens,
+                **request_args
             )
             
-            result = response.choices[0].message.content.strip()
+            usage = getattr(response, 'usage', None)
+            with self._stats_lock:
+                self.usage_stats['requests'] += 1
+                if usage is not None:
+                    self.usage_stats['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+                    self.usage_stats['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+            if usage is not None:
+                self.rate_limiter.record_usage(debited_tokens, getattr(usage, 'total_tokens', 0))
             
-            # Parse the JSON response
-            try:
-                    analysis = json.loads(result)
-                    analysis = self._validate_and_clean_analysis(analysis)
-
-                    # Apply a confidence threshold to avoid misclassifying social notifications
-                    try:
-                        threshold = float(Config.JOB_CONFIDENCE_THRESHOLD)
-                    except Exception:
-                        threshold = 0.6
-
-                    if analysis.get('is_job_related') and analysis.get('confidence_score', 0) < threshold:
-                        # downgrade to non-job-related to avoid noisy false positives
-                        analysis['is_job_related'] = False
-
-                    # Apply content-based post-processing heuristics (detect offers, interview cues, etc.)
-                    analysis = self.postprocess_based_on_content(analysis, email_data)
-
-                    return analysis
-            except json.JSONDecodeError:
-                print(f"Failed to parse AI response as JSON: {result}")
-                return self._create_fallback_analysis(email_data)
+            message = response.choices[0].message
+            tool_calls = getattr(message, 'tool_calls', None)
+            if tool_calls:
+                with self._stats_lock:
+                    self.usage_stats['structured_responses'] += 1
+                return tool_calls[0].function.arguments
+            return (message.content or '').strip()
                 
         except Exception as e:
             print(f"Error calling OpenAI API: {e}")
-            return self._create_fallback_analysis(email_data)
+            return None
+    
+    def reset_usage_stats(self):
+        """Reset request, token, per-tier and extractor counters (e.g. at the start of a run)"""
+        with self._stats_lock:
+            self.usage_stats = self._empty_usage_stats()
+            self.tier_stats = {}
+            self.extractor_stats = {}
+    
+    @staticmethod
+    def _empty_usage_stats() -> Dict:
+        """Fresh request, token and response-parsing counters"""
+        return {
+            'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+            'structured_responses': 0, 'repaired_responses': 0, 'parse_failures': 0
+        }
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Token count for rate limiting and batch planning"""
+        return count_tokens(text)
+    
+    def _finalize_analysis(self, analysis: Dict, email_data: Dict) -> Dict:
+        """Apply the confidence threshold and content heuristics to a model analysis"""
+        # Apply a confidence threshold to avoid misclassifying social notifications
+        try:
+            threshold = float(Config.JOB_CONFIDENCE_THRESHOLD)
+        except Exception:
+            threshold = 0.6
+
+        if analysis.get('is_job_related') and analysis.get('confidence_score', 0) < threshold:
+            # downgrade to non-job-related to avoid noisy false positives
+            analysis['is_job_related'] = False
+        
+        # Fall back to the id found by the pre-analysis extraction stage
+        if not analysis.get('job_id') and email_data.get('job_id'):
+            analysis['job_id'] = email_data['job_id']
+
+        # Apply content-based post-processing heuristics (detect offers, interview cues, etc.)
+        return self.postprocess_based_on_content(analysis, email_data)
     
     def _create_analysis_prompt(self, email_data: Dict) -> str:
         """Create a detailed prompt for email analysis"""
         
         subject = email_data.get('subject', '')
         sender = email_data.get('sender', '')
-        body = email_data.get('body', '')
+        body = self._prompt_body(email_data)
         date = email_data.get('date', '')
         
         prompt = f"""
@@ -87,41 +561,51 @@ class JobEmailAnalyzer:
         Date: {date}
         
         EMAIL BODY:
-        {body[:2000]}  # Limit body to first 2000 characters
+        {body}
         
         Please extract the following information and return it as a JSON object:
         
-        {{
-            "is_job_related": boolean,
-            "email_type": "application_confirmation|interview_invitation|interview_reminder|status_update|rejection|offer|assessment|other",
-            "company_name": "string or null",
-            "position_title": "string or null",
-            "job_status": "Applied|Under Review|Phone Screen|Technical Interview|Final Interview|Offer|Rejected|Withdrawn|null",
-            "contact_person": "string or null",
-            "contact_email": "string or null",
-            "interview_date": "YYYY-MM-DD HH:MM or null",
-            "interview_type": "phone|video|in_person|technical|behavioral|null",
-            "salary_range": "string or null",
-            "location": "string or null",
-            "job_url": "string or null",
-            "next_steps": "string or null",
-            "job_id": "string or null",
-            "key_information": "string summary of important details",
-            "confidence_score": float between 0 and 1
-        }}
+{ANALYSIS_SCHEMA}        
+{ANALYSIS_GUIDELINES}        """
         
-        Guidelines:
-        - Set is_job_related to true only if this is clearly about a job application or career opportunity
-        - Extract company name from sender domain or email content
-        - Identify position title from subject line or email body
-        - Determine current status based on email content
-        - Extract any mentioned dates, deadlines, or next steps
-        - Provide a confidence score based on how certain you are about the extracted information
-        - If information is not clearly stated, use null
+        return prompt
+    
+    def _create_batch_analysis_prompt(self, emails: List[Dict]) -> str:
+        """Create one prompt covering several emails; the instructions are sent only once"""
+        
+        sections = [self._create_batch_email_section(index, email_data)
+                    for index, email_data in enumerate(emails)]
+        
+        prompt = f"""
+        Analyze each of the following {len(emails)} emails independently and extract structured information.
+        {''.join(sections)}
+        Return a JSON array with exactly one object per email, in the same order. Each object must
+        include an "index" field with the email number, plus these fields:
+        
+{ANALYSIS_SCHEMA}        
+{ANALYSIS_GUIDELINES}        - Respond with the JSON array only
         """
         
         return prompt
     
+    def _create_batch_email_section(self, index: int, email_data: Dict) -> str:
+        """Format one email for a batched prompt"""
+        return f"""
+        === EMAIL {index} ===
+        Subject: {email_data.get('subject', '')}
+        From: {email_data.get('sender', '')}
+        Date: {email_data.get('date', '')}
+        
+        {self._prompt_body(email_data)}
+"""
+    
+    @staticmethod
+    def _prompt_body(email_data: Dict) -> str:
+        """Email body as sent to the model; thread updates are already compacted to their own budget"""
+        if email_data.get('is_thread_update'):
+            return email_data.get('body', '')
+        return compact_email_body(email_data.get('body', ''), Config.ANALYSIS_BODY_TOKEN_BUDGET)
+    
     def _validate_and_clean_analysis(self, analysis: Dict) -> Dict:
         """Validate and clean the AI analysis results"""
         
@@ -206,16 +690,31 @@ class JobEmailAnalyzer:
 
         return analysis
     
+    def _heuristic_analysis(self, email_data: Dict) -> Dict:
+        """Keyword analysis for the heuristic tier.
+
+        Only an email with neither job keywords nor a recruiting-platform sender is
+        answered confidently (not job-related); anything with a job signal needs a
+        model to extract company, position and status, so it keeps the fallback's
+        low confidence and escalates.
+        """
+        analysis = self._create_fallback_analysis(email_data)
+        if analysis['is_job_related']:
+            return analysis
+        
+        sender = email_data.get('sender', '').lower()
+        domain = sender.split('@')[-1].split('>')[0].strip() if '@' in sender else ''
+        if not any(domain == d or domain.endswith('.' + d) for d in Config.COMPANY_DOMAINS):
+            analysis['confidence_score'] = HEURISTIC_NO_SIGNAL_CONFIDENCE
+        return analysis
+    
     def _create_fallback_analysis(self, email_data: Dict) -> Dict:
         """Create a basic analysis when AI fails"""
         
-        subject = email_data.get('subject', '').lower()
         sender = email_data.get('sender', '').lower()
-        body = email_data.get('body', '').lower()
         
         # Basic keyword detection
-        is_job_related = any(keyword in subject or keyword in body 
-                           for keyword in Config.JOB_EMAIL_KEYWORDS)
+        is_job_related = has_job_keywords(email_data)
         
         # Try to extract company from sender domain
         company_name = None
@@ -242,36 +741,6 @@ class JobEmailAnalyzer:
             'key_information': f"Email from {sender} with subject: {email_data.get('subject', '')}",
             'confidence_score': 0.3
         }
-        """Heuristic to extract job or requisition IDs from text."""
-        import re
-
-        if not text:
-            return None
-
-        # Common patterns: Job ID: 12345, Requisition #: 6789, Req ID 9876
-        patterns = [
-            r'job\s*id\s*[:#\-]?\s*(\w+)',
-            r'requisition\s*(?:number|#|no\.?|id)\s*[:#\-]?\s*(\w+)',
-            r'req\s*#?\s*[:#\-]?\s*(\w+)',
-            r'position\s*id\s*[:#\-]?\s*(\w+)',
-            r'ref\s*[:#\-]?\s*(\w+)'
-        ]
-
-        for pat in patterns:
-            m = re.search(pat, text, re.IGNORECASE)
-            if m:
-                return m.group(1)
-
-        # Try to extract IDs from job URLs (e.g., /jobs/12345 or id=12345)
-        m = re.search(r'/jobs?/([0-9]+)', text)
-        if m:
-            return m.group(1)
-
-        m = re.search(r'id=([0-9]+)', text)
-        if m:
-            return m.group(1)
-
-        return None
     
     def extract_company_from_email(self, email_data: Dict) -> Optional[str]:
         """Extract company name from email sender or content"""
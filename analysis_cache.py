@@ -0,0 +1,122 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config import Config
+
+
+class AnalysisCache:
+    """Persistent SQLite cache of LLM email analyses keyed by prompt content hash.
+
+    Keys cover the model name, prompt version and the exact prompt text, so any
+    change to the email, the instructions or the model misses the cache. Entries
+    expire after `ttl_seconds` and the least recently used ones are evicted once
+    the cache holds more than `max_entries`.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None):
+        self.db_path = db_path or Config.ANALYSIS_CACHE_FILE
+        self.max_entries = max_entries if max_entries is not None else Config.ANALYSIS_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.ANALYSIS_CACHE_TTL_DAYS * 86400
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the cache table if it doesn't exist"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analyses (
+                    cache_key TEXT PRIMARY KEY,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_last_accessed ON analyses (last_accessed)")
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, *prompt_parts: str) -> str:
+        """Build a cache key from the model, prompt version and prompt text"""
+        digest = hashlib.sha256()
+        for part in (model, prompt_version) + prompt_parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """Return a cached analysis, or None on a miss or expired entry"""
+        now = time.time()
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT analysis, created_at FROM analyses WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds):
+                self.stats['misses'] += 1
+                return None
+
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE analyses SET last_accessed = ? WHERE cache_key = ?",
+                    (now, cache_key)
+                )
+            self.stats['hits'] += 1
+
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, analysis: Dict):
+        """Store an analysis and apply the TTL and size limits"""
+        now = time.time()
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO analyses (cache_key, analysis, created_at, last_accessed)
+                VALUES (?, ?, ?, ?)
+                """,
+                (cache_key, json.dumps(analysis), now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones beyond max_entries"""
+        evicted = 0
+
+        if self.ttl_seconds > 0:
+            evicted += self.conn.execute(
+                "DELETE FROM analyses WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            ).rowcount
+
+        if self.max_entries > 0:
+            count = self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            if count > self.max_entries:
+                evicted += self.conn.execute(
+                    """
+                    DELETE FROM analyses WHERE cache_key IN (
+                        SELECT cache_key FROM analyses ORDER BY last_accessed ASC LIMIT ?
+                    )
+                    """,
+                    (count - self.max_entries,)
+                ).rowcount
+
+        self.stats['evictions'] += evicted
+
+    def reset_stats(self):
+        """Reset hit/miss/eviction counters (e.g. at the start of a run)"""
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.conn.close()
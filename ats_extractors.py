@@ -0,0 +1,189 @@
+import re
+from typing import Dict, List, Optional
+
+
+# Confidence reported for analyses parsed straight from a known template
+TEMPLATE_CONFIDENCE = 0.95
+
+# Email types an extractor may settle on its own, with the status they imply.
+# Interviews, assessments and offers carry details a template rarely captures, so
+# those always go to the model.
+TEMPLATE_EMAIL_STATUSES = {
+    'application_confirmation': 'Applied',
+    'rejection': 'Rejected'
+}
+
+REJECTION_PATTERN = re.compile(
+    r'unfortunately|not (?:to )?(?:be )?mov(?:e|ing) forward|will not be (?:moving|proceeding)|'
+    r'decided to (?:pursue|proceed with|move forward with) other candidates|'
+    r'no longer (?:under consideration|being considered)|position has been filled',
+    re.IGNORECASE
+)
+
+CONFIRMATION_PATTERN = re.compile(
+    r'(?:received|receipt of) your application|thank you for (?:applying|your application)|'
+    r'thanks for applying|application (?:has been |was )?(?:received|submitted)',
+    re.IGNORECASE
+)
+
+# Cues that the email needs more than a template parse
+NEEDS_MODEL_PATTERN = re.compile(
+    r'invite you to|schedule (?:a|an|your) (?:call|chat|interview|time)|your availability|'
+    r'assessment|coding challenge|take-home|offer letter|pleased to offer|would like to offer',
+    re.IGNORECASE
+)
+
+# Phrasings shared by most ATS templates; company names must start with a capital
+SHARED_PATTERNS = [re.compile(pattern, re.MULTILINE) for pattern in (
+    r'(?i:(?:applying|applied|application) (?:to|for|with)) (?P<company>[A-Z][\w&\'. -]{1,60}?)'
+    r'(?:[!.,]|\s*$| (?i:for|-) )',
+    r'(?i:(?:received|submitted) your application for|you applied for|application for|applying for)'
+    r'(?i: the)? (?P<position>[^\n.!?,()]{2,80}?)'
+    r'(?: (?i:position|role|opening|job))?(?: (?i:at|with) (?P<company>[A-Z][\w&\'. -]{1,60}?))?'
+    r'(?:[!.,(]|\s*$|\s+(?i:and|has|was|we)\b)',
+    r'(?i:the) (?P<position>[^\n.!?,()]{2,80}?) (?i:position|role|opening) (?i:at|with) '
+    r'(?P<company>[A-Z][\w&\'. -]{1,60}?)(?:[!.,]|\s*$| (?i:and|has|was|we)\b)',
+)]
+
+# Sender display names that name the platform rather than the employer
+PLATFORM_SENDER_NAMES = re.compile(
+    r'^(?:greenhouse|lever|workday|smartrecruiters|icims|taleo|oracle|no-?reply|do not reply|notifications?)$',
+    re.IGNORECASE
+)
+
+SENDER_NAME_SUFFIX = re.compile(
+    r'\s*(?:-\s*)?(?:hiring team|recruiting(?: team)?|recruitment|talent acquisition(?: team)?|'
+    r'talent team|careers?|jobs|people team|hr)\s*$',
+    re.IGNORECASE
+)
+
+POSITION_NOISE = re.compile(r'^(?:the|a|an|our|this|your)\s+', re.IGNORECASE)
+
+
+class AtsExtractor:
+    """Deterministic parser for one applicant tracking system's notification templates.
+
+    Each extractor claims the sender domains of its platform and adds
+    template-specific patterns (URL formats, requisition ids) to the shared
+    phrasings. extract() returns an analysis only when the company, position
+    and email type are all unambiguous; anything else goes to the model.
+    """
+
+    def __init__(self, name: str, domains: List[str], patterns: List[str]):
+        self.name = name
+        self.domains = domains
+        self.patterns = [re.compile(pattern, re.MULTILINE) for pattern in patterns]
+
+    def handles_domain(self, domain: str) -> bool:
+        """True if mail from `domain` comes from this platform"""
+        return any(domain == d or domain.endswith('.' + d) for d in self.domains)
+
+    def extract(self, email_data: Dict) -> Optional[Dict]:
+        """Parse the email into an analysis, or None if the template isn't recognized"""
+        subject = email_data.get('subject') or ''
+        body = (email_data.get('body') or '')[:3000]
+        text = f'{subject}\n{body}'
+
+        if NEEDS_MODEL_PATTERN.search(text):
+            return None
+
+        if REJECTION_PATTERN.search(text):
+            email_type = 'rejection'
+        elif CONFIRMATION_PATTERN.search(text):
+            email_type = 'application_confirmation'
+        else:
+            return None
+
+        fields = {}
+        for pattern in self.patterns + SHARED_PATTERNS:
+            for source in (subject, body):
+                match = pattern.search(source)
+                if not match:
+                    continue
+                for field, value in match.groupdict().items():
+                    if value and field not in fields:
+                        fields[field] = value.strip(' -')
+
+        company = sender_company_name(email_data.get('sender') or '') or fields.get('company')
+        if not company and fields.get('company_slug'):
+            company = fields['company_slug'].replace('-', ' ').replace('_', ' ').title()
+        position = POSITION_NOISE.sub('', fields.get('position') or '').strip() or None
+
+        if not company or not position:
+            return None
+
+        sender = email_data.get('sender') or ''
+        return {
+            'is_job_related': True,
+            'email_type': email_type,
+            'company_name': company,
+            'position_title': position,
+            'job_status': TEMPLATE_EMAIL_STATUSES[email_type],
+            'contact_person': None,
+            'contact_email': None,
+            'interview_date': None,
+            'interview_type': None,
+            'salary_range': None,
+            'location': None,
+            'job_url': fields.get('job_url'),
+            'next_steps': None,
+            'job_id': fields.get('job_id'),
+            'key_information': f"{email_type.replace('_', ' ').capitalize()} from {self.name} ({sender})",
+            'confidence_score': TEMPLATE_CONFIDENCE
+        }
+
+
+def sender_company_name(sender: str) -> Optional[str]:
+    """Employer name from a sender display name like 'Acme Hiring Team <no-reply@...>'"""
+    name = sender.split('<')[0].strip().strip('"\'').strip()
+    if not name or '@' in name:
+        return None
+    name = re.sub(r'\s+(?:via|through)\s+\w+$', '', name, flags=re.IGNORECASE)
+    name = SENDER_NAME_SUFFIX.sub('', name).strip()
+    if not name or PLATFORM_SENDER_NAMES.match(name):
+        return None
+    return name
+
+
+def sender_domain(sender: str) -> str:
+    """Lowercase domain of an email sender"""
+    if '@' not in sender:
+        return ''
+    return sender.split('@')[-1].split('>')[0].strip().lower()
+
+
+ATS_EXTRACTORS = [
+    AtsExtractor('greenhouse', ['greenhouse.io', 'greenhouse-mail.io'], [
+        r'(?P<job_url>https?://(?:boards|job-boards)\.greenhouse\.io/(?P<company_slug>[\w-]+)/jobs/(?P<job_id>\d+))',
+    ]),
+    AtsExtractor('lever', ['lever.co'], [
+        r'(?P<job_url>https?://jobs\.lever\.co/(?P<company_slug>[\w-]+)/(?P<job_id>[0-9a-f]{8}-[0-9a-f-]{27}))',
+    ]),
+    AtsExtractor('workday', ['workday.com', 'myworkday.com'], [
+        r'(?P<job_url>https?://[\w.-]+\.myworkdayjobs\.com/\S+?_(?P<job_id>(?:JR|R|REQ)[-_]?\d{4,}))',
+        r'(?i:job requisition(?: id)?|requisition(?: id| number)?)\s*[:#]?\s*(?P<job_id>(?:JR|R|REQ)[-_]?\d{4,})',
+        r'\((?P<job_id>(?:JR|R|REQ)[-_]?\d{4,})\)',
+    ]),
+    AtsExtractor('smartrecruiters', ['smartrecruiters.com'], [
+        r'(?P<job_url>https?://jobs\.smartrecruiters\.com/(?P<company_slug>[\w-]+)/(?P<job_id>\d{6,}))',
+    ]),
+    AtsExtractor('icims', ['icims.com'], [
+        r'(?P<job_url>https?://careers-(?P<company_slug>[\w-]+)\.icims\.com/jobs/(?P<job_id>\d+))',
+        r'(?i:job id)\s*[:#]?\s*(?P<job_id>\d{4}-\d{3,})',
+    ]),
+    AtsExtractor('taleo', ['taleo.net'], [
+        r'(?i:job number|requisition (?:number|id))\s*[:#]?\s*(?P<job_id>[\w-]{3,})',
+        r'(?P<job_url>https?://(?P<company_slug>[\w-]+)\.taleo\.net/\S+?job=(?P<job_id>\w+))',
+    ]),
+]
+
+
+def find_extractor(email_data: Dict) -> Optional[AtsExtractor]:
+    """The registered extractor for the email's sender domain, if any"""
+    domain = sender_domain(email_data.get('sender') or '')
+    if not domain:
+        return None
+    for extractor in ATS_EXTRACTORS:
+        if extractor.handles_domain(domain):
+            return extractor
+    return None
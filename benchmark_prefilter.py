@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: compiled keyword prefilter vs. the previous per-keyword substring loops.
+
+Usage: python benchmark_prefilter.py [--iterations N]
+"""
+
+import argparse
+import random
+import timeit
+
+from config import Config
+from keyword_matcher import KeywordMatcher
+
+
+def make_legacy_check(keywords, domains):
+    """The prefilter as it was: lowercase everything, one substring scan per keyword"""
+    def check(email_data):
+        subject = email_data.get('subject', '').lower()
+        sender = email_data.get('sender', '').lower()
+        body = email_data.get('body', '').lower()
+
+        for keyword in keywords:
+            if keyword in subject or keyword in body:
+                return True
+
+        for domain in domains:
+            if domain in sender:
+                return True
+
+        return False
+    return check
+
+
+def make_compiled_check(keywords, domains):
+    """The same decision made with compiled matchers, as in GmailClient.is_job_related_email"""
+    job_keywords = KeywordMatcher({k: Config.JOB_KEYWORD_WEIGHTS.get(k, 1.0) for k in keywords})
+
+    def check(email_data):
+        hits = job_keywords.find(email_data.get('subject', ''), email_data.get('body', ''),
+                                 stop_at=Config.JOB_KEYWORD_MIN_SCORE)
+        if sum(hits.values()) >= Config.JOB_KEYWORD_MIN_SCORE:
+            return True
+        sender = email_data.get('sender', '').lower()
+        sender_domain = sender.split('@')[-1].split('>')[0].strip()
+        return any(sender_domain == d or sender_domain.endswith('.' + d) for d in domains)
+    return check, job_keywords
+
+
+def make_emails(count, seed=3):
+    """Synthetic mix of short notifications and large HTML newsletters"""
+    rng = random.Random(seed)
+    filler = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+              'incididunt ut labore et dolore magna aliqua weekly updates').split()
+    emails = []
+    for i in range(count):
+        words = [rng.choice(filler) for _ in range(rng.choice([60, 400, 15000]))]
+        if i % 4 == 0:
+            words.insert(rng.randrange(len(words)), 'interview')
+        elif i % 4 == 1:
+            # Substring false positives for the old check: 'hr' in 'through', 'role' in 'payroll'
+            words.insert(rng.randrange(len(words)), 'through the payroll')
+        body = ' '.join(words)
+        if len(words) > 1000:
+            body = f'<html><body><table><tr><td>{body}</td></tr></table></body></html>'
+        emails.append({
+            'subject': 'Weekly digest' if i % 4 else 'Interview availability',
+            'sender': 'news@example.com' if i % 5 else 'no-reply@hire.lever.co',
+            'body': body
+        })
+    return emails
+
+
+def run(emails, iterations, keywords, domains):
+    """Time both implementations over the emails; return the compiled keyword matcher"""
+    legacy_check = make_legacy_check(keywords, domains)
+    compiled_check, job_keywords = make_compiled_check(keywords, domains)
+
+    for name, check in (('legacy substring loops', legacy_check), ('compiled matcher', compiled_check)):
+        seconds = timeit.timeit(lambda: [check(e) for e in emails], number=iterations)
+        passed = sum(bool(check(e)) for e in emails)
+        per_email = seconds / (iterations * len(emails)) * 1e6
+        print(f"{name:>24}: {per_email:9.1f} us/email, {passed} emails passed")
+
+    return legacy_check, compiled_check, job_keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the email prefilter')
+    parser.add_argument('--iterations', type=int, default=20, help='Passes over the sample emails')
+    parser.add_argument('--emails', type=int, default=200, help='Number of synthetic emails')
+    parser.add_argument('--extra-keywords', type=int, default=100,
+                        help='Synthetic keywords added for the scaling run')
+    args = parser.parse_args()
+
+    emails = make_emails(args.emails)
+    total_bytes = sum(len(e['body']) for e in emails)
+    print(f"{len(emails)} emails, {total_bytes / 1024:.0f} KB of body text, {args.iterations} iterations")
+
+    keywords = Config.JOB_EMAIL_KEYWORDS
+    print(f"\n{len(keywords)} keywords, {len(Config.COMPANY_DOMAINS)} domains (current configuration)")
+    legacy_check, compiled_check, job_keywords = run(emails, args.iterations, keywords, Config.COMPANY_DOMAINS)
+
+    # Where the two disagree, show which keywords the compiled matcher saw
+    disagreements = [e for e in emails if legacy_check(e) != bool(compiled_check(e))]
+    print(f"Decisions that differ: {len(disagreements)}")
+    for email_data in disagreements[:3]:
+        hits = job_keywords.find(email_data['subject'], email_data['body'])
+        print(f"  {email_data['subject']!r} from {email_data['sender']}: keyword hits {hits}")
+
+    if args.extra_keywords:
+        keywords = keywords + [f'keyword{i}' for i in range(args.extra_keywords)]
+        print(f"\n{len(keywords)} keywords (scaling run)")
+        run(emails, args.iterations, keywords, Config.COMPANY_DOMAINS)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,16 +19,113 @@ class Config:
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
+
+    # Model cascade, cheapest first (e.g. "heuristic,gpt-4o-mini,gpt-4"). Answers below
+    # the escalation confidence, or of a high-stakes type, go to the next tier.
+    ANALYSIS_MODEL_TIERS = [t.strip() for t in os.getenv('ANALYSIS_MODEL_TIERS', '').split(',') if t.strip()]
+    ANALYSIS_ESCALATION_CONFIDENCE = float(os.getenv('ANALYSIS_ESCALATION_CONFIDENCE', 0.8))
+    ANALYSIS_HIGH_STAKES_TYPES = [
+        t.strip() for t in os.getenv(
+            'ANALYSIS_HIGH_STAKES_TYPES', 'offer,rejection,interview_invitation,interview_reminder'
+        ).split(',') if t.strip()
+    ]
+
+    # Persistent cache of model analyses keyed by a hash of prompt, model and prompt version
+    ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true'
+    ANALYSIS_CACHE_FILE = os.getenv('ANALYSIS_CACHE_FILE', 'analysis_cache.db')
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 5000))
+    ANALYSIS_CACHE_TTL_DAYS = int(os.getenv('ANALYSIS_CACHE_TTL_DAYS', 30))
+
+    # Concurrent analysis: worker threads plus shared request/token budgets (0 = unlimited)
+    ANALYSIS_CONCURRENCY = max(1, int(os.getenv('ANALYSIS_CONCURRENCY', 4)))
+    OPENAI_REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_REQUESTS_PER_MINUTE', 500))
+    OPENAI_TOKENS_PER_MINUTE = int(os.getenv('OPENAI_TOKENS_PER_MINUTE', 10000))
+
+    # Parse known ATS templates (Greenhouse, Lever, Workday, ...) locally instead of calling the model
+    ATS_EXTRACTORS_ENABLED = os.getenv('ATS_EXTRACTORS_ENABLED', 'true').lower() == 'true'
+
+    # Force replies through a function call whose arguments follow the analysis JSON schema
+    ANALYSIS_STRUCTURED_OUTPUT = os.getenv('ANALYSIS_STRUCTURED_OUTPUT', 'true').lower() == 'true'
+
+    # Batched analysis: pack several emails into one request, bounded by an input token budget
+    ANALYSIS_BATCHING = os.getenv('ANALYSIS_BATCHING', 'true').lower() == 'true'
+    ANALYSIS_BATCH_MAX_EMAILS = max(1, int(os.getenv('ANALYSIS_BATCH_MAX_EMAILS', 8)))
+    ANALYSIS_BATCH_TOKEN_BUDGET = int(os.getenv('ANALYSIS_BATCH_TOKEN_BUDGET', 4000))
+    # Email bodies are cleaned (HTML, quoted replies, footers) and cut to this many tokens
+    ANALYSIS_BODY_TOKEN_BUDGET = int(os.getenv('ANALYSIS_BODY_TOKEN_BUDGET', 500))
     
     # Google Sheets Configuration
     SPREADSHEET_ID = os.getenv('GOOGLE_SPREADSHEET_ID')
     WORKSHEET_NAME = os.getenv('WORKSHEET_NAME', 'Job Applications')
+    # Per-email history goes to an append-only events tab; the Notes cell keeps only the latest summary
+    EVENTS_LOG = os.getenv('EVENTS_LOG', 'true').lower() == 'true'
+    EVENTS_WORKSHEET_NAME = os.getenv('EVENTS_WORKSHEET_NAME', 'Events')
     
     # Email Processing Configuration
     # Scheduling: prefer seconds if specified, otherwise use minutes
     CHECK_INTERVAL_SECONDS = int(os.getenv('CHECK_INTERVAL_SECONDS', 0))
     CHECK_INTERVAL_MINUTES = int(os.getenv('CHECK_INTERVAL_MINUTES', 30))
-    MAX_EMAILS_PER_CHECK = int(os.getenv('MAX_EMAILS_PER_CHECK', 50))
+    # Upper bound on emails listed per check; 0 means follow every result page
+    MAX_EMAILS_PER_CHECK = int(os.getenv('MAX_EMAILS_PER_CHECK', 0))
+    # Message ids requested per messages.list page (Gmail allows up to 500)
+    GMAIL_PAGE_SIZE = max(1, min(500, int(os.getenv('GMAIL_PAGE_SIZE', 100))))
+
+    # Incremental sync: scheduled checks use the Gmail History API and only fetch
+    # messages added since the last stored historyId (the "watermark")
+    GMAIL_INCREMENTAL_SYNC = os.getenv('GMAIL_INCREMENTAL_SYNC', 'true').lower() == 'true'
+    GMAIL_HISTORY_FILE = os.getenv('GMAIL_HISTORY_FILE', 'gmail_history.json')
+
+    # Batched message fetches: messages.get calls per HTTP batch request (the API
+    # allows 100, Gmail recommends 50 to stay under per-user rate limits)
+    GMAIL_BATCH_SIZE = max(1, min(100, int(os.getenv('GMAIL_BATCH_SIZE', 50))))
+    GMAIL_BATCH_MAX_RETRIES = int(os.getenv('GMAIL_BATCH_MAX_RETRIES', 3))
+
+    # Two-phase fetch: download headers + snippet first and fetch full bodies only
+    # for messages that pass the job-related prefilter
+    GMAIL_TWO_PHASE_FETCH = os.getenv('GMAIL_TWO_PHASE_FETCH', 'true').lower() == 'true'
+
+    # Processing pipeline: stages are connected by queues holding at most this many
+    # chunks of GMAIL_BATCH_SIZE emails; fetches run on their own worker threads
+    PIPELINE_QUEUE_SIZE = max(1, int(os.getenv('PIPELINE_QUEUE_SIZE', 4)))
+    PIPELINE_FETCH_WORKERS = max(1, int(os.getenv('PIPELINE_FETCH_WORKERS', 2)))
+
+    # Thread-level analysis: fetch each Gmail thread once with threads.get and analyze
+    # only the messages added since its last analysis, plus a summary of the earlier state
+    THREAD_ANALYSIS = os.getenv('THREAD_ANALYSIS', 'true').lower() == 'true'
+    THREAD_STATE_FILE = os.getenv('THREAD_STATE_FILE', 'thread_state.db')
+    # Token budget for the summary plus new messages sent for one thread
+    THREAD_ANALYSIS_TOKEN_BUDGET = int(os.getenv('THREAD_ANALYSIS_TOKEN_BUDGET', 1000))
+    
+    # Write-behind buffering of sheet mutations: each run flushes updates in one
+    # values.batchUpdate and new rows in one append (earlier if the buffer fills up)
+    SHEETS_WRITE_BEHIND = os.getenv('SHEETS_WRITE_BEHIND', 'true').lower() == 'true'
+    SHEETS_FLUSH_THRESHOLD = int(os.getenv('SHEETS_FLUSH_THRESHOLD', 100))
+    # Fold all changes a run makes to one application into a single row write
+    SHEETS_COALESCE_UPDATES = os.getenv('SHEETS_COALESCE_UPDATES', 'true').lower() == 'true'
+    # Before writing changed cells, re-read them and leave alone any that were edited
+    # in the sheet since it was loaded (costs one values.batchGet per write)
+    SHEETS_PROTECT_MANUAL_EDITS = os.getenv('SHEETS_PROTECT_MANUAL_EDITS', 'true').lower() == 'true'
+    
+    # Near-duplicate detection: emails whose 64-bit SimHash fingerprint is within
+    # NEAR_DUPLICATE_MAX_DISTANCE bits of a recent one from the same sender reuse its
+    # analysis; reusing a job-related analysis needs the stricter JOB_MAX_DISTANCE
+    NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'true').lower() == 'true'
+    NEAR_DUPLICATE_FILE = os.getenv('NEAR_DUPLICATE_FILE', 'near_duplicates.db')
+    NEAR_DUPLICATE_MAX_DISTANCE = max(0, min(15, int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', 10))))
+    NEAR_DUPLICATE_JOB_MAX_DISTANCE = max(0, int(os.getenv('NEAR_DUPLICATE_JOB_MAX_DISTANCE', 2)))
+    NEAR_DUPLICATE_MIN_TOKENS = int(os.getenv('NEAR_DUPLICATE_MIN_TOKENS', 30))
+    NEAR_DUPLICATE_MAX_ENTRIES = int(os.getenv('NEAR_DUPLICATE_MAX_ENTRIES', 5000))
+    NEAR_DUPLICATE_TTL_DAYS = int(os.getenv('NEAR_DUPLICATE_TTL_DAYS', 14))
+    
+    # Local SQLite ledger of already-processed Gmail message ids
+    LEDGER_DB_FILE = os.getenv('LEDGER_DB_FILE', 'processed_messages.db')
+    
+    # Local classifier gate in front of the LLM (active once a model has been trained)
+    CLASSIFIER_GATE_ENABLED = os.getenv('CLASSIFIER_GATE_ENABLED', 'true').lower() == 'true'
+    CLASSIFIER_MODEL_FILE = os.getenv('CLASSIFIER_MODEL_FILE', 'email_classifier.json')
+    # Emails scoring below this probability of being job-related skip the LLM
+    CLASSIFIER_SKIP_THRESHOLD = float(os.getenv('CLASSIFIER_SKIP_THRESHOLD', 0.1))
     
     # Job Application Tracking Configuration
     JOB_STATUSES = [
@@ -41,6 +138,8 @@ class Config:
         'Rejected',
         'Withdrawn'
     ]
+    # Statuses that close an application: reachable from any other status, never left
+    TERMINAL_JOB_STATUSES = ['Rejected', 'Withdrawn']
     
     # Email Classification Keywords
     JOB_EMAIL_KEYWORDS = [
@@ -50,8 +149,16 @@ class Config:
         'assessment', 'technical', 'coding challenge', 'next steps'
     ]
     
+    # Prefilter weights for keywords that also show up in unrelated mail (others weigh 1.0);
+    # an email passes once the distinct keywords it contains add up to JOB_KEYWORD_MIN_SCORE
+    JOB_KEYWORD_WEIGHTS = {
+        'role': 0.5, 'position': 0.5, 'career': 0.5, 'hr': 0.5,
+        'offer': 0.5, 'technical': 0.25, 'accepted': 0.25, 'declined': 0.25
+    }
+    JOB_KEYWORD_MIN_SCORE = float(os.getenv('JOB_KEYWORD_MIN_SCORE', 1.0))
+    
     COMPANY_DOMAINS = [
-        'greenhouse.io', 'lever.co', 'workday.com', 'smartrecruiters.com',
+        'greenhouse.io', 'lever.co', 'workday.com', 'myworkday.com', 'smartrecruiters.com',
         'bamboohr.com', 'jobvite.com', 'icims.com', 'taleo.net'
     ]
 
@@ -0,0 +1,148 @@
+import json
+import math
+import os
+import random
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9'+#.-]*")
+
+
+class EmailClassifier:
+    """Cheap on-box job-email classifier: hashed n-gram features with logistic regression.
+
+    Features come from the subject, sender domain and Gmail snippet (or the start of
+    the body), so the classifier scores the same text the metadata fetch provides.
+    Scoring one email takes microseconds and needs no network access.
+    """
+
+    def __init__(self, num_buckets: int = 2 ** 18):
+        self.num_buckets = num_buckets
+        self.weights = {}
+        self.bias = 0.0
+
+    def extract_features(self, email_data: Dict) -> Dict[int, float]:
+        """Map an email to hashed unigram/bigram counts, namespaced per field"""
+        sender = (email_data.get('sender') or '').lower()
+        domain = sender.split('@')[-1].split('>')[0].strip() if '@' in sender else sender
+        text = email_data.get('snippet') or (email_data.get('body') or '')[:300]
+
+        features = {}
+        for namespace, value in (('s', email_data.get('subject') or ''), ('b', text)):
+            tokens = TOKEN_PATTERN.findall(value.lower())
+            grams = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+            for gram in grams:
+                bucket = zlib.crc32(f'{namespace}:{gram}'.encode('utf-8')) % self.num_buckets
+                features[bucket] = features.get(bucket, 0.0) + 1.0
+
+        if domain:
+            bucket = zlib.crc32(f'd:{domain}'.encode('utf-8')) % self.num_buckets
+            features[bucket] = 1.0
+
+        # L2-normalize so long snippets don't dominate short subjects
+        norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+        return {k: v / norm for k, v in features.items()}
+
+    def score(self, email_data: Dict) -> float:
+        """Probability that the email is job-related"""
+        features = self.extract_features(email_data)
+        z = self.bias + sum(self.weights.get(k, 0.0) * v for k, v in features.items())
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def train(self, examples: List[Tuple[Dict, bool]], epochs: int = 15,
+              learning_rate: float = 0.5, l2: float = 1e-6, seed: int = 13):
+        """Fit the weights with SGD on (email, is_job_related) pairs"""
+        featurized = [(self.extract_features(email_data), 1.0 if label else 0.0)
+                      for email_data, label in examples]
+        positives = sum(label for _, label in featurized)
+        negatives = len(featurized) - positives
+        if not positives or not negatives:
+            raise ValueError('Training needs both job-related and unrelated examples')
+
+        # Balance classes so the usually much larger negative class doesn't swamp recall
+        class_weight = {1.0: len(featurized) / (2 * positives), 0.0: len(featurized) / (2 * negatives)}
+        rng = random.Random(seed)
+        self.weights = {}
+        self.bias = 0.0
+
+        for epoch in range(epochs):
+            rng.shuffle(featurized)
+            rate = learning_rate / (1 + epoch)
+            for features, label in featurized:
+                z = self.bias + sum(self.weights.get(k, 0.0) * v for k, v in features.items())
+                prediction = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+                gradient = (prediction - label) * class_weight[label]
+                self.bias -= rate * gradient
+                for k, v in features.items():
+                    w = self.weights.get(k, 0.0)
+                    self.weights[k] = w - rate * (gradient * v + l2 * w)
+
+    def evaluate(self, examples: List[Tuple[Dict, bool]], threshold: float) -> Dict:
+        """Report how many emails the gate would skip and how many job emails it would miss"""
+        skipped = 0
+        missed = 0
+        positives = 0
+        correct = 0
+
+        for email_data, label in examples:
+            probability = self.score(email_data)
+            if probability < threshold:
+                skipped += 1
+                if label:
+                    missed += 1
+            if label:
+                positives += 1
+            if (probability >= 0.5) == bool(label):
+                correct += 1
+
+        total = len(examples) or 1
+        return {
+            'examples': len(examples),
+            'accuracy': correct / total,
+            'llm_call_reduction': skipped / total,
+            'job_emails_missed': missed,
+            'job_email_recall': (positives - missed) / positives if positives else 1.0
+        }
+
+    def save(self, path: Optional[str] = None):
+        """Write the model to a JSON file"""
+        path = path or Config.CLASSIFIER_MODEL_FILE
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'num_buckets': self.num_buckets,
+                'bias': self.bias,
+                'weights': {str(k): v for k, v in self.weights.items() if abs(v) > 1e-6}
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional['EmailClassifier']:
+        """Load a saved model, or return None if there isn't one"""
+        path = path or Config.CLASSIFIER_MODEL_FILE
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as error:
+            print(f'Could not load email classifier, ignoring it: {error}')
+            return None
+
+        classifier = cls(num_buckets=data.get('num_buckets', 2 ** 18))
+        classifier.bias = data.get('bias', 0.0)
+        classifier.weights = {int(k): v for k, v in data.get('weights', {}).items()}
+        return classifier
+
+
+def train_test_split(examples: List, test_fraction: float = 0.2, seed: int = 7) -> Tuple[List, List]:
+    """Deterministically split examples into training and held-out sets"""
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - test_fraction))
+    return shuffled[:cut], shuffled[cut:]
@@ -1,10 +1,14 @@
 import os
+import json
 import pickle
+import time
 import base64
+import html
 import email
+import threading
 from email.utils import parsedate_to_datetime
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from email.mime.text import MIMEText
 
 from google.auth.transport.requests import Request
@@ -14,15 +18,29 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from config import Config
+from keyword_matcher import has_job_keywords
 
 
 class GmailClient:
     """Gmail API client for reading and processing emails"""
     
     def __init__(self):
-        self.service = None
+        self.credentials = None
+        self.reset_fetch_stats()
+        # The HTTP client behind a service object isn't thread-safe, so each thread builds its own
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
         self.authenticate()
-    
+
+    @property
+    def service(self):
+        """Gmail API service for the calling thread"""
+        service = getattr(self._local, 'service', None)
+        if service is None and self.credentials is not None:
+            service = build('gmail', 'v1', credentials=self.credentials)
+            self._local.service = service
+        return service
+
     def authenticate(self):
         """Authenticate with Gmail API"""
         creds = None
@@ -52,38 +70,211 @@ class GmailClient:
             with open(Config.GMAIL_TOKEN_FILE, 'wb') as token:
                 pickle.dump(creds, token)
         
-        self.service = build('gmail', 'v1', credentials=creds)
+        self.credentials = creds
+        self._local.service = build('gmail', 'v1', credentials=creds)
     
     def get_recent_emails(self, hours_back: int = 24) -> List[Dict]:
         """Get recent emails from the last specified hours"""
         try:
-            # Calculate the date for filtering
-            since_date = datetime.now() - timedelta(hours=hours_back)
-            query = f'after:{since_date.strftime("%Y/%m/%d")}'
-            
-            # Get list of messages
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=Config.MAX_EMAILS_PER_CHECK
-            ).execute()
-            
-            messages = results.get('messages', [])
-            emails = []
-            
-            for message in messages:
-                email_data = self.get_email_details(message['id'])
-                if email_data:
-                    emails.append(email_data)
+            emails = list(self.iter_messages(self.build_recent_query(hours_back), prefilter=True))
 
             # Sort emails oldest -> newest before returning so processing is chronological
-            emails = self._sort_emails_by_date_asc(emails)
+            emails = self.sort_emails_by_date_asc(emails)
             return emails
             
         except HttpError as error:
             print(f'An error occurred while fetching emails: {error}')
             return []
-    
+
+    def build_recent_query(self, hours_back: int = 24) -> str:
+        """Gmail search query for mail received in the last `hours_back` hours"""
+        since_date = datetime.now() - timedelta(hours=hours_back)
+        return f'after:{since_date.strftime("%Y/%m/%d")}'
+
+    def build_keyword_query(self, keywords: List[str], days_back: int = 7) -> str:
+        """Gmail search query for mail containing any of `keywords` in the last `days_back` days"""
+        since_date = datetime.now() - timedelta(days=days_back)
+        keyword_query = ' OR '.join([f'"{keyword}"' for keyword in keywords])
+        return f'({keyword_query}) after:{since_date.strftime("%Y/%m/%d")}'
+
+    def iter_message_id_pages(self, query: str) -> Iterator[List[str]]:
+        """Yield pages of message ids matching `query`, following nextPageToken lazily.
+
+        Pages hold up to Config.GMAIL_PAGE_SIZE ids, newest first (Gmail's order).
+        Listing stops after Config.MAX_EMAILS_PER_CHECK ids when that is non-zero.
+        """
+        page_token = None
+        listed = 0
+
+        while True:
+            page_size = Config.GMAIL_PAGE_SIZE
+            if Config.MAX_EMAILS_PER_CHECK > 0:
+                page_size = min(page_size, Config.MAX_EMAILS_PER_CHECK - listed)
+
+            request_kwargs = {'userId': 'me', 'q': query, 'maxResults': page_size}
+            if page_token:
+                request_kwargs['pageToken'] = page_token
+
+            response = self.service.users().messages().list(**request_kwargs).execute()
+            message_ids = [message['id'] for message in response.get('messages', [])]
+            listed += len(message_ids)
+
+            if message_ids:
+                yield message_ids
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+            if Config.MAX_EMAILS_PER_CHECK > 0 and listed >= Config.MAX_EMAILS_PER_CHECK:
+                print(f'Stopped listing after MAX_EMAILS_PER_CHECK={Config.MAX_EMAILS_PER_CHECK} emails; '
+                      'older matches were not fetched')
+                break
+
+    def iter_messages(self, query: str, prefilter: bool = False) -> Iterator[Dict]:
+        """Yield email dicts matching `query` as each listing page is fetched.
+
+        Only one page of messages is held at a time, so consumers can start work
+        before listing finishes and memory stays bounded for any window size.
+        Emails arrive newest page first, sorted oldest -> newest within a page.
+        With prefilter=True pages go through the two-phase candidate fetch.
+        HttpError from listing propagates to the caller.
+        """
+        self.reset_fetch_stats()
+
+        for message_ids in self.iter_message_id_pages(query):
+            if prefilter:
+                emails = self.fetch_candidate_emails(message_ids)
+            else:
+                emails = self.get_email_details_batch(message_ids)
+
+            for email_data in self.sort_emails_by_date_asc(emails):
+                yield email_data
+
+    def list_message_ids(self, query: str) -> List[str]:
+        """All message ids matching `query`, oldest first; [] if listing fails"""
+        try:
+            return self._list_message_ids_oldest_first(query)
+        except HttpError as error:
+            print(f'An error occurred while listing emails: {error}')
+            return []
+
+    def _list_message_ids_oldest_first(self, query: str) -> List[str]:
+        """Follow every listing page for `query`, then reverse Gmail's newest-first order"""
+        message_ids = [message_id for page in self.iter_message_id_pages(query) for message_id in page]
+        message_ids.reverse()
+        return message_ids
+
+    def list_new_message_ids(self, hours_back: int = 24) -> Tuple[List[str], Optional[str]]:
+        """Ids of messages added since the last sync and the historyId to save once they are processed.
+
+        Uses the Gmail History API from the watermark in Config.GMAIL_HISTORY_FILE.
+        Without a stored watermark, or when Gmail reports it as expired, this falls
+        back to listing the last `hours_back` hours. Returns ([], None) on errors.
+        """
+        start_history_id = self._load_history_id()
+
+        if start_history_id:
+            try:
+                message_ids, latest_history_id = self._list_history_message_ids(start_history_id)
+                return message_ids, latest_history_id or start_history_id
+
+            except HttpError as error:
+                if getattr(error, 'resp', None) is not None and error.resp.status == 404:
+                    print(f'History ID {start_history_id} has expired, running a full resync')
+                else:
+                    print(f'An error occurred while fetching mailbox history: {error}')
+                    return [], None
+
+        try:
+            # Read the profile before listing so mail arriving mid-sync is picked up next time
+            profile = self.service.users().getProfile(userId='me').execute()
+            history_id = profile.get('historyId')
+        except HttpError as error:
+            print(f'An error occurred while reading the mailbox profile: {error}')
+            history_id = None
+
+        try:
+            return self._list_message_ids_oldest_first(self.build_recent_query(hours_back)), history_id
+        except HttpError as error:
+            print(f'An error occurred while fetching emails: {error}')
+            return [], None
+
+    def get_new_emails(self, hours_back: int = 24) -> List[Dict]:
+        """Get emails added since the last sync (see list_new_message_ids) and advance the watermark"""
+        message_ids, history_id = self.list_new_message_ids(hours_back)
+
+        self.reset_fetch_stats()
+        emails = self.fetch_candidate_emails(message_ids)
+
+        if history_id:
+            self.save_history_id(history_id)
+        return self.sort_emails_by_date_asc(emails)
+
+    def _list_history_message_ids(self, start_history_id: str) -> Tuple[List[str], Optional[str]]:
+        """Return ids of messages added since `start_history_id` and the latest historyId.
+
+        Raises HttpError so callers can detect an expired watermark (HTTP 404).
+        """
+        message_ids = []
+        seen = set()
+        latest_history_id = None
+        page_token = None
+
+        while True:
+            request_kwargs = {
+                'userId': 'me',
+                'startHistoryId': start_history_id,
+                'historyTypes': ['messageAdded']
+            }
+            if page_token:
+                request_kwargs['pageToken'] = page_token
+
+            response = self.service.users().history().list(**request_kwargs).execute()
+            latest_history_id = response.get('historyId', latest_history_id)
+
+            for record in response.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message = added.get('message', {})
+                    message_id = message.get('id')
+                    # Drafts are re-added on every edit; they are never incoming mail
+                    if not message_id or 'DRAFT' in message.get('labelIds', []):
+                        continue
+                    if message_id not in seen:
+                        seen.add(message_id)
+                        message_ids.append(message_id)
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        return message_ids, latest_history_id
+
+    def _load_history_id(self) -> Optional[str]:
+        """Load the stored historyId watermark, if any"""
+        if not os.path.exists(Config.GMAIL_HISTORY_FILE):
+            return None
+
+        try:
+            with open(Config.GMAIL_HISTORY_FILE, 'r') as f:
+                return json.load(f).get('history_id')
+        except (OSError, ValueError) as error:
+            print(f'Could not read history watermark, ignoring it: {error}')
+            return None
+
+    def save_history_id(self, history_id: str):
+        """Persist the historyId watermark atomically"""
+        tmp_file = f'{Config.GMAIL_HISTORY_FILE}.tmp'
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({
+                    'history_id': str(history_id),
+                    'updated_at': datetime.now().isoformat()
+                }, f)
+            os.replace(tmp_file, Config.GMAIL_HISTORY_FILE)
+        except OSError as error:
+            print(f'Could not save history watermark: {error}')
+
     def get_email_details(self, message_id: str) -> Optional[Dict]:
         """Get detailed information about a specific email"""
         try:
@@ -93,6 +284,170 @@ class GmailClient:
                 format='full'
             ).execute()
             
+            return self._parse_message(message)
+            
+        except HttpError as error:
+            print(f'An error occurred while fetching email {message_id}: {error}')
+            return None
+
+    def fetch_candidate_emails(self, message_ids: List[str]) -> List[Dict]:
+        """Fetch emails for processing, metadata-first when two-phase fetch is enabled.
+
+        Phase one fetches only Subject/From/Date headers and Gmail's snippet and runs
+        is_job_related_email on them. Phase two downloads full payloads only for the
+        messages that passed. Per-phase counters accumulate in self.fetch_stats.
+        """
+        if not Config.GMAIL_TWO_PHASE_FETCH:
+            return self.get_email_details_batch(message_ids)
+
+        survivors = self.fetch_prefiltered_metadata(message_ids)
+        return self.get_email_details_batch([email_data['id'] for email_data in survivors])
+
+    def fetch_prefiltered_metadata(self, message_ids: List[str]) -> List[Dict]:
+        """Metadata (headers and snippet) of the messages that pass is_job_related_email"""
+        candidates = self.get_email_details_batch(message_ids, message_format='metadata')
+        survivors = [email_data for email_data in candidates if self.is_job_related_email(email_data)]
+        with self._stats_lock:
+            self.fetch_stats['metadata']['skipped'] += len(candidates) - len(survivors)
+        return survivors
+
+    def reset_fetch_stats(self):
+        """Reset per-phase fetch counters (at construction and at the start of each run)"""
+        self.fetch_stats = {
+            'metadata': {'requested': 0, 'fetched': 0, 'bytes': 0, 'skipped': 0},
+            'full': {'requested': 0, 'fetched': 0, 'bytes': 0},
+            'threads': {'requested': 0, 'fetched': 0, 'bytes': 0}
+        }
+
+    def get_email_details_batch(self, message_ids: List[str], message_format: str = 'full') -> List[Dict]:
+        """Get details for many emails using batched HTTP requests.
+
+        Up to Config.GMAIL_BATCH_SIZE messages.get calls are sent per HTTP request.
+        Items that fail with a retryable error (rate limit or server error) are
+        retried on their own, without refetching the rest of the batch. Returns the
+        same dicts as get_email_details, in the order of `message_ids` (duplicates dropped).
+        With message_format='metadata' the 'body' field holds Gmail's snippet.
+        """
+        def make_request(message_id):
+            if message_format == 'metadata':
+                return self.service.users().messages().get(
+                    userId='me',
+                    id=message_id,
+                    format='metadata',
+                    metadataHeaders=['Subject', 'From', 'Date']
+                )
+            return self.service.users().messages().get(userId='me', id=message_id, format=message_format)
+
+        results = self._run_batched_gets(message_ids, make_request,
+                                         lambda response: self._parse_message(response, message_format),
+                                         message_format, 'email')
+        return [results[message_id] for message_id in dict.fromkeys(message_ids) if message_id in results]
+
+    def get_threads_batch(self, thread_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Fetch whole threads with batched threads.get calls.
+
+        Returns each thread's messages as email dicts, oldest first, keyed by
+        thread id. Drafts are left out.
+        """
+        def parse_thread(response):
+            messages = []
+            for message in response.get('messages', []):
+                if 'DRAFT' in message.get('labelIds', []):
+                    continue
+                parsed = self._parse_message(message)
+                if parsed:
+                    messages.append(parsed)
+            return sorted(messages, key=lambda m: m['internal_date'])
+
+        return self._run_batched_gets(
+            thread_ids,
+            lambda thread_id: self.service.users().threads().get(userId='me', id=thread_id, format='full'),
+            parse_thread, 'threads', 'thread'
+        )
+
+    def _run_batched_gets(self, ids: List[str], make_request, parse, phase: str, item_name: str) -> Dict[str, object]:
+        """Run get requests in HTTP batches with per-item retries; return parsed results by id"""
+        results = {}
+        unique_ids = list(dict.fromkeys(ids))
+        pending = unique_ids
+        attempt = 0
+
+        while pending:
+            retry_ids = []
+
+            for start in range(0, len(pending), Config.GMAIL_BATCH_SIZE):
+                chunk = pending[start:start + Config.GMAIL_BATCH_SIZE]
+                retry_ids.extend(self._execute_batch(chunk, results, make_request, parse, phase, item_name))
+
+            if not retry_ids:
+                break
+
+            attempt += 1
+            if attempt > Config.GMAIL_BATCH_MAX_RETRIES:
+                print(f'Giving up on {len(retry_ids)} {item_name}s after {attempt} attempts')
+                break
+
+            # Exponential backoff before retrying only the failed items
+            time.sleep(min(2 ** attempt, 32))
+            pending = retry_ids
+
+        phase_stats = self.fetch_stats.get(phase)
+        if phase_stats is not None:
+            with self._stats_lock:
+                phase_stats['requested'] += len(unique_ids)
+                phase_stats['fetched'] += len(results)
+
+        return results
+
+    def _execute_batch(self, ids: List[str], results: Dict[str, object], make_request, parse,
+                       phase: str, item_name: str) -> List[str]:
+        """Run one batch request, store parsed items in `results`, return ids to retry"""
+        retry_ids = []
+        phase_stats = self.fetch_stats.get(phase)
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                if phase_stats is not None:
+                    # Size of the decoded JSON response; close to what went over the wire
+                    size = len(json.dumps(response))
+                    with self._stats_lock:
+                        phase_stats['bytes'] += size
+                parsed = parse(response)
+                if parsed:
+                    results[request_id] = parsed
+            elif self._is_retryable_error(exception):
+                retry_ids.append(request_id)
+            else:
+                print(f'An error occurred while fetching {item_name} {request_id}: {exception}')
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for item_id in ids:
+            batch.add(make_request(item_id), request_id=item_id)
+
+        try:
+            batch.execute()
+        except HttpError as error:
+            # The whole batch request failed (not individual items); retry all of them
+            if not self._is_retryable_error(error):
+                print(f'An error occurred while fetching a batch of {item_name}s: {error}')
+                return []
+            return [item_id for item_id in ids if item_id not in results]
+
+        return retry_ids
+
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """Return True for rate-limit and transient server errors"""
+        resp = getattr(error, 'resp', None)
+        status = getattr(resp, 'status', None)
+        try:
+            status = int(status)
+        except (TypeError, ValueError):
+            return False
+        return status == 429 or status >= 500 or (status == 403 and 'rateLimitExceeded' in str(error))
+
+    def _parse_message(self, message: Dict, message_format: str = 'full') -> Optional[Dict]:
+        """Convert a messages.get response into the email dict used throughout the tracker"""
+        try:
             headers = message['payload'].get('headers', [])
             
             # Extract header information
@@ -100,21 +455,26 @@ class GmailClient:
             sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
             date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
             
-            # Extract email body
-            body = self.extract_email_body(message['payload'])
+            # Extract email body; metadata responses carry no payload body, only the snippet
+            snippet = html.unescape(message.get('snippet', ''))
+            if message_format == 'metadata':
+                body = snippet
+            else:
+                body = self.extract_email_body(message['payload'])
             
             return {
-                'id': message_id,
+                'id': message['id'],
                 'subject': subject,
                 'sender': sender,
                 'date': date,
                 'body': body,
+                'snippet': snippet,
                 'thread_id': message.get('threadId', ''),
-                'labels': message.get('labelIds', [])
+                'labels': message.get('labelIds', []),
+                'internal_date': int(message.get('internalDate', 0))
             }
-            
-        except HttpError as error:
-            print(f'An error occurred while fetching email {message_id}: {error}')
+        except (KeyError, TypeError, ValueError) as error:
+            print(f"Could not parse email {message.get('id', '') if isinstance(message, dict) else ''}: {error}")
             return None
     
     def extract_email_body(self, payload: Dict) -> str:
@@ -145,26 +505,10 @@ class GmailClient:
     def search_emails_by_keywords(self, keywords: List[str], days_back: int = 7) -> List[Dict]:
         """Search for emails containing specific keywords"""
         try:
-            since_date = datetime.now() - timedelta(days=days_back)
-            keyword_query = ' OR '.join([f'"{keyword}"' for keyword in keywords])
-            query = f'({keyword_query}) after:{since_date.strftime("%Y/%m/%d")}'
-            
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=Config.MAX_EMAILS_PER_CHECK
-            ).execute()
-            
-            messages = results.get('messages', [])
-            emails = []
-            
-            for message in messages:
-                email_data = self.get_email_details(message['id'])
-                if email_data:
-                    emails.append(email_data)
+            emails = list(self.iter_messages(self.build_keyword_query(keywords, days_back)))
 
             # Return results sorted from oldest to newest
-            emails = self._sort_emails_by_date_asc(emails)
+            emails = self.sort_emails_by_date_asc(emails)
             return emails
         except HttpError as error:
             print(f'An error occurred while searching emails: {error}')
@@ -190,7 +534,7 @@ class GmailClient:
             except Exception:
                 return datetime.fromtimestamp(0)
 
-    def _sort_emails_by_date_asc(self, emails: List[Dict]) -> List[Dict]:
+    def sort_emails_by_date_asc(self, emails: List[Dict]) -> List[Dict]:
         """Sort list of email dicts by their 'date' header ascending (oldest first)."""
         try:
             return sorted(emails, key=lambda e: self._parse_email_date(e.get('date', '')))
@@ -208,22 +552,19 @@ class GmailClient:
         sender_domain = self._extract_domain_from_sender(sender)
         if sender_domain in Config.SENDER_BLACKLIST:
             # Only treat as job-related if explicit job keywords or recruiting platforms are present
-            if any(keyword in subject or keyword in body for keyword in Config.JOB_EMAIL_KEYWORDS):
-                return True
-            if any(domain in subject or domain in body for domain in Config.COMPANY_DOMAINS):
+            if has_job_keywords(email_data):
                 return True
-            return False
+            return any(domain in subject or domain in body for domain in Config.COMPANY_DOMAINS)
 
         # Otherwise, check normal job keywords and recruiting platform domains
-        for keyword in Config.JOB_EMAIL_KEYWORDS:
-            if keyword in subject or keyword in body:
-                return True
+        if has_job_keywords(email_data):
+            return True
 
-        for domain in Config.COMPANY_DOMAINS:
-            if domain in sender:
-                return True
+        return self._is_recruiting_domain(sender_domain)
 
-        return False
+    def _is_recruiting_domain(self, domain: str) -> bool:
+        """True if `domain` is one of Config.COMPANY_DOMAINS or a subdomain of one"""
+        return any(domain == d or domain.endswith('.' + d) for d in Config.COMPANY_DOMAINS)
 
     def _extract_domain_from_sender(self, sender: str) -> str:
         """Extract domain from a From header value like 'Name <name@domain.com>'"""
@@ -0,0 +1,53 @@
+import re
+from typing import Dict, Optional
+
+
+# An id must contain a digit, which keeps words like "required" or "reference" out
+_ID = r'(?P<id>[A-Za-z]{0,4}[-_]?\d[\w-]{1,30})'
+
+# Labeled ids in the subject or body: "Job ID: 12345", "Requisition #R-6789", "Req ID 9876"
+LABELED_ID_PATTERNS = [
+    re.compile(r'\bjob\s*(?:id|number|no\.?|code|ref(?:erence)?)\s*[:#\-]?\s*' + _ID, re.IGNORECASE),
+    re.compile(r'\brequisition\s*(?:number|#|no\.?|id)?\s*[:#\-]?\s*' + _ID, re.IGNORECASE),
+    re.compile(r'\breq\.?\s*(?:id|#|no\.?)?\s*[:#\-]?\s*' + _ID, re.IGNORECASE),
+    re.compile(r'\bposition\s*(?:id|#|number)\s*[:#\-]?\s*' + _ID, re.IGNORECASE),
+    re.compile(r'\bref(?:erence)?\s*(?:id|#|no\.?|number)?\s*[:#\-]\s*' + _ID, re.IGNORECASE),
+    # Bare Workday-style requisition ids in parentheses, e.g. "Data Analyst (R12345)"
+    re.compile(r'\((?P<id>(?:JR|R|REQ)[-_]?\d{4,})\)'),
+]
+
+# Ids embedded in job board URLs
+URL_ID_PATTERNS = [
+    re.compile(r'[?&](?:gh_jid|jobid|job_id|jid|reqid|requisitionid)=(?P<id>[\w-]+)', re.IGNORECASE),
+    re.compile(r'jobs\.lever\.co/[\w-]+/(?P<id>[0-9a-f]{8}-[0-9a-f-]{27})', re.IGNORECASE),
+    re.compile(r'myworkdayjobs\.com/\S+?_(?P<id>(?:JR|R|REQ)[-_]?\d{4,})', re.IGNORECASE),
+    re.compile(r'jobs\.smartrecruiters\.com/[\w-]+/(?P<id>\d{6,})', re.IGNORECASE),
+    re.compile(r'/jobs?/(?P<id>\d{3,})\b', re.IGNORECASE),
+]
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"\')]+', re.IGNORECASE)
+
+
+def extract_job_id_from_text(text: str) -> Optional[str]:
+    """Job or requisition id from free text, checking labeled ids before URLs"""
+    if not text:
+        return None
+
+    for pattern in LABELED_ID_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group('id').strip('-_')
+
+    for url in URL_PATTERN.findall(text):
+        for pattern in URL_ID_PATTERNS:
+            match = pattern.search(url)
+            if match:
+                return match.group('id')
+
+    return None
+
+
+def extract_job_id(email_data: Dict) -> Optional[str]:
+    """Job or requisition id for an email: subject first, then body text and its links"""
+    return (extract_job_id_from_text(email_data.get('subject') or '')
+            or extract_job_id_from_text(email_data.get('body') or ''))
@@ -1,10 +1,19 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 
 from gmail_client import GmailClient
 from sheets_client import SheetsClient
 from ai_analyzer import JobEmailAnalyzer
+from processed_ledger import ProcessedLedger
+from email_classifier import EmailClassifier, train_test_split
+from job_ids import extract_job_id
+from pipeline import Pipeline, Stage
+from reconciler import ApplicationReconciler
+from status_transitions import ADVANCE, REDUNDANT, REGRESSION, classify_transition
+from thread_analysis import ThreadStateStore, build_thread_email, summarize_analysis, thread_delta
 from config import Config, validate_config
 
 
@@ -18,7 +27,13 @@ class JobApplicationTracker:
         # Initialize clients
         self.gmail_client = GmailClient()
         self.sheets_client = SheetsClient()
+        self.applications = ApplicationReconciler(self.sheets_client)
+        self.transition_stats = self._empty_transition_stats()
         self.ai_analyzer = JobEmailAnalyzer()
+        self.ledger = ProcessedLedger()
+        self.classifier = EmailClassifier.load() if Config.CLASSIFIER_GATE_ENABLED else None
+        self.thread_state = ThreadStateStore() if Config.THREAD_ANALYSIS else None
+        self._pending_ledger_marks = []
         
         # Setup logging
         self.setup_logging()
@@ -37,60 +52,330 @@ class JobApplicationTracker:
         )
         self.logger = logging.getLogger(__name__)
     
-    def process_recent_emails(self, hours_back: int = 24) -> Dict:
-        """Process recent emails for job application updates"""
+    def process_recent_emails(self, hours_back: int = 24, incremental: bool = False,
+                              force_reprocess: bool = False) -> Dict:
+        """Process recent emails for job application updates
+
+        With incremental=True only mail added since the last sync is fetched;
+        hours_back is then used only for a full resync when no watermark exists.
+        Emails already recorded in the processed ledger are skipped unless
+        force_reprocess is set.
+        """
+        
+        history_id = None
+        if incremental:
+            self.logger.info(f"Processing emails added since last sync (resync window: {hours_back} hours)")
+            message_ids, history_id = self.gmail_client.list_new_message_ids(hours_back)
+            id_pages = [message_ids]
+        else:
+            self.logger.info(f"Processing emails from the last {hours_back} hours")
+            # Listing pages feed the pipeline as Gmail returns them
+            id_pages = self.gmail_client.iter_message_id_pages(self.gmail_client.build_recent_query(hours_back))
+        
+        self._begin_run()
         
-        self.logger.info(f"Processing emails from the last {hours_back} hours")
+        results = self._new_results()
+        completed = self._run_pipeline(id_pages, results, prefilter=True, force_reprocess=force_reprocess)
+        results['fetch_stats'] = dict(self.gmail_client.fetch_stats)
         
-        # Get recent emails
-        emails = self.gmail_client.get_recent_emails(hours_back)
+        written = self._finish_run(results)
+        
+        # Advance the watermark only once every listed email was analyzed and written;
+        # otherwise the next run lists the same window again and the ledger skips the finished ones
+        if history_id:
+            if completed and written and results['errors'] == 0 and results['degraded_analyses'] == 0:
+                self.gmail_client.save_history_id(history_id)
+            else:
+                self.logger.warning("Some emails were not fully processed; keeping the sync watermark "
+                                    "so the next run lists them again")
         
-        results = {
-            'total_emails': len(emails),
+        self.logger.info(f"Processing complete. Results: {results}")
+        return results
+    
+    def _new_results(self) -> Dict:
+        """Empty run results; the pipeline source counts the listed emails"""
+        return {
+            'total_emails': 0,
             'job_related_emails': 0,
             'new_applications': 0,
             'updated_applications': 0,
             'errors': 0,
+            'already_processed': 0,
+            'classifier_skipped': 0,
+            'degraded_analyses': 0,
             'processed_emails': []
         }
+    
+    def _run_pipeline(self, id_pages: Iterable[List[str]], results: Dict, prefilter: bool,
+                      force_reprocess: bool) -> bool:
+        """Process listed emails as a staged pipeline: list -> fetch -> prefilter -> analyze -> reconcile.
+
+        Pages of ids are consumed as they are listed, so fetching starts before
+        listing finishes. Ids move through the stages in chunks of Config.GMAIL_BATCH_SIZE,
+        connected by queues of Config.PIPELINE_QUEUE_SIZE chunks, so Gmail fetches,
+        analysis requests and sheet writes for different chunks overlap. Fetching
+        runs on Config.PIPELINE_FETCH_WORKERS threads; the analysis batches of every
+        chunk share one pool of Config.ANALYSIS_CONCURRENCY threads, so even a run
+        with a single chunk sends its batches in parallel. The reconcile stage collects
+        the analyzed chunks and, once the stream ends, applies them on one thread
+        oldest first (Gmail lists newest first), so each lookup sees the rows written
+        for earlier emails and status changes never get reordered. With Config.THREAD_ANALYSIS
+        the fetch stage turns listed messages into one update per thread. With Config.SHEETS_WRITE_BEHIND
+        the writes themselves are buffered and flushed by _finish_run. Returns False
+        if a stage failed, leaving some listed emails unprocessed.
+        """
+        def chunks():
+            chunk = []
+            for page in id_pages:
+                results['total_emails'] += len(page)
+                for message_id in page:
+                    # Skip emails handled by an earlier run before spending any API calls
+                    if not force_reprocess and self._is_already_processed(message_id):
+                        results['already_processed'] += 1
+                        continue
+                    chunk.append(message_id)
+                    if len(chunk) == Config.GMAIL_BATCH_SIZE:
+                        yield chunk
+                        chunk = []
+            if chunk:
+                yield chunk
+        
+        claimed_threads = set()
+        claim_lock = threading.Lock()
+        
+        def fetch(chunk: List[str]) -> List[Dict]:
+            if self.thread_state:
+                emails = self._fetch_thread_updates(chunk, prefilter, force_reprocess, claimed_threads, claim_lock)
+            elif prefilter:
+                emails = self.gmail_client.fetch_candidate_emails(chunk)
+            else:
+                emails = self.gmail_client.get_email_details_batch(chunk)
+            return self.gmail_client.sort_emails_by_date_asc(emails)
         
-        for email in emails:
-            try:
+        def select(emails: List[Dict]) -> List[Dict]:
+            candidates = []
+            for email in emails:
                 # Quick filter for job-related emails
-                if not self.gmail_client.is_job_related_email(email):
+                if prefilter and not self.gmail_client.is_job_related_email(email):
                     continue
                 
-                # Analyze email with AI
-                analysis = self.ai_analyzer.analyze_email(email)
-                
-                if not analysis.get('is_job_related', False):
+                # Local classifier: only borderline and likely job emails go to the LLM
+                if self.classifier and self.classifier.score(email) < Config.CLASSIFIER_SKIP_THRESHOLD:
+                    results['classifier_skipped'] += 1
+                    self._mark_processed(email, 'classifier_rejected')
                     continue
                 
-                results['job_related_emails'] += 1
-                
-                # Process the analyzed email
-                processing_result = self.process_analyzed_email(email, analysis)
-                
-                if processing_result['action'] == 'new_application':
-                    results['new_applications'] += 1
-                elif processing_result['action'] == 'updated_application':
-                    results['updated_applications'] += 1
-                
-                results['processed_emails'].append({
-                    'subject': email.get('subject', ''),
-                    'sender': email.get('sender', ''),
-                    'analysis': analysis,
-                    'result': processing_result
-                })
-                
-                self.logger.info(f"Processed email: {email.get('subject', '')[:50]}...")
-                
-            except Exception as e:
-                self.logger.error(f"Error processing email {email.get('id', '')}: {e}")
-                results['errors'] += 1
-        
-        self.logger.info(f"Processing complete. Results: {results}")
-        return results
+                # Job ids come from precompiled patterns, so every path (model, template, fallback) gets one
+                if not email.get('job_id'):
+                    email['job_id'] = extract_job_id(email)
+                candidates.append(email)
+            return candidates
+        
+        def analyze(emails: List[Dict]) -> List[Tuple[List[Dict], Optional[List[Dict]]]]:
+            if Config.ANALYSIS_BATCHING:
+                batches = self.ai_analyzer.plan_batches(emails)
+            else:
+                batches = [[email] for email in emails]
+            
+            # Batches are the unit of concurrency; the chunk waits for all of them in order
+            futures = [executor.submit(self.ai_analyzer.analyze_emails_batch, batch) for batch in batches]
+            
+            analyzed = []
+            for batch, future in zip(batches, futures):
+                try:
+                    analyzed.append((batch, future.result()))
+                except Exception as e:
+                    self.logger.error(f"Error analyzing a batch of {len(batch)} emails: {e}")
+                    analyzed.append((batch, None))
+            return analyzed
+        
+        analyzed_emails = []
+        
+        def reconcile(analyzed: List[Tuple[List[Dict], Optional[List[Dict]]]]):
+            for batch, analyses in analyzed:
+                if analyses is None:
+                    results['errors'] += len(batch)
+                    continue
+                analyzed_emails.extend(zip(batch, analyses))
+        
+        def apply_oldest_first():
+            # Stable sort: emails with the same timestamp keep their listing order
+            analyzed_emails.sort(key=lambda pair: pair[0].get('internal_date', 0))
+            for email, analysis in analyzed_emails:
+                self._apply_analysis(email, analysis, results)
+        
+        pipeline = Pipeline([
+            Stage('fetch', fetch, workers=Config.PIPELINE_FETCH_WORKERS),
+            Stage('prefilter', select),
+            Stage('analyze', analyze, workers=Config.ANALYSIS_CONCURRENCY),
+            Stage('reconcile', reconcile, ordered=True, drain=apply_oldest_first)
+        ], queue_size=Config.PIPELINE_QUEUE_SIZE, logger=self.logger)
+        
+        with ThreadPoolExecutor(max_workers=Config.ANALYSIS_CONCURRENCY) as executor:
+            results['pipeline_stats'] = pipeline.run(chunks())
+        stage_errors = sum(stage['errors'] for stage in results['pipeline_stats'].values())
+        if pipeline.source_error:
+            stage_errors += 1
+        results['errors'] += stage_errors
+        return stage_errors == 0
+    
+    def _fetch_thread_updates(self, message_ids: List[str], prefilter: bool, force_reprocess: bool,
+                              claimed_threads: set, claim_lock: threading.Lock) -> List[Dict]:
+        """Turn listed messages into one update email per thread, fetching each thread once.
+
+        Listed messages are fetched as metadata (prefiltered when `prefilter` is set)
+        to learn their threads. Threads not already claimed earlier in this run are
+        fetched whole with threads.get and reduced to the messages no earlier
+        analysis covered, plus a summary of the state recorded for the thread.
+        """
+        if prefilter:
+            headers = self.gmail_client.fetch_prefiltered_metadata(message_ids)
+        else:
+            headers = self.gmail_client.get_email_details_batch(message_ids, message_format='metadata')
+        
+        thread_ids = []
+        with claim_lock:
+            for email in headers:
+                thread_id = email.get('thread_id')
+                if thread_id and thread_id not in claimed_threads:
+                    claimed_threads.add(thread_id)
+                    thread_ids.append(thread_id)
+        
+        threads = self.gmail_client.get_threads_batch(thread_ids)
+        
+        updates = []
+        for thread_id in thread_ids:
+            messages = threads.get(thread_id)
+            if not messages:
+                continue
+            if force_reprocess:
+                state, delta = None, messages
+            else:
+                state = self.thread_state.get(thread_id)
+                delta = thread_delta(messages, state, self._is_already_processed)
+            if delta:
+                updates.append(build_thread_email(messages, delta, state))
+        return updates
+    
+    def _apply_analysis(self, email: Dict, analysis: Dict, results: Dict):
+        """Write one analyzed email to the sheet and record the outcome in `results`"""
+        try:
+            if email.get('is_thread_update'):
+                # Carried into the next analysis of this thread
+                email['thread_summary'] = summarize_analysis(analysis, email.get('date', ''),
+                                                             email.get('prior_summary'))
+            
+            if not analysis.get('is_job_related', False):
+                self._mark_analyzed(email, analysis, 'not_job_related', results)
+                return
+            
+            results['job_related_emails'] += 1
+            
+            # Process the analyzed email
+            processing_result = self.process_analyzed_email(email, analysis)
+            self._mark_analyzed(email, analysis, processing_result['action'], results)
+            
+            if processing_result['action'] == 'new_application':
+                results['new_applications'] += 1
+            elif processing_result['action'] == 'updated_application':
+                results['updated_applications'] += 1
+            
+            results['processed_emails'].append({
+                'subject': email.get('subject', ''),
+                'sender': email.get('sender', ''),
+                'analysis': analysis,
+                'result': processing_result
+            })
+            
+            self.logger.info(f"Processed email: {email.get('subject', '')[:50]}...")
+            
+        except Exception as e:
+            self.logger.error(f"Error processing email {email.get('id', '')}: {e}")
+            results['errors'] += 1
+    
+    def _is_already_processed(self, message_id: str) -> bool:
+        """Check the ledger for this email under the current analysis version"""
+        return self.ledger.is_processed(message_id, self.ai_analyzer.PROMPT_VERSION)
+    
+    def _mark_analyzed(self, email: Dict, analysis: Dict, action: str, results: Dict):
+        """Record an analyzed email, unless its analysis was degraded and should be redone next run"""
+        if analysis.get('degraded'):
+            # Fallback or unconfirmed lower-tier answer: leave it out of the ledger and thread state
+            results['degraded_analyses'] += 1
+            return
+        self._mark_processed(email, action)
+    
+    def _mark_processed(self, email: Dict, action: str):
+        """Record a finished email in the ledger; failed writes are left for the next run"""
+        if action == 'error':
+            return
+        if action in ('new_application', 'updated_application') and (
+                self.applications.active or self.sheets_client.write_buffer is not None):
+            # Only record it once the staged or buffered sheet write has been sent
+            self._pending_ledger_marks.append((email, action))
+            return
+        self._record_processed(email, action)
+    
+    def _record_processed(self, email: Dict, action: str):
+        """Write the ledger entry, one per covered message for a thread update, and the thread's state"""
+        for message_id in email.get('message_ids') or [email.get('id')]:
+            self.ledger.mark_processed({**email, 'id': message_id}, self.ai_analyzer.PROMPT_VERSION, action)
+        
+        if email.get('is_thread_update') and self.thread_state:
+            self.thread_state.save(email['thread_id'], email['id'], email.get('internal_date', 0),
+                                   email.get('thread_summary') or email.get('prior_summary') or {})
+    
+    def _begin_run(self):
+        """Prepare the sheet client for a processing run"""
+        # Reload the sheet snapshot lazily, at most once for this run
+        self.sheets_client.invalidate_index()
+        self.sheets_client.reset_write_stats()
+        self.gmail_client.reset_fetch_stats()
+        self._pending_ledger_marks = []
+        self.transition_stats = self._empty_transition_stats()
+        if self.ai_analyzer.cache:
+            self.ai_analyzer.cache.reset_stats()
+        if self.ai_analyzer.duplicates:
+            self.ai_analyzer.duplicates.reset_stats()
+        self.ai_analyzer.reset_usage_stats()
+        if Config.SHEETS_WRITE_BEHIND:
+            self.sheets_client.begin_write_batch()
+        if Config.SHEETS_COALESCE_UPDATES:
+            self.applications.begin()
+    
+    def _finish_run(self, results: Dict) -> bool:
+        """Write staged applications and flush buffered sheet writes, then record the emails they came from in the ledger.
+
+        Returns False if the commit or flush failed.
+        """
+        # One write per application touched in this run
+        committed = self.applications.commit() if self.applications.active else True
+        results['sheet_writes'] = dict(self.applications.stats)
+        results['status_transitions'] = dict(self.transition_stats)
+        
+        written = self.sheets_client.end_write_batch() and committed
+        if written:
+            for email, action in self._pending_ledger_marks:
+                self._record_processed(email, action)
+        else:
+            self.logger.error("Failed to flush sheet updates; affected emails will be retried next run")
+            results['errors'] += 1
+        self._pending_ledger_marks = []
+        results['sheet_cells'] = dict(self.sheets_client.write_stats)
+        
+        if self.ai_analyzer.cache:
+            results['analysis_cache'] = dict(self.ai_analyzer.cache.stats)
+        if self.ai_analyzer.duplicates:
+            results['near_duplicates'] = dict(self.ai_analyzer.duplicates.stats)
+        results['llm_usage'] = dict(self.ai_analyzer.usage_stats)
+        results['tier_stats'] = {tier: dict(stats) for tier, stats in self.ai_analyzer.tier_stats.items()}
+        results['extractor_stats'] = {name: dict(stats) for name, stats in self.ai_analyzer.extractor_stats.items()}
+        return written
+    
+    @staticmethod
+    def _empty_transition_stats() -> Dict:
+        """Fresh counters of status transitions seen on existing applications"""
+        return {ADVANCE: 0, REDUNDANT: 0, REGRESSION: 0, 'suppressed_writes': 0}
     
     def process_analyzed_email(self, email: Dict, analysis: Dict) -> Dict:
         """Process an email that has been analyzed by AI"""
@@ -98,7 +383,7 @@ class JobApplicationTracker:
         company = analysis.get('company_name')
         position = analysis.get('position_title')
         thread_id = email.get('thread_id', '')
-        job_id = analysis.get('job_id')
+        job_id = analysis.get('job_id') or email.get('job_id')
         
         if not company:
             company = self.ai_analyzer.extract_company_from_email(email)
@@ -108,15 +393,15 @@ class JobApplicationTracker:
 
         # 1) If we extracted a job_id, use it first (most authoritative)
         if job_id:
-            existing_app = self.sheets_client.find_application_by_job_id(job_id)
+            existing_app = self.applications.find_application_by_job_id(job_id)
 
         # 2) If not found, try to find by thread ID
         if not existing_app and thread_id:
-            existing_app = self.sheets_client.find_application_by_thread_id(thread_id)
+            existing_app = self.applications.find_application_by_thread_id(thread_id)
 
         # 3) If still not found and we have company/position, try that
         if not existing_app and company and position:
-            existing_app = self.sheets_client.find_application_by_company_position(company, position)
+            existing_app = self.applications.find_application_by_company_position(company, position)
         
         if existing_app:
             # Update existing application
@@ -140,6 +425,7 @@ class JobApplicationTracker:
         application_data = {
             'company': company,
             'position': position,
+            'job_id': analysis.get('job_id') or email.get('job_id'),
             'status': analysis.get('job_status', 'Applied'),
             'date_applied': datetime.now().strftime('%Y-%m-%d'),
             'contact_person': analysis.get('contact_person'),
@@ -151,9 +437,10 @@ class JobApplicationTracker:
             'thread_id': email.get('thread_id', '')
         }
         
-        success = self.sheets_client.add_new_application(application_data)
+        success = self.applications.add_new_application(application_data)
         
         if success:
+            self._record_event(company, position, email, analysis)
             self.logger.info(f"Created new application: {company} - {position}")
             return {
                 'action': 'new_application',
@@ -172,10 +459,16 @@ class JobApplicationTracker:
         
         updates = {}
         
-        # Update status if provided and different
+        # Status only moves forward; redundant and regressive changes are counted, not written
         new_status = analysis.get('job_status')
-        if new_status and new_status != existing_app.get('Status'):
+        transition = classify_transition(existing_app.get('Status'), new_status)
+        if transition in self.transition_stats:
+            self.transition_stats[transition] += 1
+        if transition == ADVANCE:
             updates['status'] = new_status
+        elif transition == REGRESSION:
+            self.logger.info(f"Kept status {existing_app.get('Status')!r} instead of {new_status!r} for "
+                             f"{existing_app.get('Company')} - {existing_app.get('Position')}")
         
         # Update contact information if provided
         if analysis.get('contact_person') and not existing_app.get('Contact Person'):
@@ -185,28 +478,45 @@ class JobApplicationTracker:
             updates['contact_email'] = analysis.get('contact_email')
         
         # Update other fields if missing
+        job_id = analysis.get('job_id') or email.get('job_id')
+        if job_id and not existing_app.get('Job ID'):
+            updates['job_id'] = job_id
+        
         if analysis.get('salary_range') and not existing_app.get('Salary Range'):
             updates['salary_range'] = analysis.get('salary_range')
         
         if analysis.get('location') and not existing_app.get('Location'):
             updates['location'] = analysis.get('location')
         
-        # Always update notes with new information
-        new_notes = self.create_notes_from_analysis(email, analysis)
-        existing_notes = existing_app.get('Notes', '')
-        updates['notes'] = f"{existing_notes} | {new_notes}".strip(' |')
-        
         # Update thread ID if not present
         if not existing_app.get('Email Thread ID') and email.get('thread_id'):
             updates['thread_id'] = email.get('thread_id')
         
+        # Add notes when the email changed something or brings dates and next steps not noted yet
+        existing_notes = existing_app.get('Notes', '')
+        if Config.EVENTS_LOG:
+            # Notes holds only the latest summary; earlier details are in the recorded events
+            history = self.sheets_client.event_history(existing_app.get('Company'), existing_app.get('Position'))
+            known_details = ' | '.join([existing_notes] + [event['details'] for event in history])
+        else:
+            known_details = existing_notes
+        if updates or self._has_new_details(analysis, known_details):
+            new_notes = self.create_notes_from_analysis(email, analysis)
+            if Config.EVENTS_LOG:
+                # The full history is in the events worksheet; the row keeps the latest summary
+                updates['notes'] = new_notes
+            else:
+                updates['notes'] = f"{existing_notes} | {new_notes}".strip(' |')
+        
         if updates:
-            success = self.sheets_client.update_application(
+            success = self.applications.update_application(
                 existing_app['row_number'], 
                 updates
             )
             
             if success:
+                # Every email about the application goes into its history once its row change is staged
+                self._record_event(existing_app.get('Company'), existing_app.get('Position'), email, analysis)
                 self.logger.info(f"Updated application: {existing_app.get('Company')} - {existing_app.get('Position')}")
                 return {
                     'action': 'updated_application',
@@ -220,20 +530,54 @@ class JobApplicationTracker:
                     'reason': 'Failed to update application'
                 }
         else:
+            self._record_event(existing_app.get('Company'), existing_app.get('Position'), email, analysis)
+            self.transition_stats['suppressed_writes'] += 1
             return {
                 'action': 'no_changes',
-                'reason': 'No new information to update'
+                'reason': f'No new information to update (status change {transition})'
             }
     
+    def _has_new_details(self, analysis: Dict, known_details: str) -> bool:
+        """True if the analysis has an interview date, deadline or next steps not mentioned in `known_details`"""
+        known_details = (known_details or '').lower()
+        for field in ('interview_date', 'deadline', 'next_steps'):
+            value = analysis.get(field)
+            if value and str(value).lower() not in known_details:
+                return True
+        return False
+    
+    def _record_event(self, company: str, position: str, email: Dict, analysis: Dict):
+        """Append the email to the application's history on the events worksheet"""
+        if not Config.EVENTS_LOG:
+            return
+        
+        recorded = self.sheets_client.add_event({
+            'company': company,
+            'position': position,
+            'message_id': email.get('id', ''),
+            'email_date': email.get('date', ''),
+            'email_type': (analysis.get('email_type') or 'other').replace('_', ' ').title(),
+            'status': analysis.get('job_status'),
+            'details': ' | '.join(self._note_details(analysis)),
+            'thread_id': email.get('thread_id', '')
+        })
+        if not recorded:
+            self.logger.warning(f"Failed to record event for email {email.get('id', '')}")
+    
     def create_notes_from_analysis(self, email: Dict, analysis: Dict) -> str:
         """Create notes string from email and analysis"""
         
-        notes_parts = []
-        
         # Add email date and type
         email_date = email.get('date', datetime.now().strftime('%Y-%m-%d'))
         email_type = analysis.get('email_type', 'other')
-        notes_parts.append(f"[{email_date}] {email_type.replace('_', ' ').title()}")
+        header = f"[{email_date}] {email_type.replace('_', ' ').title()}"
+        
+        return ' | '.join([header] + self._note_details(analysis))
+    
+    def _note_details(self, analysis: Dict) -> List[str]:
+        """Key information, next steps, interview and deadline parts of an email's notes"""
+        
+        notes_parts = []
         
         # Add key information
         key_info = analysis.get('key_information')
@@ -259,60 +603,68 @@ class JobApplicationTracker:
         if deadline:
             notes_parts.append(f"Deadline: {deadline}")
         
-        return ' | '.join(notes_parts)
+        return notes_parts
+    
+    def migrate_notes_to_events(self) -> Dict:
+        """Split the history in existing Notes cells into the events worksheet (one-time)"""
+        self.logger.info("Migrating Notes history to the events worksheet")
+        stats = self.sheets_client.migrate_notes_to_events()
+        self.logger.info(f"Notes migration complete: {stats}")
+        return stats
     
-    def search_and_process_job_emails(self, days_back: int = 7) -> Dict:
+    def search_and_process_job_emails(self, days_back: int = 7, force_reprocess: bool = False) -> Dict:
         """Search for job-related emails and process them"""
         
         self.logger.info(f"Searching for job-related emails from the last {days_back} days")
         
         # Search for emails with job-related keywords
-        emails = self.gmail_client.search_emails_by_keywords(
-            Config.JOB_EMAIL_KEYWORDS, 
-            days_back
+        id_pages = self.gmail_client.iter_message_id_pages(
+            self.gmail_client.build_keyword_query(Config.JOB_EMAIL_KEYWORDS, days_back)
         )
         
-        results = {
-            'total_emails': len(emails),
-            'job_related_emails': 0,
-            'new_applications': 0,
-            'updated_applications': 0,
-            'errors': 0,
-            'processed_emails': []
-        }
+        self._begin_run()
         
-        for email in emails:
-            try:
-                # Analyze email with AI
-                analysis = self.ai_analyzer.analyze_email(email)
-                
-                if not analysis.get('is_job_related', False):
-                    continue
-                
-                results['job_related_emails'] += 1
-                
-                # Process the analyzed email
-                processing_result = self.process_analyzed_email(email, analysis)
-                
-                if processing_result['action'] == 'new_application':
-                    results['new_applications'] += 1
-                elif processing_result['action'] == 'updated_application':
-                    results['updated_applications'] += 1
-                
-                results['processed_emails'].append({
-                    'subject': email.get('subject', ''),
-                    'sender': email.get('sender', ''),
-                    'analysis': analysis,
-                    'result': processing_result
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error processing email {email.get('id', '')}: {e}")
-                results['errors'] += 1
+        results = self._new_results()
+        self._run_pipeline(id_pages, results, prefilter=False, force_reprocess=force_reprocess)
         
+        self._finish_run(results)
         self.logger.info(f"Search and process complete. Results: {results}")
         return results
     
+    def train_classifier(self) -> Dict:
+        """Train the local email classifier from emails the LLM has already labeled.
+
+        Labels come from the processed ledger (anything the LLM judged job-related
+        versus 'not_job_related'); subjects, senders and snippets are re-fetched
+        from Gmail with cheap metadata requests. Reports held-out metrics,
+        including the share of LLM calls the gate would have avoided.
+        """
+        labels = {}
+        for message_id, action in self.ledger.labeled_messages():
+            if action == 'not_job_related':
+                labels[message_id] = False
+            elif action in ('new_application', 'updated_application', 'no_changes', 'skipped'):
+                labels[message_id] = True
+        
+        self.logger.info(f"Fetching metadata for {len(labels)} labeled emails")
+        emails = self.gmail_client.get_email_details_batch(list(labels), message_format='metadata')
+        examples = [(email, labels[email['id']]) for email in emails]
+        
+        train_set, test_set = train_test_split(examples)
+        classifier = EmailClassifier()
+        classifier.train(train_set)
+        metrics = classifier.evaluate(test_set, Config.CLASSIFIER_SKIP_THRESHOLD)
+        
+        # Refit on everything before saving
+        classifier.train(examples)
+        classifier.save()
+        self.classifier = classifier if Config.CLASSIFIER_GATE_ENABLED else None
+        
+        metrics['training_examples'] = len(examples)
+        metrics['threshold'] = Config.CLASSIFIER_SKIP_THRESHOLD
+        self.logger.info(f"Classifier trained: {metrics}")
+        return metrics
+    
     def get_application_summary(self) -> Dict:
         """Get a summary of all job applications"""
         
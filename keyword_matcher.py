@@ -0,0 +1,90 @@
+import re
+import string
+from typing import Dict, Iterable, Optional, Union
+
+from config import Config
+
+
+# Punctuation that separates words; mapped to spaces before splitting a text into words
+WORD_SEPARATORS = str.maketrans({c: ' ' for c in string.punctuation + '“”‘’«»…–—•·'})
+
+
+class KeywordMatcher:
+    """Weighted whole-word keyword matcher that scans each text once.
+
+    A text is lowercased and split into a set of words in one pass of C-level
+    string operations, and single-word keywords are found with one set
+    intersection. Keywords spanning several words or containing punctuation
+    ('next steps', 'lever.co') are confirmed with one compiled alternation
+    regex, run only when all of their words occur in the text. Unlike
+    substring checks, 'hr' no longer matches inside 'through'.
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Dict[str, float]], default_weight: float = 1.0):
+        if isinstance(keywords, dict):
+            self.weights = {k.lower(): float(w) for k, w in keywords.items()}
+        else:
+            self.weights = {k.lower(): default_weight for k in keywords}
+
+        self.words = {k for k in self.weights if k.translate(WORD_SEPARATORS).split() == [k]}
+        self.phrase_words = {k: set(k.translate(WORD_SEPARATORS).split())
+                             for k in self.weights if k not in self.words}
+        # Every word worth looking up: single-word keywords plus the parts of the others
+        self.vocabulary = self.words.union(*self.phrase_words.values())
+
+        self.phrase_pattern = None
+        if self.phrase_words:
+            alternatives = sorted(self.phrase_words, key=len, reverse=True)
+            # Multi-word keywords match across any run of whitespace (e.g. wrapped lines)
+            pattern = '|'.join(re.escape(k).replace(r'\ ', r'\s+') for k in alternatives)
+            self.phrase_pattern = re.compile(rf'(?<![\w-])(?:{pattern})(?![\w-])')
+
+    def find(self, *texts: str, stop_at: Optional[float] = None) -> Dict[str, float]:
+        """Distinct keywords found in any of the texts, with their weights.
+
+        With `stop_at`, later texts are skipped once the hits reach that total weight.
+        """
+        hits = {}
+        for text in texts:
+            if stop_at is not None and sum(hits.values()) >= stop_at:
+                break
+            if not text:
+                continue
+            lowered = text.lower()
+            words = self.vocabulary.intersection(lowered.translate(WORD_SEPARATORS).split())
+
+            for keyword in words & self.words:
+                hits[keyword] = self.weights[keyword]
+
+            if self.phrase_pattern and any(parts <= words for parts in self.phrase_words.values()):
+                for match in self.phrase_pattern.finditer(lowered):
+                    keyword = ' '.join(match.group(0).split())
+                    hits[keyword] = self.weights.get(keyword, 0.0)
+        return hits
+
+    def score(self, *texts: str) -> float:
+        """Sum of the weights of the distinct keywords found"""
+        return sum(self.find(*texts).values())
+
+    def search(self, *texts: str) -> bool:
+        """True if any keyword occurs in any of the texts"""
+        return bool(self.find(*texts, stop_at=min(self.weights.values(), default=0.0)))
+
+
+# Shared matcher for the prefilter and the heuristic analysis
+JOB_KEYWORDS = KeywordMatcher({
+    keyword: Config.JOB_KEYWORD_WEIGHTS.get(keyword, 1.0) for keyword in Config.JOB_EMAIL_KEYWORDS
+})
+
+
+def job_keyword_hits(email_data: Dict) -> Dict[str, float]:
+    """Job keywords in the email's subject and body, with their weights"""
+    return JOB_KEYWORDS.find(email_data.get('subject') or '', email_data.get('body') or '')
+
+
+def has_job_keywords(email_data: Dict) -> bool:
+    """True if the weighted job keywords in the email reach Config.JOB_KEYWORD_MIN_SCORE"""
+    # The subject alone often settles it, which skips scanning the body
+    hits = JOB_KEYWORDS.find(email_data.get('subject') or '', email_data.get('body') or '',
+                             stop_at=Config.JOB_KEYWORD_MIN_SCORE)
+    return sum(hits.values()) >= Config.JOB_KEYWORD_MIN_SCORE
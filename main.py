@@ -30,13 +30,20 @@ def setup_logging(verbose: bool = False):
     )
 
 
-def run_one_time_check(hours_back: int = 24):
+def run_one_time_check(hours_back: int = 24, incremental: bool = False, force_reprocess: bool = False):
     """Run a one-time email check"""
-    print(f"Running one-time email check for the last {hours_back} hours...")
+    if incremental:
+        print("Running one-time email check for emails added since the last sync...")
+    else:
+        print(f"Running one-time email check for the last {hours_back} hours...")
     
     try:
         tracker = JobApplicationTracker()
-        results = tracker.process_recent_emails(hours_back)
+        results = tracker.process_recent_emails(
+            hours_back,
+            incremental=incremental,
+            force_reprocess=force_reprocess
+        )
         
         print("\n" + "="*50)
         print("EMAIL PROCESSING RESULTS")
@@ -46,6 +53,52 @@ def run_one_time_check(hours_back: int = 24):
         print(f"New applications created: {results['new_applications']}")
         print(f"Existing applications updated: {results['updated_applications']}")
         print(f"Errors encountered: {results['errors']}")
+        print(f"Skipped (already processed): {results['already_processed']}")
+        print(f"Skipped by local classifier: {results['classifier_skipped']}")
+        print(f"Degraded analyses (retried next run): {results['degraded_analyses']}")
+        
+        sheet_writes = results.get('sheet_writes', {})
+        if sheet_writes.get('emails'):
+            print(f"Sheet changes from {sheet_writes['emails']} emails written to "
+                  f"{sheet_writes['applications']} applications")
+        
+        sheet_cells = results.get('sheet_cells', {})
+        if sheet_cells.get('kept_manual_edits'):
+            print(f"Cells edited in the sheet during the run and left unchanged: {sheet_cells['kept_manual_edits']}")
+        if sheet_cells.get('events') or sheet_cells.get('duplicate_events'):
+            print(f"History events recorded: {sheet_cells['events']} "
+                  f"({sheet_cells['duplicate_events']} already recorded)")
+        
+        transitions = results.get('status_transitions', {})
+        if transitions.get('suppressed_writes'):
+            print(f"Sheet writes suppressed: {transitions['suppressed_writes']} "
+                  f"({transitions.get('redundant', 0)} repeated and {transitions.get('regressive', 0)} "
+                  f"backward status changes)")
+        
+        if results.get('near_duplicates'):
+            print(f"Skipped as near-duplicates: {results['near_duplicates']['hits']}")
+        for name, stats in results.get('extractor_stats', {}).items():
+            print(f"Template extractor {name}: handled {stats['handled']} of {stats['seen']} emails")
+        
+        llm_usage = results.get('llm_usage', {})
+        if llm_usage.get('repaired_responses') or llm_usage.get('parse_failures'):
+            print(f"Model responses repaired: {llm_usage['repaired_responses']}, "
+                  f"unparseable: {llm_usage['parse_failures']}")
+        
+        fetch_stats = results.get('fetch_stats', {})
+        if fetch_stats.get('metadata', {}).get('requested'):
+            metadata = fetch_stats['metadata']
+            full = fetch_stats.get('full', {})
+            print(f"Metadata phase: {metadata['fetched']} emails, {metadata['bytes']:,} bytes, "
+                  f"{metadata['skipped']} skipped by prefilter")
+            print(f"Full phase: {full.get('fetched', 0)} emails, {full.get('bytes', 0):,} bytes")
+            threads = fetch_stats.get('threads', {})
+            if threads.get('requested'):
+                print(f"Threads: {threads['fetched']} fetched, {threads['bytes']:,} bytes")
+        
+        for stage, stats in results.get('pipeline_stats', {}).items():
+            print(f"Pipeline stage {stage}: {stats['items']} chunks, {stats['busy_seconds']:.1f}s busy, "
+                  f"{stats['errors']} failed")
         
         if results['processed_emails']:
             print("\nProcessed Emails:")
@@ -54,6 +107,8 @@ def run_one_time_check(hours_back: int = 24):
                 print(f"• {email['subject'][:60]}...")
                 print(f"  From: {email['sender']}")
                 print(f"  Action: {email['result']['action']}")
+                if email['analysis'].get('analysis_tier'):
+                    print(f"  Analyzed by: {email['analysis']['analysis_tier']}")
                 if email['analysis'].get('company_name'):
                     print(f"  Company: {email['analysis']['company_name']}")
                 if email['analysis'].get('position_title'):
@@ -67,13 +122,13 @@ def run_one_time_check(hours_back: int = 24):
         return None
 
 
-def run_search_and_process(days_back: int = 7):
+def run_search_and_process(days_back: int = 7, force_reprocess: bool = False):
     """Search for job-related emails and process them"""
     print(f"Searching for job-related emails from the last {days_back} days...")
     
     try:
         tracker = JobApplicationTracker()
-        results = tracker.search_and_process_job_emails(days_back)
+        results = tracker.search_and_process_job_emails(days_back, force_reprocess=force_reprocess)
         
         print("\n" + "="*50)
         print("EMAIL SEARCH AND PROCESSING RESULTS")
@@ -83,6 +138,7 @@ def run_search_and_process(days_back: int = 7):
         print(f"New applications created: {results['new_applications']}")
         print(f"Existing applications updated: {results['updated_applications']}")
         print(f"Errors encountered: {results['errors']}")
+        print(f"Skipped (already processed): {results['already_processed']}")
         
         return results
         
@@ -118,6 +174,50 @@ def show_summary():
         return None
 
 
+def run_train_classifier():
+    """Train the local email classifier from already-analyzed emails"""
+    print("Training local email classifier from processed emails...")
+    
+    try:
+        tracker = JobApplicationTracker()
+        metrics = tracker.train_classifier()
+        
+        print("\n" + "="*50)
+        print("CLASSIFIER TRAINING RESULTS")
+        print("="*50)
+        print(f"Training examples: {metrics['training_examples']}")
+        print(f"Held-out accuracy: {metrics['accuracy']:.1%}")
+        print(f"LLM call reduction at threshold {metrics['threshold']}: {metrics['llm_call_reduction']:.1%}")
+        print(f"Job email recall: {metrics['job_email_recall']:.1%} "
+              f"({metrics['job_emails_missed']} job emails would have been skipped)")
+        
+        return metrics
+        
+    except Exception as e:
+        print(f"Error training classifier: {e}")
+        return None
+
+
+def run_migrate_notes():
+    """Move the history in existing Notes cells to the events worksheet"""
+    print("Migrating Notes history to the events worksheet...")
+    
+    try:
+        tracker = JobApplicationTracker()
+        stats = tracker.migrate_notes_to_events()
+        
+        print(f"Events recorded: {stats['events']}")
+        print(f"Notes cells cut down to their latest entry: {stats['notes_shortened']}")
+        if stats['kept_manual_edits']:
+            print(f"Notes cells edited during the migration and left unchanged: {stats['kept_manual_edits']}")
+        
+        return stats
+        
+    except Exception as e:
+        print(f"Error migrating notes: {e}")
+        return None
+
+
 def run_scheduler():
     """Run the automated scheduler"""
     print("Starting automated job application tracker...")
@@ -178,7 +278,7 @@ def main():
     
     parser.add_argument(
         '--mode', 
-        choices=['check', 'search', 'summary', 'schedule', 'interactive'],
+        choices=['check', 'search', 'summary', 'schedule', 'train-classifier', 'migrate-notes', 'interactive'],
         default='interactive',
         help='Operation mode (default: interactive)'
     )
@@ -197,6 +297,18 @@ def main():
         help='Days back to search for emails (default: 7)'
     )
     
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch emails added since the last sync (check mode)'
+    )
+    
+    parser.add_argument(
+        '--force-reprocess',
+        action='store_true',
+        help='Reprocess emails in the --hours-back/--days-back range even if already processed'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -221,13 +333,21 @@ def main():
     
     # Run based on mode
     if args.mode == 'check':
-        run_one_time_check(args.hours_back)
+        run_one_time_check(
+            args.hours_back,
+            incremental=args.incremental,
+            force_reprocess=args.force_reprocess
+        )
     elif args.mode == 'search':
-        run_search_and_process(args.days_back)
+        run_search_and_process(args.days_back, force_reprocess=args.force_reprocess)
     elif args.mode == 'summary':
         show_summary()
     elif args.mode == 'schedule':
         run_scheduler()
+    elif args.mode == 'train-classifier':
+        run_train_classifier()
+    elif args.mode == 'migrate-notes':
+        run_migrate_notes()
     elif args.mode == 'interactive':
         interactive_mode()
 
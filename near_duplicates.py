@@ -0,0 +1,227 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import Config
+from text_compaction import compact_email_body
+
+
+FINGERPRINT_BITS = 64
+
+# Volatile details (links, dates, counts, ids) are masked so they don't change the fingerprint
+URL_PATTERN = re.compile(r'https?://\S+')
+NUMBER_PATTERN = re.compile(r'\d+')
+WORD_PATTERN = re.compile(r"[a-z#][a-z0-9#'-]*")
+
+
+def _hash64(text: str) -> int:
+    """Stable 64-bit hash of a shingle"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(features: List[str]) -> int:
+    """64-bit SimHash: similar feature lists give fingerprints a small Hamming distance apart"""
+    counts = [0] * FINGERPRINT_BITS
+    for feature in features:
+        value = _hash64(feature)
+        for bit in range(FINGERPRINT_BITS):
+            counts[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+def email_tokens(email_data: Dict) -> List[str]:
+    """Normalized words of the subject and the compacted body"""
+    body = compact_email_body(email_data.get('body', ''), Config.ANALYSIS_BODY_TOKEN_BUDGET)
+    text = f"{email_data.get('subject', '')}\n{body}".lower()
+    text = NUMBER_PATTERN.sub('#', URL_PATTERN.sub(' url ', text))
+    return WORD_PATTERN.findall(text)
+
+
+def sender_domain(email_data: Dict) -> str:
+    """Lowercase domain of the email's sender"""
+    sender = (email_data.get('sender') or '').lower()
+    return sender.split('@')[-1].split('>')[0].strip() if '@' in sender else sender
+
+
+class NearDuplicateIndex:
+    """Rolling index of recent email fingerprints and the analyses they received.
+
+    Emails are fingerprinted with SimHash over word 3-gram shingles of the
+    normalized subject and body. A later email from the same sender domain whose
+    fingerprint is within `max_distance` bits reuses the stored analysis; analyses
+    that found a job-related email need the stricter `job_max_distance`, since a
+    loose match there could copy the wrong company onto the new email. The
+    index lives in SQLite so it spans runs; lookups use an in-memory band index
+    (split the fingerprint into max_distance + 1 bands: any close match shares
+    at least one band exactly). Entries expire after `ttl_seconds`, and the
+    oldest are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_distance: Optional[int] = None,
+                 job_max_distance: Optional[int] = None, min_tokens: Optional[int] = None,
+                 max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.db_path = db_path or Config.NEAR_DUPLICATE_FILE
+        self.max_distance = max_distance if max_distance is not None else Config.NEAR_DUPLICATE_MAX_DISTANCE
+        self.job_max_distance = min(self.max_distance, job_max_distance if job_max_distance is not None
+                                    else Config.NEAR_DUPLICATE_JOB_MAX_DISTANCE)
+        self.min_tokens = min_tokens if min_tokens is not None else Config.NEAR_DUPLICATE_MIN_TOKENS
+        self.max_entries = max_entries if max_entries is not None else Config.NEAR_DUPLICATE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.NEAR_DUPLICATE_TTL_DAYS * 86400
+        self.stats = {'hits': 0, 'misses': 0, 'unfingerprinted': 0}
+
+        band_count = self.max_distance + 1
+        width = FINGERPRINT_BITS // band_count
+        self._band_ranges = [(i * width, FINGERPRINT_BITS if i == band_count - 1 else (i + 1) * width)
+                             for i in range(band_count)]
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._bands = [{} for _ in self._band_ranges]
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_schema()
+        self._load()
+
+    def _create_schema(self):
+        """Create the fingerprint table if it doesn't exist"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fingerprint TEXT NOT NULL,
+                    sender_domain TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _load(self):
+        """Drop expired rows and load the rest into the band index"""
+        with self._lock:
+            with self.conn:
+                if self.ttl_seconds > 0:
+                    self.conn.execute("DELETE FROM fingerprints WHERE created_at < ?",
+                                      (time.time() - self.ttl_seconds,))
+            rows = self.conn.execute(
+                "SELECT id, fingerprint, sender_domain, analysis, created_at FROM fingerprints ORDER BY id"
+            ).fetchall()
+
+            for entry_id, fingerprint, domain, analysis, created_at in rows:
+                self._index_entry(entry_id, int(fingerprint, 16), domain, analysis, created_at)
+
+    def _bands_of(self, fingerprint: int) -> List[int]:
+        """The fingerprint's value in each band"""
+        return [(fingerprint >> start) & ((1 << (end - start)) - 1) for start, end in self._band_ranges]
+
+    def _index_entry(self, entry_id: int, fingerprint: int, domain: str, analysis: str, created_at: float):
+        """Add one stored entry to the in-memory index (caller holds the lock)"""
+        # The distance allowed for this entry depends on what the stored analysis found
+        allowed = self.job_max_distance if json.loads(analysis).get('is_job_related') else self.max_distance
+        self._entries[entry_id] = (fingerprint, domain, analysis, created_at, allowed)
+        for band, value in zip(self._bands, self._bands_of(fingerprint)):
+            band.setdefault(value, set()).add(entry_id)
+
+    def _unindex_entry(self, entry_id: int):
+        """Remove one entry from the in-memory index (caller holds the lock)"""
+        fingerprint = self._entries.pop(entry_id)[0]
+        for band, value in zip(self._bands, self._bands_of(fingerprint)):
+            ids = band.get(value)
+            if ids:
+                ids.discard(entry_id)
+                if not ids:
+                    del band[value]
+
+    def fingerprint(self, email_data: Dict) -> Optional[int]:
+        """SimHash of the email, or None if it is too short to fingerprint reliably"""
+        tokens = email_tokens(email_data)
+        if len(tokens) < self.min_tokens:
+            return None
+        shingles = [' '.join(tokens[i:i + 3]) for i in range(max(1, len(tokens) - 2))]
+        return simhash(shingles)
+
+    def find(self, email_data: Dict) -> Optional[Dict]:
+        """Analysis of a recent near-duplicate from the same sender domain, or None"""
+        fingerprint = self.fingerprint(email_data)
+        if fingerprint is None:
+            with self._lock:
+                self.stats['unfingerprinted'] += 1
+            return None
+
+        domain = sender_domain(email_data)
+        oldest_allowed = time.time() - self.ttl_seconds if self.ttl_seconds > 0 else 0
+
+        with self._lock:
+            candidates = set()
+            for band, value in zip(self._bands, self._bands_of(fingerprint)):
+                candidates |= band.get(value, set())
+
+            best = None
+            for entry_id in candidates:
+                stored, stored_domain, analysis, created_at, allowed = self._entries[entry_id]
+                if stored_domain != domain or created_at < oldest_allowed:
+                    continue
+                distance = hamming_distance(fingerprint, stored)
+                if distance <= allowed and (best is None or distance < best[0]):
+                    best = (distance, analysis)
+
+            if best is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+
+        return json.loads(best[1])
+
+    def add(self, email_data: Dict, analysis: Dict):
+        """Remember the analysis an email received so near-duplicates can reuse it"""
+        # Interviews, offers and rejections differ in exactly the details a near-match would blur
+        if analysis.get('is_job_related') and analysis.get('email_type') in Config.ANALYSIS_HIGH_STAKES_TYPES:
+            return
+
+        fingerprint = self.fingerprint(email_data)
+        if fingerprint is None:
+            return
+
+        domain = sender_domain(email_data)
+        # Numbers are masked in the fingerprint, so the job id must come from the new email itself
+        stored_analysis = json.dumps({k: v for k, v in analysis.items() if k not in ('analysis_tier', 'job_id')})
+        now = time.time()
+
+        with self._lock:
+            with self.conn:
+                entry_id = self.conn.execute(
+                    "INSERT INTO fingerprints (fingerprint, sender_domain, analysis, created_at) VALUES (?, ?, ?, ?)",
+                    (format(fingerprint, '016x'), domain, stored_analysis, now)
+                ).lastrowid
+                self._index_entry(entry_id, fingerprint, domain, stored_analysis, now)
+
+                if self.max_entries > 0 and len(self._entries) > self.max_entries:
+                    # Ids increase with insertion order, so the smallest are the oldest
+                    evicted = sorted(self._entries)[:len(self._entries) - self.max_entries]
+                    self.conn.executemany("DELETE FROM fingerprints WHERE id = ?", [(i,) for i in evicted])
+                    for old_id in evicted:
+                        self._unindex_entry(old_id)
+
+    def reset_stats(self):
+        """Reset hit/miss counters (e.g. at the start of a run)"""
+        with self._lock:
+            self.stats = {'hits': 0, 'misses': 0, 'unfingerprinted': 0}
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.conn.close()
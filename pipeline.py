@@ -0,0 +1,161 @@
+import heapq
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# Marks the end of the stream on a queue; one per downstream worker
+_END = object()
+
+
+class Stage:
+    """One pipeline step: `workers` threads apply `func` to items from a bounded input queue.
+
+    `func` takes an item and returns the item to pass downstream. Items are never
+    dropped, so an ordered stage downstream can restore the source order: a step
+    that filters should return an empty item rather than nothing. With
+    ordered=True the stage runs on a single thread and sees items in source order.
+    `drain`, if given, is called once after the stage's last item, for a step
+    that has to see the whole stream before acting (e.g. to reorder it).
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, ordered: bool = False,
+                 drain: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.func = func
+        self.workers = 1 if ordered else max(1, workers)
+        self.ordered = ordered
+        self.drain = drain
+
+
+class Pipeline:
+    """Run items from a source through stages connected by bounded queues.
+
+    Each stage's input queue holds at most `queue_size` items, so a slow stage
+    blocks the ones before it (backpressure) instead of letting work pile up in
+    memory, while the network waits of different stages overlap. An exception
+    in a stage is logged and counted; the item continues downstream as None.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4, logger: Optional[logging.Logger] = None):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = {}
+        self.source_error = None
+
+    def run(self, source: Iterable[Any]) -> Dict[str, Dict]:
+        """Feed every item of `source` through the stages; return per-stage stats"""
+        self.stats = {stage.name: {'items': 0, 'errors': 0, 'busy_seconds': 0.0} for stage in self.stages}
+        self.source_error = None
+        stats_lock = threading.Lock()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            downstream_workers = self.stages[index + 1].workers if outbox is not None else 0
+            remaining = [stage.workers]
+
+            def finish(stage=stage, outbox=outbox, downstream_workers=downstream_workers, remaining=remaining):
+                # The last worker of a stage to finish ends the stream for the next stage
+                with stats_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and stage.drain is not None:
+                    self._drain(stage, stats_lock)
+                if last and outbox is not None:
+                    for _ in range(downstream_workers):
+                        outbox.put(_END)
+
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, inbox, outbox, finish, stats_lock),
+                    name=f'{stage.name}-{worker}',
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        first = queues[0]
+        try:
+            for sequence, item in enumerate(source):
+                first.put((sequence, item))
+        except Exception as error:
+            self.logger.error(f"Pipeline source failed, finishing the items already queued: {error}")
+            self.source_error = error
+        finally:
+            for _ in range(self.stages[0].workers):
+                first.put(_END)
+
+        for thread in threads:
+            thread.join()
+        return self.stats
+
+    def _run_worker(self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue],
+                    finish: Callable[[], None], stats_lock: threading.Lock):
+        """Worker loop: process items until the end marker, restoring order for ordered stages"""
+        pending = []
+        next_sequence = 0
+
+        while True:
+            entry = inbox.get()
+            if entry is _END:
+                break
+
+            if not stage.ordered:
+                self._process(stage, entry, outbox, stats_lock)
+                continue
+
+            heapq.heappush(pending, entry)
+            while pending and pending[0][0] == next_sequence:
+                self._process(stage, heapq.heappop(pending), outbox, stats_lock)
+                next_sequence += 1
+
+        # Items never go missing, so this only drains anything left after an upstream failure
+        while pending:
+            self._process(stage, heapq.heappop(pending), outbox, stats_lock)
+
+        finish()
+
+    def _drain(self, stage: Stage, stats_lock: threading.Lock):
+        """Run the stage's end-of-stream step, counting a failure like a failed item"""
+        started = time.perf_counter()
+        error = False
+
+        try:
+            stage.drain()
+        except Exception as exc:
+            self.logger.error(f"Pipeline stage '{stage.name}' failed at the end of the stream: {exc}")
+            error = True
+
+        with stats_lock:
+            stats = self.stats[stage.name]
+            stats['errors'] += int(error)
+            stats['busy_seconds'] += time.perf_counter() - started
+
+    def _process(self, stage: Stage, entry, outbox: Optional[queue.Queue], stats_lock: threading.Lock):
+        """Apply the stage to one item and pass the result on"""
+        sequence, item = entry
+        started = time.perf_counter()
+        error = False
+
+        try:
+            result = stage.func(item) if item is not None else None
+        except Exception as exc:
+            self.logger.error(f"Pipeline stage '{stage.name}' failed on item {sequence}: {exc}")
+            result = None
+            error = True
+
+        with stats_lock:
+            stats = self.stats[stage.name]
+            stats['items'] += 1
+            stats['errors'] += int(error)
+            stats['busy_seconds'] += time.perf_counter() - started
+
+        if outbox is not None:
+            outbox.put((sequence, result))
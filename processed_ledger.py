@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from config import Config
+
+
+class ProcessedLedger:
+    """SQLite ledger of Gmail messages the tracker has already analyzed.
+
+    Entries are keyed by Gmail message id and analysis version, so bumping the
+    analyzer's prompt version makes every message eligible for reprocessing.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.LEDGER_DB_FILE
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the ledger table if it doesn't exist"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS processed_messages (
+                    message_id TEXT NOT NULL,
+                    analysis_version TEXT NOT NULL,
+                    thread_id TEXT,
+                    email_date TEXT,
+                    action TEXT,
+                    processed_at TEXT NOT NULL,
+                    PRIMARY KEY (message_id, analysis_version)
+                )
+                """
+            )
+
+    def is_processed(self, message_id: str, analysis_version: str) -> bool:
+        """Return True if this message was already processed with this analysis version"""
+        if not message_id:
+            return False
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM processed_messages WHERE message_id = ? AND analysis_version = ?",
+                (message_id, analysis_version)
+            ).fetchone()
+        return row is not None
+
+    def mark_processed(self, email: dict, analysis_version: str, action: str):
+        """Record that a message was processed (replaces any earlier entry for the same version)"""
+        message_id = email.get('id')
+        if not message_id:
+            return
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO processed_messages
+                    (message_id, analysis_version, thread_id, email_date, action, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    message_id,
+                    analysis_version,
+                    email.get('thread_id', ''),
+                    email.get('date', ''),
+                    action,
+                    datetime.now().isoformat()
+                )
+            )
+
+    def labeled_messages(self) -> List[Tuple[str, str]]:
+        """Return (message_id, action) for every processed message, latest entry per message"""
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT message_id, action FROM processed_messages
+                ORDER BY processed_at ASC
+                """
+            ).fetchall()
+
+        latest = {}
+        for message_id, action in rows:
+            latest[message_id] = action
+        return list(latest.items())
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.conn.close()
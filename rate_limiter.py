@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Optional
+
+from config import Config
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiter for requests-per-minute and tokens-per-minute budgets.
+
+    Each bucket holds up to one minute of budget and refills continuously. A call to
+    acquire() blocks until both buckets can cover the request. A limit of 0 disables
+    that bucket.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = (requests_per_minute if requests_per_minute is not None
+                                    else Config.OPENAI_REQUESTS_PER_MINUTE)
+        self.tokens_per_minute = (tokens_per_minute if tokens_per_minute is not None
+                                  else Config.OPENAI_TOKENS_PER_MINUTE)
+        self._request_allowance = float(self.requests_per_minute)
+        self._token_allowance = float(self.tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._condition = threading.Condition()
+        self.total_wait_seconds = 0.0
+
+    def _refill(self):
+        """Add the budget accrued since the last refill, capped at one minute's worth"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        if self.requests_per_minute > 0:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute > 0:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def _seconds_until_available(self, tokens: int) -> float:
+        """How long until both buckets can cover one request of `tokens` tokens"""
+        wait = 0.0
+        if self.requests_per_minute > 0 and self._request_allowance < 1:
+            wait = max(wait, (1 - self._request_allowance) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute > 0 and self._token_allowance < tokens:
+            wait = max(wait, (tokens - self._token_allowance) * 60.0 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens: int = 0) -> int:
+        """Block until one request using `tokens` tokens fits in both budgets, then consume it.
+
+        Returns the tokens actually debited, which is less than `tokens` for a
+        request larger than the whole per-minute budget.
+        """
+        if self.tokens_per_minute > 0:
+            # A single request larger than the whole budget would otherwise wait forever
+            tokens = min(tokens, self.tokens_per_minute)
+
+        with self._condition:
+            while True:
+                self._refill()
+                wait = self._seconds_until_available(tokens)
+                if wait <= 0:
+                    break
+                started = time.monotonic()
+                self._condition.wait(timeout=wait)
+                self.total_wait_seconds += time.monotonic() - started
+
+            if self.requests_per_minute > 0:
+                self._request_allowance -= 1
+            if self.tokens_per_minute > 0:
+                self._token_allowance -= tokens
+        return tokens
+
+    def record_usage(self, debited_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the API reports the real usage of a request.
+
+        `debited_tokens` is the amount acquire() returned for the request.
+        """
+        if self.tokens_per_minute <= 0 or not actual_tokens:
+            return
+
+        with self._condition:
+            self._token_allowance += debited_tokens - actual_tokens
+            self._condition.notify_all()
@@ -0,0 +1,121 @@
+from typing import Dict, Optional
+
+from sheets_client import HEADERS, FIELD_COLUMNS, ApplicationIndex
+
+
+class ApplicationReconciler:
+    """Folds every change a run makes to one application into a single sheet write.
+
+    Between begin() and commit(), lookups, new applications and updates go
+    through the reconciler. Changes are applied to in-memory copies of the
+    rows, so each email (handled in chronological order) sees and builds on the
+    state left by earlier emails about the same application. commit() then
+    sends one add or one update per application touched, so sheet traffic
+    scales with applications rather than emails. Outside a run, calls pass
+    straight through to the SheetsClient.
+    """
+
+    def __init__(self, sheets_client):
+        self.sheets = sheets_client
+        self.active = False
+        self.stats = {'emails': 0, 'applications': 0}
+        self._reset()
+
+    def _reset(self):
+        # Staged copies of touched rows: existing rows keep their row number,
+        # new rows get provisional negative numbers until they are added
+        self.staged = ApplicationIndex(list(HEADERS), [])
+        self.changes = {}  # staged row number -> accumulated field updates (all fields for new rows)
+        self.order = []    # staged row numbers in the order they were first touched
+
+    def begin(self):
+        """Start staging changes for a run"""
+        self._reset()
+        self.active = True
+        self.stats = {'emails': 0, 'applications': 0}
+
+    def _staged_copy(self, app: Optional[Dict]) -> Optional[Dict]:
+        """The staged version of a sheet row, if this run already changed it"""
+        if app is not None and app['row_number'] in self.staged.by_row:
+            return self.staged.by_row[app['row_number']]
+        return app
+
+    def find_application_by_job_id(self, job_id: str) -> Optional[Dict]:
+        """Find an application by Job ID, including changes staged in this run"""
+        if not self.active or not job_id:
+            return self.sheets.find_application_by_job_id(job_id)
+        return (self.staged.by_job_id.get(str(job_id).strip())
+                or self._staged_copy(self.sheets.find_application_by_job_id(job_id)))
+
+    def find_application_by_thread_id(self, thread_id: str) -> Optional[Dict]:
+        """Find an application by email thread ID, including changes staged in this run"""
+        if not self.active or not thread_id:
+            return self.sheets.find_application_by_thread_id(thread_id)
+        return (self.staged.by_thread_id.get(thread_id)
+                or self._staged_copy(self.sheets.find_application_by_thread_id(thread_id)))
+
+    def find_application_by_company_position(self, company: str, position: str) -> Optional[Dict]:
+        """Find an application by company and position, including changes staged in this run"""
+        if not self.active:
+            return self.sheets.find_application_by_company_position(company, position)
+        key = ApplicationIndex.company_position_key(company, position)
+        return (self.staged.by_company_position.get(key)
+                or self._staged_copy(self.sheets.find_application_by_company_position(company, position)))
+
+    def add_new_application(self, application_data: Dict) -> bool:
+        """Stage a new application row"""
+        if not self.active:
+            return self.sheets.add_new_application(application_data)
+
+        row_number = -(len(self.changes) + 1)
+        app = {header: '' for header in HEADERS}
+        for field, value in application_data.items():
+            if field in FIELD_COLUMNS and value is not None:
+                app[HEADERS[FIELD_COLUMNS[field]]] = value
+        app['row_number'] = row_number
+
+        self.staged.add(app)
+        self.changes[row_number] = dict(application_data)
+        self.order.append(row_number)
+        self.stats['emails'] += 1
+        return True
+
+    def update_application(self, row_number: int, updates: Dict) -> bool:
+        """Fold updates into the staged copy of a row"""
+        if not self.active:
+            return self.sheets.update_application(row_number, updates)
+
+        if row_number not in self.staged.by_row:
+            original = self.sheets.find_application_by_row(row_number)
+            app = dict(original) if original else {header: '' for header in HEADERS}
+            app['row_number'] = row_number
+            self.staged.add(app)
+            self.changes[row_number] = {}
+            self.order.append(row_number)
+
+        app = self.staged.by_row[row_number]
+        row_values = [app.get(header, '') for header in HEADERS]
+        for field, value in updates.items():
+            if field in FIELD_COLUMNS:
+                row_values[FIELD_COLUMNS[field]] = value
+        self.staged.update(row_number, row_values)
+
+        self.changes[row_number].update(updates)
+        self.stats['emails'] += 1
+        return True
+
+    def commit(self) -> bool:
+        """Send one write per staged application and stop staging. Returns False if any write failed."""
+        success = True
+        for row_number in self.order:
+            changes = self.changes[row_number]
+            if row_number < 0:
+                written = self.sheets.add_new_application(changes)
+            else:
+                written = self.sheets.update_application(row_number, changes)
+            success = success and written
+
+        self.stats['applications'] = len(self.order)
+        self.active = False
+        self._reset()
+        return success
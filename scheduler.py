@@ -37,7 +37,10 @@ class JobTrackerScheduler:
             
             # Process emails from the last interval + buffer
             hours_back = max(1, Config.CHECK_INTERVAL_MINUTES // 60 + 1)
-            results = self.tracker.process_recent_emails(hours_back)
+            results = self.tracker.process_recent_emails(
+                hours_back,
+                incremental=Config.GMAIL_INCREMENTAL_SYNC
+            )
             
             self.logger.info(f"Email check completed: {results}")
             
@@ -22,7 +22,7 @@ WORKSHEET_NAME=Job Applications
 
 # Email Processing Configuration
 CHECK_INTERVAL_MINUTES=30
-MAX_EMAILS_PER_CHECK=50
+MAX_EMAILS_PER_CHECK=0
 
 # Optional: Custom email filters
 # SENDER_WHITELIST=company1.com,company2.com
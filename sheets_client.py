@@ -1,7 +1,9 @@
 import os
+import re
 import pickle
+import hashlib
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -12,6 +14,191 @@ from googleapiclient.errors import HttpError
 from config import Config
 
 
+# Column layout of the tracker worksheet (A:M)
+HEADERS = [
+    'Company',
+    'Position',
+    'Job ID',
+    'Status',
+    'Date Applied',
+    'Last Updated',
+    'Contact Person',
+    'Contact Email',
+    'Job URL',
+    'Salary Range',
+    'Location',
+    'Notes',
+    'Email Thread ID'
+]
+
+# Update field name -> zero-based column index
+FIELD_COLUMNS = {
+    'company': 0,
+    'position': 1,
+    'job_id': 2,
+    'status': 3,
+    'date_applied': 4,
+    'last_updated': 5,
+    'contact_person': 6,
+    'contact_email': 7,
+    'job_url': 8,
+    'salary_range': 9,
+    'location': 10,
+    'notes': 11,
+    'thread_id': 12
+}
+
+# Column layout of the append-only events worksheet (A:J). Application ID and
+# Message ID come first so the keys of recorded events are one narrow read.
+EVENT_HEADERS = [
+    'Application ID',
+    'Message ID',
+    'Company',
+    'Position',
+    'Email Date',
+    'Email Type',
+    'Status',
+    'Details',
+    'Thread ID',
+    'Recorded At'
+]
+
+# Notes entries written by the tracker start with "[email date] Email Type"
+NOTE_ENTRY_BOUNDARY = re.compile(r'\s*\|\s*(?=\[[^\]]*\]\s)')
+NOTE_ENTRY = re.compile(r'\[([^\]]*)\]\s*([^|]*?)\s*(?:\|\s*(.*))?$', re.DOTALL)
+
+
+class ApplicationIndex:
+    """In-memory snapshot of the tracker sheet with hash indexes for O(1) lookups.
+
+    Indexes cover Job ID, Email Thread ID and normalized (company, position).
+    When several rows share a key the first row wins, matching the old linear scans.
+    """
+
+    def __init__(self, headers: List[str], applications: List[Dict]):
+        self.headers = headers or list(HEADERS)
+        self.applications = []
+        self.by_row = {}
+        self.by_job_id = {}
+        self.by_thread_id = {}
+        self.by_company_position = {}
+
+        for app in applications:
+            self.add(app)
+
+    @staticmethod
+    def company_position_key(company: str, position: str) -> tuple:
+        """Normalized (company, position) key used for duplicate detection"""
+        return (str(company or '').strip().lower(), str(position or '').strip().lower())
+
+    def _index_keys(self, app: Dict) -> List[tuple]:
+        """Return (index, key) pairs for an application row"""
+        keys = []
+
+        job_id = str(app.get('Job ID', '') or '').strip()
+        if job_id:
+            keys.append((self.by_job_id, job_id))
+
+        thread_id = app.get('Email Thread ID', '')
+        if thread_id:
+            keys.append((self.by_thread_id, thread_id))
+
+        keys.append((self.by_company_position,
+                     self.company_position_key(app.get('Company', ''), app.get('Position', ''))))
+        return keys
+
+    def add(self, app: Dict):
+        """Add a row to the snapshot and its indexes"""
+        self.applications.append(app)
+        self.by_row[app['row_number']] = app
+        for index, key in self._index_keys(app):
+            index.setdefault(key, app)
+
+    def update(self, row_number: int, row_values: List[str]):
+        """Replace a row's values in place and re-index it"""
+        app = self.by_row.get(row_number)
+        if app is None:
+            return
+
+        for index, key in self._index_keys(app):
+            if index.get(key) is app:
+                del index[key]
+
+        for i, value in enumerate(row_values):
+            header = self.headers[i] if i < len(self.headers) else HEADERS[i]
+            app[header] = value
+
+        for index, key in self._index_keys(app):
+            index.setdefault(key, app)
+
+    def renumber(self, row_mapping: Dict[int, int]):
+        """Move rows to the row numbers the sheet actually assigned them"""
+        moved = [(self.by_row.pop(old_row), new_row)
+                 for old_row, new_row in row_mapping.items() if old_row in self.by_row]
+        for app, new_row in moved:
+            app['row_number'] = new_row
+            self.by_row[new_row] = app
+
+
+def column_letter(column: int) -> str:
+    """A1 column letter for a zero-based column index within A:Z"""
+    return chr(ord('A') + column)
+
+
+def application_id(company: str, position: str) -> str:
+    """Stable id linking events to an application, derived from its normalized company and position"""
+    key = '|'.join(ApplicationIndex.company_position_key(company, position))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+def split_notes(notes: str) -> List[Dict]:
+    """Split a Notes cell of concatenated per-email notes into its entries, oldest first.
+
+    Each entry has the original 'text' and its 'date', 'type' and 'details';
+    text without a "[date] Type" header is kept whole as details.
+    """
+    entries = []
+    for text in NOTE_ENTRY_BOUNDARY.split(str(notes or '').strip()):
+        text = text.strip(' |')
+        if not text:
+            continue
+        match = NOTE_ENTRY.match(text)
+        if match:
+            entries.append({'text': text, 'date': match.group(1).strip(), 'type': match.group(2),
+                            'details': match.group(3) or ''})
+        else:
+            entries.append({'text': text, 'date': '', 'type': '', 'details': text})
+    return entries
+
+
+class WriteBuffer:
+    """Pending sheet mutations, keyed by row number so repeated writes coalesce"""
+
+    def __init__(self):
+        self.updates = {}   # existing row number -> {column index: new value} for changed cells only
+        self.expected = {}  # existing row number -> {column index: value in the snapshot before this batch}
+        self.appends = {}   # provisional (negative) row number -> full A:M values for new rows, in append order
+        self.events = []    # rows for the events worksheet, in the order they were recorded
+        self.failed = False # set once any flush of this batch fails; cleared buffers can't be retried
+
+    def __len__(self) -> int:
+        return len(self.updates) + len(self.appends) + len(self.events)
+
+    def next_provisional_row(self) -> int:
+        """Placeholder row number for a new row until its append reports the real one.
+
+        Placeholders are negative (-1, -2, ...) so they can never be mistaken
+        for an existing row, even after a failed flush has dropped the snapshot.
+        """
+        return min(self.appends, default=0) - 1
+
+    def clear(self):
+        self.updates.clear()
+        self.expected.clear()
+        self.appends.clear()
+        self.events.clear()
+
+
 class SheetsClient:
     """Google Sheets API client for managing job application data"""
     
@@ -19,8 +206,15 @@ class SheetsClient:
         self.service = None
         self.spreadsheet_id = Config.SPREADSHEET_ID
         self.worksheet_name = Config.WORKSHEET_NAME
+        self.events_worksheet_name = Config.EVENTS_WORKSHEET_NAME
+        self.index = None
+        self._forget_events()
+        self.write_buffer = None
+        self.write_stats = self._empty_write_stats()
         self.authenticate()
         self.setup_headers()
+        if Config.EVENTS_LOG:
+            self.setup_events_sheet()
     
     def authenticate(self):
         """Authenticate with Google Sheets API"""
@@ -55,21 +249,7 @@ class SheetsClient:
     
     def setup_headers(self):
         """Setup the header row if it doesn't exist"""
-        headers = [
-            'Company',
-            'Position',
-            'Job ID',
-            'Status',
-            'Date Applied',
-            'Last Updated',
-            'Contact Person',
-            'Contact Email',
-            'Job URL',
-            'Salary Range',
-            'Location',
-            'Notes',
-            'Email Thread ID'
-        ]
+        headers = list(HEADERS)
         
         try:
             # Ensure worksheet exists and safely quote the name for ranges
@@ -115,6 +295,28 @@ class SheetsClient:
             except HttpError as e2:
                 print(f'Failed to create worksheet or write headers: {e2}')
 
+    def setup_events_sheet(self):
+        """Create the events worksheet and its header row if they don't exist"""
+        try:
+            self._ensure_worksheet_exists(self.events_worksheet_name)
+            safe_name = self._quote_sheet_name(self.events_worksheet_name)
+
+            result = self.service.spreadsheets().values().get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{safe_name}!A1:J1"
+            ).execute()
+
+            if not result.get('values', []):
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{safe_name}!A1:J1",
+                    valueInputOption='RAW',
+                    body={'values': [list(EVENT_HEADERS)]}
+                ).execute()
+                print("Headers created in events worksheet")
+
+        except HttpError as error:
+            print(f'An error occurred while setting up the events worksheet: {error}')
 
     def _quote_sheet_name(self, name: str) -> str:
         """Return a safely quoted worksheet name for use in A1 ranges.
@@ -157,7 +359,10 @@ class SheetsClient:
             print(f'Error ensuring worksheet exists: {e}')
     
     def get_all_applications(self) -> List[Dict]:
-        """Get all job applications from the spreadsheet"""
+        """Get all job applications from the spreadsheet
+
+        Every call reads the sheet and rebuilds the in-memory index.
+        """
         try:
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
@@ -167,6 +372,7 @@ class SheetsClient:
             values = result.get('values', [])
             
             if not values:
+                self.index = ApplicationIndex(list(HEADERS), [])
                 return []
             
             headers = values[0]
@@ -180,44 +386,57 @@ class SheetsClient:
                 app_data['row_number'] = i
                 applications.append(app_data)
             
-            return applications
+            self.index = ApplicationIndex(headers, applications)
+            return list(self.index.applications)
             
         except HttpError as error:
             print(f'An error occurred while getting applications: {error}')
             return []
+
+    def invalidate_index(self):
+        """Drop the sheet snapshot and known event keys so the next lookup reloads them (once per processing run)"""
+        self.index = None
+        self._forget_events()
+
+    def _forget_events(self):
+        """Drop the known event keys and the event histories loaded or recorded so far"""
+        self._event_keys = None
+        # Sheet rows of each application's events, from the same read as the keys
+        self._event_rows = {}
+        # Events of the applications looked up or touched in this run
+        self._event_history = {}
+
+    def _get_index(self) -> ApplicationIndex:
+        """Return the cached snapshot, loading it on first use"""
+        if self.index is None:
+            self.get_all_applications()
+        if self.index is None:
+            # The read failed; fall back to an empty snapshot until the next refresh
+            return ApplicationIndex(list(HEADERS), [])
+        return self.index
     
     def find_application_by_company_position(self, company: str, position: str) -> Optional[Dict]:
         """Find an existing application by company and position"""
-        applications = self.get_all_applications()
-        
-        for app in applications:
-            if (app.get('Company', '').lower() == company.lower() and 
-                app.get('Position', '').lower() == position.lower()):
-                return app
-        
-        return None
+        key = ApplicationIndex.company_position_key(company, position)
+        return self._get_index().by_company_position.get(key)
     
     def find_application_by_thread_id(self, thread_id: str) -> Optional[Dict]:
         """Find an existing application by email thread ID"""
-        applications = self.get_all_applications()
-        
-        for app in applications:
-            if app.get('Email Thread ID', '') == thread_id:
-                return app
-        
-        return None
+        if not thread_id:
+            return None
+
+        return self._get_index().by_thread_id.get(thread_id)
 
     def find_application_by_job_id(self, job_id: str) -> Optional[Dict]:
         """Find an existing application by Job ID"""
         if not job_id:
             return None
 
-        applications = self.get_all_applications()
-        for app in applications:
-            if str(app.get('Job ID', '')).strip() == str(job_id).strip():
-                return app
-
-        return None
+        return self._get_index().by_job_id.get(str(job_id).strip())
+    
+    def find_application_by_row(self, row_number: int) -> Optional[Dict]:
+        """Find an existing application by its sheet row number"""
+        return self._get_index().by_row.get(row_number)
     
     def add_new_application(self, application_data: Dict) -> bool:
         """Add a new job application to the spreadsheet"""
@@ -238,20 +457,30 @@ class SheetsClient:
                 application_data.get('notes', ''),
                 application_data.get('thread_id', '')
             ]
+            row_data = ['' if value is None else value for value in row_data]
             
-            # Find the next empty row
-            applications = self.get_all_applications()
-            next_row = len(applications) + 2  # +2 because of header row and 1-based indexing
+            if self.write_buffer is not None:
+                # Provisional row number; corrected from the append response on flush
+                row_number = self.write_buffer.next_provisional_row()
+                self.write_buffer.appends[row_number] = row_data
+            else:
+                # Append after the last row of the table; Sheets reports where it landed
+                response = self.service.spreadsheets().values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{self._quote_sheet_name(self.worksheet_name)}!A:M",
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': [row_data]}
+                ).execute()
+                row_number = self._first_row_of_range(response.get('updates', {}).get('updatedRange', ''))
             
-            # Add the new row
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"{self._quote_sheet_name(self.worksheet_name)}!A{next_row}:M{next_row}",
-                valueInputOption='RAW',
-                body={'values': [row_data]}
-            ).execute()
+            if self.index is not None and row_number:
+                app_data = dict(zip(self.index.headers, row_data))
+                app_data['row_number'] = row_number
+                self.index.add(app_data)
             
             print(f"Added new application: {application_data.get('company')} - {application_data.get('position')}")
+            self._flush_if_full()
             return True
             
         except HttpError as error:
@@ -259,68 +488,451 @@ class SheetsClient:
             return False
     
     def update_application(self, row_number: int, updates: Dict) -> bool:
-        """Update an existing application"""
+        """Update an existing application, writing only the cells whose value changes.
+
+        Changes are diffed against the cached snapshot of the row; Last Updated is
+        set whenever anything else changes. See _write_cells for how cells edited
+        in the sheet since the snapshot was taken are protected.
+        """
         try:
-            # Get current row data
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"{self._quote_sheet_name(self.worksheet_name)}!A{row_number}:M{row_number}"
-            ).execute()
+            current_row = self._current_row_values(row_number)
             
-            current_row = result.get('values', [[]])[0]
+            # Only cells whose value actually changes
+            changes = {}
+            for field, value in updates.items():
+                if field in FIELD_COLUMNS:
+                    column = FIELD_COLUMNS[field]
+                    value = '' if value is None else value
+                    if str(current_row[column]) != str(value):
+                        changes[column] = value
             
-            # Pad with empty strings if needed
-            while len(current_row) < 13:
-                current_row.append('')
+            if not changes:
+                return True
             
-            # Update specific fields
-            field_mapping = {
-                'company': 0,
-                'position': 1,
-                'job_id': 2,
-                'status': 3,
-                'date_applied': 4,
-                'last_updated': 5,
-                'contact_person': 6,
-                'contact_email': 7,
-                'job_url': 8,
-                'salary_range': 9,
-                'location': 10,
-                'notes': 11,
-                'thread_id': 12
-            }
+            # Always update the last_updated field
+            changes[FIELD_COLUMNS['last_updated']] = datetime.now().strftime('%Y-%m-%d %H:%M')
             
-            for field, value in updates.items():
-                if field in field_mapping:
-                    current_row[field_mapping[field]] = value
+            new_row = list(current_row)
+            for column, value in changes.items():
+                new_row[column] = value
             
-            # Always update the last_updated field
-            current_row[5] = datetime.now().strftime('%Y-%m-%d %H:%M')
+            if self.write_buffer is not None:
+                # Later updates to the same row merge with earlier ones; a row added in
+                # this batch is patched in place before it is ever appended
+                if row_number in self.write_buffer.appends:
+                    self.write_buffer.appends[row_number] = new_row
+                else:
+                    self.write_buffer.updates.setdefault(row_number, {}).update(changes)
+                    expected = self.write_buffer.expected.setdefault(row_number, {})
+                    for column in changes:
+                        expected.setdefault(column, current_row[column])
+            else:
+                if not self._write_cells({row_number: changes},
+                                         {row_number: {column: current_row[column] for column in changes}}):
+                    return False
             
-            # Update the row
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"{self._quote_sheet_name(self.worksheet_name)}!A{row_number}:M{row_number}",
-                valueInputOption='RAW',
-                body={'values': [current_row]}
-            ).execute()
+            if self.index is not None:
+                self.index.update(row_number, new_row)
             
             print(f"Updated application in row {row_number}")
+            self._flush_if_full()
             return True
             
         except HttpError as error:
             print(f'An error occurred while updating application: {error}')
             return False
+
+    def _write_cells(self, changes: Dict[int, Dict[int, Any]], expected: Dict[int, Dict[int, Any]]) -> bool:
+        """Write changed cells as minimal ranges in one values.batchUpdate.
+
+        With Config.SHEETS_PROTECT_MANUAL_EDITS the target cells are read first
+        (one values.batchGet), and any cell whose sheet value no longer matches
+        `expected`, the value our snapshot had, was edited by someone else since
+        and is left alone. Raises HttpError.
+        """
+        if Config.SHEETS_PROTECT_MANUAL_EDITS:
+            changes = self._drop_manual_edits(changes, expected)
+
+        safe_name = self._quote_sheet_name(self.worksheet_name)
+        data = []
+        for row_number, cells in sorted(changes.items()):
+            # Adjacent changed cells share one range
+            columns = sorted(cells)
+            run = [columns[0]]
+            for column in columns[1:] + [None]:
+                if column is not None and column == run[-1] + 1:
+                    run.append(column)
+                    continue
+                data.append({
+                    'range': f"{safe_name}!{column_letter(run[0])}{row_number}:{column_letter(run[-1])}{row_number}",
+                    'values': [[cells[c] for c in run]]
+                })
+                run = [column]
+
+        if not data:
+            return True
+
+        self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={'valueInputOption': 'RAW', 'data': data}
+        ).execute()
+        self.write_stats['ranges'] += len(data)
+        self.write_stats['cells'] += sum(len(item['values'][0]) for item in data)
+        return True
+
+    def _drop_manual_edits(self, changes: Dict[int, Dict[int, Any]],
+                           expected: Dict[int, Dict[int, Any]]) -> Dict[int, Dict[int, Any]]:
+        """Remove cells whose live value differs from what the snapshot expected"""
+        safe_name = self._quote_sheet_name(self.worksheet_name)
+        rows = sorted(changes)
+        ranges = [f"{safe_name}!{column_letter(min(changes[r]))}{r}:{column_letter(max(changes[r]))}{r}"
+                  for r in rows]
+        response = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=ranges
+        ).execute()
+
+        last_updated = FIELD_COLUMNS['last_updated']
+        kept = {}
+        for row_number, value_range in zip(rows, response.get('valueRanges', [])):
+            first_column = min(changes[row_number])
+            live_values = (value_range.get('values') or [[]])[0]
+            cells = {}
+            for column, value in changes[row_number].items():
+                offset = column - first_column
+                live = live_values[offset] if offset < len(live_values) else ''
+                if column == last_updated or str(live) == str(expected.get(row_number, {}).get(column, '')):
+                    cells[column] = value
+                    continue
+                self.write_stats['kept_manual_edits'] += 1
+                print(f"Keeping manual edit in {column_letter(column)}{row_number}: {live!r}")
+                # The sheet's value wins; keep the snapshot in step with it
+                if self.index is not None and row_number in self.index.by_row:
+                    self.index.by_row[row_number][HEADERS[column]] = live
+
+            # Nothing left but the timestamp: the row stays as the editor left it
+            if set(cells) - {last_updated}:
+                kept[row_number] = cells
+        return kept
+
+    def _current_row_values(self, row_number: int) -> List[str]:
+        """Return the current A:M values of a row, preferring buffered and cached copies"""
+        if self.write_buffer is not None and row_number in self.write_buffer.appends:
+            return list(self.write_buffer.appends[row_number])
+
+        if self.index is not None and row_number in self.index.by_row:
+            app = self.index.by_row[row_number]
+            current_row = [app.get(header, '') for header in self.index.headers[:len(HEADERS)]]
+        else:
+            result = self.service.spreadsheets().values().get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{self._quote_sheet_name(self.worksheet_name)}!A{row_number}:M{row_number}"
+            ).execute()
+            current_row = result.get('values', [[]])[0]
+        
+        # Pad with empty strings if needed
+        while len(current_row) < len(HEADERS):
+            current_row.append('')
+        
+        # The snapshot already includes buffered changes; a fresh read doesn't yet
+        if self.write_buffer is not None and self.index is None:
+            for column, value in self.write_buffer.updates.get(row_number, {}).items():
+                current_row[column] = value
+        
+        return current_row
+
+    def add_event(self, event: Dict) -> bool:
+        """Record one email in the application's history on the events worksheet.
+
+        Events are keyed by (application id, message id): an event already in the
+        worksheet is skipped, so reprocessing an email doesn't repeat its history.
+        Appends are buffered like row writes during a write batch.
+        """
+        try:
+            row = self._event_row(event)
+            key = (row[0], row[1])
+            keys = self._get_event_keys()
+            if row[1]:
+                if key in keys:
+                    self.write_stats['duplicate_events'] += 1
+                    return True
+                keys.add(key)
+            self._load_event_history(row[0]).append({'date': row[4], 'type': row[5], 'details': row[7]})
+
+            if self.write_buffer is not None:
+                self.write_buffer.events.append(row)
+                self._flush_if_full()
+            else:
+                self._append_events([row])
+            return True
+
+        except HttpError as error:
+            print(f'An error occurred while recording event: {error}')
+            # The key may have been noted without the row being written
+            self._forget_events()
+            return False
+
+    def _event_row(self, event: Dict) -> List[str]:
+        """A:J values of the events worksheet for an event dict"""
+        row = [
+            event.get('application_id') or application_id(event.get('company'), event.get('position')),
+            event.get('message_id', ''),
+            event.get('company', ''),
+            event.get('position', ''),
+            event.get('email_date', ''),
+            event.get('email_type', ''),
+            event.get('status', ''),
+            event.get('details', ''),
+            event.get('thread_id', ''),
+            datetime.now().strftime('%Y-%m-%d %H:%M')
+        ]
+        return ['' if value is None else value for value in row]
+
+    def _get_event_keys(self) -> set:
+        """(application id, message id) of every recorded event, read once per run. Raises HttpError.
+
+        Only the two key columns are read; the same read notes the sheet rows of
+        each application's events for _load_event_history.
+        """
+        if self._event_keys is None:
+            result = self.service.spreadsheets().values().get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{self._quote_sheet_name(self.events_worksheet_name)}!A2:B"
+            ).execute()
+            keys = set()
+            rows = {}
+            for row_number, row in enumerate(result.get('values', []), start=2):
+                row = row + [''] * (2 - len(row))
+                if row[1]:
+                    keys.add((row[0], row[1]))
+                rows.setdefault(row[0], []).append(row_number)
+            self._event_keys = keys
+            self._event_rows = rows
+            self._event_history = {}
+        return self._event_keys
+
+    def _load_event_history(self, app_id: str) -> List[Dict]:
+        """Events of one application, read on first use in a run. Raises HttpError.
+
+        Reads only that application's rows (Email Date to Details, one range per
+        run of adjacent rows); events recorded later in the run are appended to
+        the returned list.
+        """
+        self._get_event_keys()
+        if app_id not in self._event_history:
+            events = []
+            row_numbers = self._event_rows.get(app_id, [])
+            if row_numbers:
+                safe_name = self._quote_sheet_name(self.events_worksheet_name)
+                spans = []
+                for row_number in row_numbers:
+                    if spans and spans[-1][1] == row_number - 1:
+                        spans[-1][1] = row_number
+                    else:
+                        spans.append([row_number, row_number])
+                response = self.service.spreadsheets().values().batchGet(
+                    spreadsheetId=self.spreadsheet_id,
+                    ranges=[f"{safe_name}!E{first}:H{last}" for first, last in spans]
+                ).execute()
+                for value_range in response.get('valueRanges', []):
+                    for row in value_range.get('values', []):
+                        row = row + [''] * (4 - len(row))
+                        events.append({'date': row[0], 'type': row[1], 'details': row[3]})
+            self._event_history[app_id] = events
+        return self._event_history[app_id]
+
+    def event_history(self, company: str, position: str) -> List[Dict]:
+        """Recorded events of an application, including ones buffered in this run, oldest first"""
+        try:
+            return list(self._load_event_history(application_id(company, position)))
+        except HttpError as error:
+            print(f'An error occurred while reading events: {error}')
+            return []
+
+    def _append_events(self, rows: List[List[str]]):
+        """Append rows to the events worksheet in one call. Raises HttpError."""
+        self.service.spreadsheets().values().append(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"{self._quote_sheet_name(self.events_worksheet_name)}!A:J",
+            valueInputOption='RAW',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ).execute()
+        self.write_stats['events'] += len(rows)
+
+    def migrate_notes_to_events(self) -> Dict:
+        """Move the history accumulated in Notes cells to the events worksheet (one-time).
+
+        Each "[date] Type | ..." entry of a row's Notes becomes an event with
+        message id 'notes-<n>', so running it again adds nothing. Entries whose
+        date and type the application already has an event for (a Notes cell
+        written with EVENTS_LOG on) are skipped. The cell is then cut down to
+        its latest entry.
+        """
+        self.setup_events_sheet()
+        self.reset_write_stats()
+        notes_column = FIELD_COLUMNS['notes']
+        events = []
+        changes = {}
+        expected = {}
+
+        try:
+            keys, recorded_types = self._read_all_events()
+            for app in self.get_all_applications():
+                entries = split_notes(app.get('Notes', ''))
+                app_id = application_id(app.get('Company'), app.get('Position'))
+                recorded = recorded_types.get(app_id, set())
+
+                for number, entry in enumerate(entries, start=1):
+                    message_id = f'notes-{number}'
+                    if (app_id, message_id) in keys or (entry['date'], entry['type']) in recorded:
+                        continue
+                    keys.add((app_id, message_id))
+                    events.append(self._event_row({
+                        'application_id': app_id,
+                        'message_id': message_id,
+                        'company': app.get('Company', ''),
+                        'position': app.get('Position', ''),
+                        'email_date': entry['date'],
+                        'email_type': entry['type'],
+                        'details': entry['details'],
+                        'thread_id': app.get('Email Thread ID', '')
+                    }))
+
+                if len(entries) > 1:
+                    changes[app['row_number']] = {notes_column: entries[-1]['text']}
+                    expected[app['row_number']] = {notes_column: app.get('Notes', '')}
+
+            # History first, so an interrupted migration never loses an entry
+            if events:
+                self._append_events(events)
+            if changes:
+                self._write_cells(changes, expected)
+
+        except HttpError as error:
+            print(f'An error occurred while migrating notes: {error}')
+        # Migrated events aren't in the per-run caches; reload them on next use
+        self._forget_events()
+
+        print(f"Migrated notes: {self.write_stats['events']} events recorded, "
+              f"{self.write_stats['cells']} Notes cells shortened")
+        return {
+            'events': self.write_stats['events'],
+            'notes_shortened': self.write_stats['cells'],
+            'kept_manual_edits': self.write_stats['kept_manual_edits']
+        }
+
+    def _read_all_events(self) -> Tuple[set, Dict[str, set]]:
+        """Keys of every recorded event and each application's (date, type) pairs, in one full read. Raises HttpError."""
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"{self._quote_sheet_name(self.events_worksheet_name)}!A2:F"
+        ).execute()
+        keys = set()
+        recorded = {}
+        for row in result.get('values', []):
+            row = row + [''] * (6 - len(row))
+            if row[1]:
+                keys.add((row[0], row[1]))
+            recorded.setdefault(row[0], set()).add((row[4], row[5]))
+        return keys, recorded
+
+    def _first_row_of_range(self, a1_range: str) -> Optional[int]:
+        """Return the first row number of an A1 range like 'Sheet'!A12:M14"""
+        match = re.search(r'![A-Z]+(\d+)', a1_range or '')
+        if match:
+            return int(match.group(1))
+        return None
+
+    def begin_write_batch(self):
+        """Start buffering adds and updates until end_write_batch (or the size threshold)"""
+        if self.write_buffer is None:
+            self.write_buffer = WriteBuffer()
+
+    def end_write_batch(self) -> bool:
+        """Flush buffered writes and stop buffering. Returns False if this or any earlier flush of the batch failed."""
+        success = self.flush_writes() and not (self.write_buffer is not None and self.write_buffer.failed)
+        self.write_buffer = None
+        return success
+
+    def _flush_if_full(self):
+        """Flush early once the buffer reaches Config.SHEETS_FLUSH_THRESHOLD rows"""
+        if self.write_buffer is not None and len(self.write_buffer) >= Config.SHEETS_FLUSH_THRESHOLD:
+            self.flush_writes()
+
+    def flush_writes(self) -> bool:
+        """Send buffered cell updates in one values.batchUpdate and new rows in one append"""
+        buffer = self.write_buffer
+        if buffer is None or not len(buffer):
+            return True
+
+        safe_name = self._quote_sheet_name(self.worksheet_name)
+        success = True
+
+        try:
+            if buffer.updates:
+                self._write_cells(buffer.updates, buffer.expected)
+
+            if buffer.appends:
+                provisional_rows = list(buffer.appends)
+                response = self.service.spreadsheets().values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{safe_name}!A:M",
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': [buffer.appends[row_number] for row_number in provisional_rows]}
+                ).execute()
+
+                # Rows land contiguously from the reported start row
+                first_row = self._first_row_of_range(response.get('updates', {}).get('updatedRange', ''))
+                if first_row and self.index is not None:
+                    self.index.renumber({
+                        provisional_row: first_row + offset
+                        for offset, provisional_row in enumerate(provisional_rows)
+                    })
+
+            if buffer.events:
+                self._append_events(buffer.events)
+
+            print(f"Flushed {len(buffer.updates)} row updates, {len(buffer.appends)} new rows "
+                  f"and {len(buffer.events)} events")
+
+        except HttpError as error:
+            print(f'An error occurred while flushing buffered writes: {error}')
+            # The snapshot no longer matches the sheet; reload it on next use
+            self.index = None
+            self._forget_events()
+            buffer.failed = True
+            success = False
+
+        buffer.clear()
+        return success
+    
+    def reset_write_stats(self):
+        """Reset cell write counters (e.g. at the start of a run)"""
+        self.write_stats = self._empty_write_stats()
+
+    @staticmethod
+    def _empty_write_stats() -> Dict:
+        """Fresh counters of cells, ranges and events written and manual edits left alone"""
+        return {'cells': 0, 'ranges': 0, 'kept_manual_edits': 0, 'events': 0, 'duplicate_events': 0}
     
     def update_application_status(self, company: str, position: str, new_status: str, notes: str = '') -> bool:
         """Update the status of an existing application"""
         application = self.find_application_by_company_position(company, position)
         
         if application:
-            updates = {
-                'status': new_status,
-                'notes': f"{application.get('Notes', '')} | {notes}".strip(' |')
-            }
+            if Config.EVENTS_LOG:
+                # History goes to the events worksheet; the row keeps the latest note
+                if notes:
+                    self.add_event({'company': company, 'position': position, 'status': new_status,
+                                    'details': notes, 'thread_id': application.get('Email Thread ID', '')})
+                updates = {'status': new_status, 'notes': notes or application.get('Notes', '')}
+            else:
+                updates = {
+                    'status': new_status,
+                    'notes': f"{application.get('Notes', '')} | {notes}".strip(' |')
+                }
             return self.update_application(application['row_number'], updates)
         else:
             print(f"Application not found: {company} - {position}")
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from config import Config
+
+
+# Transition outcomes
+ADVANCE = 'advanced'        # moves the application forward, or closes it
+REDUNDANT = 'redundant'     # same status as the sheet already has
+REGRESSION = 'regressive'   # would move it backwards or reopen a closed application
+NO_STATUS = 'no_status'     # the email carries no recognizable status
+
+
+def status_rank(status: Optional[str]) -> Optional[int]:
+    """Position of a status in the hiring progression, None for terminal or unknown statuses.
+
+    The progression is Config.JOB_STATUSES in order, leaving out Config.TERMINAL_JOB_STATUSES.
+    """
+    progression = [s for s in Config.JOB_STATUSES if s not in Config.TERMINAL_JOB_STATUSES]
+    try:
+        return progression.index(status)
+    except ValueError:
+        return None
+
+
+def classify_transition(current: Optional[str], new: Optional[str]) -> str:
+    """Classify moving an application from status `current` to `new`.
+
+    Statuses only move forward through the progression (Applied -> ... -> Offer).
+    A terminal status (Rejected, Withdrawn) can be reached from any open
+    status, but nothing leaves it. A late "application received" reminder
+    therefore can't flip an Offer back to Applied. An empty or hand-typed
+    current status that isn't in Config.JOB_STATUSES can be replaced by any status.
+    """
+    if not new or new not in Config.JOB_STATUSES:
+        return NO_STATUS
+
+    current = (current or '').strip()
+    if current == new:
+        return REDUNDANT
+    if current not in Config.JOB_STATUSES:
+        return ADVANCE
+    if current in Config.TERMINAL_JOB_STATUSES:
+        return REGRESSION
+    if new in Config.TERMINAL_JOB_STATUSES:
+        return ADVANCE
+
+    return ADVANCE if status_rank(new) > status_rank(current) else REGRESSION
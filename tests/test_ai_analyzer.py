@@ -0,0 +1,119 @@
+import unittest
+from unittest import mock
+
+from ai_analyzer import JobEmailAnalyzer
+from analysis_cache import AnalysisCache
+from config import Config
+
+
+def make_analyzer(tiers):
+    """Analyzer without an OpenAI client, cache or near-duplicate index; tests replace _run_tier"""
+    with mock.patch('ai_analyzer.openai.OpenAI'), \
+            mock.patch.object(Config, 'ANALYSIS_CACHE_ENABLED', False), \
+            mock.patch.object(Config, 'NEAR_DUPLICATE_ENABLED', False):
+        analyzer = JobEmailAnalyzer()
+    analyzer.tiers = tiers
+    return analyzer
+
+
+def answer(confidence, is_job_related=False, email_type='other'):
+    return {'is_job_related': is_job_related, 'email_type': email_type, 'company_name': None,
+            'position_title': None, 'job_status': None, 'contact_person': None, 'contact_email': None,
+            'key_information': '', 'confidence_score': confidence}
+
+
+EMAIL = {'id': 'm1', 'subject': 'Lunch on Friday?', 'sender': 'friend@example.com', 'body': 'Pizza?'}
+
+
+class DegradedAnalysisTest(unittest.TestCase):
+
+    def test_fallback_answer_is_degraded(self):
+        analyzer = make_analyzer(['gpt-4'])
+        with mock.patch.object(analyzer, '_run_tier', return_value=[None]):
+            analysis = analyzer.analyze_emails_batch([dict(EMAIL)])[0]
+
+        self.assertEqual(analysis['analysis_tier'], 'fallback')
+        self.assertTrue(analysis['degraded'])
+
+    def test_unconfirmed_lower_tier_answer_is_degraded(self):
+        analyzer = make_analyzer(['gpt-4o-mini', 'gpt-4'])
+        # The cheap tier is unsure, and the escalation request fails
+        with mock.patch.object(analyzer, '_run_tier', side_effect=[[answer(0.5)], [None]]):
+            analysis = analyzer.analyze_emails_batch([dict(EMAIL)])[0]
+
+        self.assertEqual(analysis['analysis_tier'], 'gpt-4o-mini')
+        self.assertTrue(analysis['degraded'])
+
+    def test_final_answer_is_not_degraded(self):
+        analyzer = make_analyzer(['gpt-4o-mini', 'gpt-4'])
+        with mock.patch.object(analyzer, '_run_tier', side_effect=[[answer(0.5)], [answer(0.95)]]):
+            analysis = analyzer.analyze_emails_batch([dict(EMAIL)])[0]
+
+        self.assertEqual(analysis['analysis_tier'], 'gpt-4')
+        self.assertFalse(analysis.get('degraded'))
+
+
+class CachedAnalysisTest(unittest.TestCase):
+
+    def make_cached_analyzer(self, tiers):
+        analyzer = make_analyzer(tiers)
+        analyzer.cache = AnalysisCache(':memory:', max_entries=0, ttl_seconds=0)
+        self.addCleanup(analyzer.cache.close)
+        return analyzer
+
+    def test_final_answer_is_reused(self):
+        analyzer = self.make_cached_analyzer(['gpt-4'])
+        with mock.patch.object(analyzer, '_run_tier', return_value=[answer(0.95)]) as run_tier:
+            analyzer.analyze_emails_batch([dict(EMAIL)])
+            analysis = analyzer.analyze_emails_batch([dict(EMAIL)])[0]
+
+        self.assertEqual(run_tier.call_count, 1)
+        self.assertEqual(analysis['analysis_tier'], 'cache')
+
+    def test_degraded_answers_are_not_cached(self):
+        analyzer = self.make_cached_analyzer(['gpt-4o-mini', 'gpt-4'])
+        # The escalation fails both times, so both runs go through the model tiers
+        with mock.patch.object(analyzer, '_run_tier',
+                               side_effect=[[answer(0.5)], [None], [answer(0.5)], [None]]) as run_tier:
+            analyzer.analyze_emails_batch([dict(EMAIL)])
+            analyzer.analyze_emails_batch([dict(EMAIL)])
+
+        self.assertEqual(run_tier.call_count, 4)
+        self.assertEqual(analyzer.cache.stats['hits'], 0)
+
+
+class HeuristicTierTest(unittest.TestCase):
+
+    def test_email_without_job_signal_is_settled_locally(self):
+        analyzer = make_analyzer(['heuristic', 'gpt-4'])
+        with mock.patch.object(analyzer, '_request_analysis') as request:
+            analysis = analyzer.analyze_emails_batch([dict(EMAIL)])[0]
+
+        request.assert_not_called()
+        self.assertEqual(analysis['analysis_tier'], 'heuristic')
+        self.assertFalse(analysis['is_job_related'])
+        self.assertFalse(analysis.get('degraded'))
+
+    def test_job_email_escalates_to_the_model(self):
+        analyzer = make_analyzer(['heuristic', 'gpt-4'])
+        email = {'id': 'm2', 'subject': 'Interview invitation for the Data Engineer position',
+                 'sender': 'talent@acme.com', 'body': 'We would like to schedule an interview.'}
+        with mock.patch.object(analyzer, '_request_analysis', return_value=answer(0.95, True)) as request:
+            analysis = analyzer.analyze_emails_batch([email])[0]
+
+        request.assert_called_once()
+        self.assertEqual(analysis['analysis_tier'], 'gpt-4')
+
+    def test_recruiting_platform_sender_escalates(self):
+        analyzer = make_analyzer(['heuristic', 'gpt-4'])
+        email = dict(EMAIL, sender='no-reply@us.greenhouse-mail.io')
+        with mock.patch.object(Config, 'COMPANY_DOMAINS', ['greenhouse-mail.io']), \
+                mock.patch.object(Config, 'ATS_EXTRACTORS_ENABLED', False), \
+                mock.patch.object(analyzer, '_request_analysis', return_value=answer(0.95)) as request:
+            analyzer.analyze_emails_batch([email])
+
+        request.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from analysis_cache import AnalysisCache
+
+
+class AnalysisCacheTest(unittest.TestCase):
+
+    def make_cache(self, **limits):
+        cache = AnalysisCache(':memory:', **{'max_entries': 0, 'ttl_seconds': 0, **limits})
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_hit_and_miss(self):
+        cache = self.make_cache()
+        key = AnalysisCache.make_key('gpt-4', '3', 'prompt')
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, {'is_job_related': True})
+        self.assertEqual(cache.get(key), {'is_job_related': True})
+        self.assertEqual(cache.stats, {'hits': 1, 'misses': 1, 'evictions': 0})
+
+    def test_key_covers_model_version_and_prompt(self):
+        key = AnalysisCache.make_key('gpt-4', '3', 'prompt')
+        self.assertNotEqual(key, AnalysisCache.make_key('gpt-4o-mini', '3', 'prompt'))
+        self.assertNotEqual(key, AnalysisCache.make_key('gpt-4', '4', 'prompt'))
+        self.assertNotEqual(key, AnalysisCache.make_key('gpt-4', '3', 'prompt '))
+        # Parts are separated, so shifting text between them changes the key
+        self.assertNotEqual(AnalysisCache.make_key('a', 'b', 'cd'), AnalysisCache.make_key('a', 'bc', 'd'))
+
+    def test_expired_entries_miss(self):
+        cache = self.make_cache(ttl_seconds=60)
+        with mock.patch('analysis_cache.time.time', return_value=1000.0):
+            cache.put('k', {'n': 1})
+        with mock.patch('analysis_cache.time.time', return_value=1061.0):
+            self.assertIsNone(cache.get('k'))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        with mock.patch('analysis_cache.time.time', side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.put('a', {'n': 1})
+            cache.put('b', {'n': 2})
+            cache.get('a')
+            cache.put('c', {'n': 3})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats['evictions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
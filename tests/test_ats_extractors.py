@@ -0,0 +1,93 @@
+import unittest
+
+from ats_extractors import find_extractor, sender_company_name
+
+
+GREENHOUSE_CONFIRMATION = {
+    'sender': 'Acme Hiring Team <no-reply@us.greenhouse-mail.io>',
+    'subject': 'Thank you for applying to Acme',
+    'body': ('Hi Sam,\n\nThanks for applying to Acme! We have received your application for the '
+             'Senior Data Engineer position and our team will review it soon.\n\n'
+             'View the job: https://boards.greenhouse.io/acme/jobs/4012345\n')
+}
+
+LEVER_REJECTION = {
+    'sender': 'Beta Corp <no-reply@hire.lever.co>',
+    'subject': 'Your application to Beta Corp',
+    'body': ('Hi Sam,\n\nThank you for your interest in the Product Manager role at Beta Corp. '
+             'Unfortunately, we have decided to move forward with other candidates.\n\n'
+             'https://jobs.lever.co/betacorp/1a2b3c4d-5e6f-7a8b-9c0d-1e2f3a4b5c6d\n')
+}
+
+WORKDAY_CONFIRMATION = {
+    'sender': 'Gamma Careers <gamma@myworkday.com>',
+    'subject': 'We received your application for Data Analyst (R12345)',
+    'body': 'Thank you for your application. Our recruiters will be in touch.'
+}
+
+
+class FindExtractorTest(unittest.TestCase):
+
+    def test_sender_domain_picks_the_platform(self):
+        self.assertEqual(find_extractor(GREENHOUSE_CONFIRMATION).name, 'greenhouse')
+        self.assertEqual(find_extractor(LEVER_REJECTION).name, 'lever')
+        self.assertEqual(find_extractor(WORKDAY_CONFIRMATION).name, 'workday')
+
+    def test_other_senders_have_no_extractor(self):
+        self.assertIsNone(find_extractor({'sender': 'hr@acme.com'}))
+        # Lookalike domains are not subdomains of the platform
+        self.assertIsNone(find_extractor({'sender': 'jobs@notlever.co'}))
+        self.assertIsNone(find_extractor({'sender': ''}))
+
+
+class ExtractTest(unittest.TestCase):
+
+    def extract(self, email):
+        return find_extractor(email).extract(email)
+
+    def test_greenhouse_confirmation(self):
+        analysis = self.extract(GREENHOUSE_CONFIRMATION)
+        self.assertEqual(analysis['email_type'], 'application_confirmation')
+        self.assertEqual(analysis['job_status'], 'Applied')
+        self.assertEqual(analysis['company_name'], 'Acme')
+        self.assertEqual(analysis['position_title'], 'Senior Data Engineer')
+        self.assertEqual(analysis['job_id'], '4012345')
+        self.assertEqual(analysis['job_url'], 'https://boards.greenhouse.io/acme/jobs/4012345')
+
+    def test_lever_rejection(self):
+        analysis = self.extract(LEVER_REJECTION)
+        self.assertEqual(analysis['email_type'], 'rejection')
+        self.assertEqual(analysis['job_status'], 'Rejected')
+        self.assertEqual(analysis['company_name'], 'Beta Corp')
+        self.assertEqual(analysis['position_title'], 'Product Manager')
+        self.assertEqual(analysis['job_id'], '1a2b3c4d-5e6f-7a8b-9c0d-1e2f3a4b5c6d')
+
+    def test_workday_requisition_id(self):
+        analysis = self.extract(WORKDAY_CONFIRMATION)
+        self.assertEqual(analysis['company_name'], 'Gamma')
+        self.assertEqual(analysis['position_title'], 'Data Analyst')
+        self.assertEqual(analysis['job_id'], 'R12345')
+
+    def test_interview_invitation_goes_to_the_model(self):
+        email = dict(GREENHOUSE_CONFIRMATION,
+                     body='Thanks for applying! We would like to invite you to a phone screen.')
+        self.assertIsNone(self.extract(email))
+
+    def test_unrecognized_template_goes_to_the_model(self):
+        email = dict(GREENHOUSE_CONFIRMATION, subject='Quick update', body='Checking in about next week.')
+        self.assertIsNone(self.extract(email))
+
+
+class SenderCompanyNameTest(unittest.TestCase):
+
+    def test_team_suffixes_are_dropped(self):
+        self.assertEqual(sender_company_name('Acme Hiring Team <no-reply@greenhouse.io>'), 'Acme')
+        self.assertEqual(sender_company_name('"Delta Talent Acquisition" <jobs@icims.com>'), 'Delta')
+
+    def test_platform_names_are_not_employers(self):
+        self.assertIsNone(sender_company_name('Greenhouse <no-reply@greenhouse.io>'))
+        self.assertIsNone(sender_company_name('no-reply@greenhouse.io'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from unittest import mock
+
+from gmail_client import GmailClient
+
+
+def make_client():
+    """GmailClient without OAuth; tests replace the API calls they need"""
+    with mock.patch.object(GmailClient, 'authenticate'):
+        return GmailClient()
+
+
+class FetchStatsTest(unittest.TestCase):
+
+    def test_prefiltered_metadata_counts_skipped_without_reset(self):
+        client = make_client()
+        emails = [
+            {'id': 'a', 'subject': 'Interview availability', 'sender': 'hr@acme.com', 'body': ''},
+            {'id': 'b', 'subject': 'Weekly digest', 'sender': 'news@example.com', 'body': ''},
+        ]
+        with mock.patch.object(client, 'get_email_details_batch', return_value=emails):
+            survivors = client.fetch_prefiltered_metadata(['a', 'b'])
+
+        self.assertEqual([email['id'] for email in survivors], ['a'])
+        self.assertEqual(client.fetch_stats['metadata']['skipped'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from job_ids import extract_job_id, extract_job_id_from_text
+
+
+class ExtractJobIdTest(unittest.TestCase):
+
+    def test_labeled_ids(self):
+        self.assertEqual(extract_job_id_from_text('Job ID: 12345'), '12345')
+        self.assertEqual(extract_job_id_from_text('Requisition #R-6789 has been filled'), 'R-6789')
+        self.assertEqual(extract_job_id_from_text('Req ID 9876'), '9876')
+        self.assertEqual(extract_job_id_from_text('Senior Data Analyst (JR-004512)'), 'JR-004512')
+
+    def test_words_without_digits_are_not_ids(self):
+        self.assertIsNone(extract_job_id_from_text('Job reference required for your application'))
+        self.assertIsNone(extract_job_id_from_text(''))
+
+    def test_ids_in_job_board_links(self):
+        self.assertEqual(extract_job_id_from_text('Apply: https://boards.greenhouse.io/acme/jobs/4012345'),
+                         '4012345')
+        self.assertEqual(extract_job_id_from_text('See https://acme.com/careers?gh_jid=777123&src=mail'),
+                         '777123')
+        self.assertEqual(
+            extract_job_id_from_text('https://jobs.lever.co/beta/1a2b3c4d-5e6f-7a8b-9c0d-1e2f3a4b5c6d'),
+            '1a2b3c4d-5e6f-7a8b-9c0d-1e2f3a4b5c6d')
+
+    def test_labeled_id_wins_over_link(self):
+        text = 'Job ID: 555 https://boards.greenhouse.io/acme/jobs/4012345'
+        self.assertEqual(extract_job_id_from_text(text), '555')
+
+    def test_subject_before_body(self):
+        email = {'subject': 'Application received (R12345)',
+                 'body': 'Details: https://boards.greenhouse.io/acme/jobs/4012345'}
+        self.assertEqual(extract_job_id(email), 'R12345')
+        self.assertEqual(extract_job_id({'subject': 'Thanks for applying', 'body': email['body']}), '4012345')
+        self.assertIsNone(extract_job_id({'subject': None, 'body': None}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import logging
+import unittest
+from unittest import mock
+
+from config import Config
+from job_tracker import JobApplicationTracker
+from processed_ledger import ProcessedLedger
+from tests.test_ai_analyzer import EMAIL, answer, make_analyzer
+
+
+def make_tracker(emails, tiers=('gpt-4',), pages=None):
+    """Tracker over mocked Gmail and Sheets clients, an in-memory ledger and a real analyzer"""
+    tracker = JobApplicationTracker.__new__(JobApplicationTracker)
+    tracker.gmail_client = mock.MagicMock(fetch_stats={})
+    pages = pages or [[email['id'] for email in emails]]
+    tracker.gmail_client.iter_message_id_pages.side_effect = lambda query: iter(pages)
+    tracker.gmail_client.list_new_message_ids.return_value = ([email['id'] for email in emails], 'h2')
+    tracker.gmail_client.fetch_candidate_emails.side_effect = (
+        lambda ids: [dict(email) for email in emails if email['id'] in ids])
+    tracker.gmail_client.sort_emails_by_date_asc.side_effect = lambda found: found
+    tracker.gmail_client.is_job_related_email.return_value = True
+    tracker.sheets_client = mock.MagicMock(write_buffer=None)
+    tracker.sheets_client.end_write_batch.return_value = True
+    tracker.applications = mock.MagicMock(active=False, stats={})
+    tracker.transition_stats = tracker._empty_transition_stats()
+    tracker.ai_analyzer = make_analyzer(list(tiers))
+    tracker.ledger = ProcessedLedger(':memory:')
+    tracker.classifier = None
+    tracker.thread_state = None
+    tracker._pending_ledger_marks = []
+    tracker.logger = logging.getLogger('test_job_tracker')
+    return tracker
+
+
+@mock.patch.object(Config, 'SHEETS_WRITE_BEHIND', False)
+@mock.patch.object(Config, 'SHEETS_COALESCE_UPDATES', False)
+class LedgerRetryTest(unittest.TestCase):
+
+    def run_with(self, tracker, tier_answers):
+        with mock.patch.object(tracker.ai_analyzer, '_run_tier', side_effect=tier_answers) as run_tier:
+            results = tracker.process_recent_emails()
+        return results, run_tier.call_count
+
+    def test_fallback_analysis_is_retried_next_run(self):
+        tracker = make_tracker([EMAIL])
+
+        results, calls = self.run_with(tracker, [[None]])
+        self.assertEqual(calls, 1)
+        self.assertEqual(results['degraded_analyses'], 1)
+        self.assertFalse(tracker._is_already_processed(EMAIL['id']))
+
+        results, calls = self.run_with(tracker, [[answer(0.95)]])
+        self.assertEqual(calls, 1)
+        self.assertEqual(results['degraded_analyses'], 0)
+        self.assertTrue(tracker._is_already_processed(EMAIL['id']))
+
+        results, calls = self.run_with(tracker, [])
+        self.assertEqual(calls, 0)
+        self.assertEqual(results['already_processed'], 1)
+
+    def test_unconfirmed_answer_is_retried_next_run(self):
+        tracker = make_tracker([EMAIL], tiers=('gpt-4o-mini', 'gpt-4'))
+
+        results, _ = self.run_with(tracker, [[answer(0.5)], [None]])
+        self.assertEqual(results['degraded_analyses'], 1)
+        self.assertFalse(tracker._is_already_processed(EMAIL['id']))
+
+        results, _ = self.run_with(tracker, [[answer(0.5)], [answer(0.95)]])
+        self.assertTrue(tracker._is_already_processed(EMAIL['id']))
+
+    def test_thread_update_records_every_covered_message(self):
+        tracker = make_tracker([])
+        tracker.thread_state = mock.MagicMock()
+        update = {'id': 'm3', 'message_ids': ['m1', 'm2', 'm3'], 'is_thread_update': True,
+                  'thread_id': 't1', 'internal_date': 3}
+
+        tracker._mark_processed(update, 'not_job_related')
+
+        self.assertTrue(all(tracker._is_already_processed(m) for m in ('m1', 'm2', 'm3')))
+        tracker.thread_state.save.assert_called_once_with('t1', 'm3', 3, {})
+
+    def test_failed_email_is_not_recorded(self):
+        tracker = make_tracker([])
+        tracker._mark_processed(dict(EMAIL), 'error')
+        self.assertFalse(tracker._is_already_processed(EMAIL['id']))
+
+
+@mock.patch.object(Config, 'SHEETS_WRITE_BEHIND', False)
+@mock.patch.object(Config, 'SHEETS_COALESCE_UPDATES', False)
+@mock.patch.object(Config, 'GMAIL_BATCH_SIZE', 1)
+class PipelineOrderTest(unittest.TestCase):
+
+    def test_pages_listed_newest_first_are_applied_oldest_first(self):
+        emails = [dict(EMAIL, id=f'm{n}', internal_date=n) for n in range(1, 6)]
+        # Gmail lists newest first, one page at a time
+        tracker = make_tracker(emails, pages=[['m5', 'm4'], ['m3', 'm2'], ['m1']])
+        applied = []
+        with mock.patch.object(tracker.ai_analyzer, '_run_tier', return_value=[answer(0.95)]), \
+                mock.patch.object(tracker, '_apply_analysis',
+                                  side_effect=lambda email, analysis, results: applied.append(email['id'])):
+            results = tracker.process_recent_emails()
+
+        self.assertEqual(applied, ['m1', 'm2', 'm3', 'm4', 'm5'])
+        self.assertEqual(results['total_emails'], 5)
+
+    def test_listing_failure_fails_the_run_but_keeps_listed_emails(self):
+        emails = [dict(EMAIL, id='m1', internal_date=1)]
+        tracker = make_tracker(emails)
+
+        def pages(query):
+            yield ['m1']
+            raise RuntimeError('listing failed')
+
+        tracker.gmail_client.iter_message_id_pages.side_effect = pages
+        with mock.patch.object(tracker.ai_analyzer, '_run_tier', return_value=[answer(0.95)]):
+            results = tracker.process_recent_emails()
+
+        self.assertEqual(results['errors'], 1)
+        self.assertTrue(tracker._is_already_processed('m1'))
+
+
+@mock.patch.object(Config, 'SHEETS_WRITE_BEHIND', False)
+@mock.patch.object(Config, 'SHEETS_COALESCE_UPDATES', False)
+class WatermarkTest(unittest.TestCase):
+
+    def run_incremental(self, tracker, **run_tier):
+        with mock.patch.object(tracker.ai_analyzer, '_run_tier', **run_tier):
+            return tracker.process_recent_emails(incremental=True)
+
+    def test_clean_run_saves_watermark(self):
+        tracker = make_tracker([EMAIL])
+        self.run_incremental(tracker, return_value=[answer(0.95)])
+        tracker.gmail_client.save_history_id.assert_called_once_with('h2')
+
+    def test_failed_analysis_batch_keeps_watermark(self):
+        tracker = make_tracker([EMAIL])
+        results = self.run_incremental(tracker, side_effect=RuntimeError('boom'))
+        self.assertEqual(results['errors'], 1)
+        tracker.gmail_client.save_history_id.assert_not_called()
+
+    def test_degraded_analysis_keeps_watermark(self):
+        tracker = make_tracker([EMAIL])
+        self.run_incremental(tracker, return_value=[None])
+        tracker.gmail_client.save_history_id.assert_not_called()
+
+    def test_failed_flush_keeps_watermark_and_ledger(self):
+        tracker = make_tracker([EMAIL])
+        job_analysis = answer(0.95, True, 'application_confirmation')
+        tracker.sheets_client.write_buffer = object()
+        tracker.sheets_client.end_write_batch.return_value = False
+        with mock.patch.object(tracker, 'process_analyzed_email',
+                               return_value={'action': 'new_application'}):
+            results = self.run_incremental(tracker, return_value=[job_analysis])
+
+        self.assertEqual(results['errors'], 1)
+        tracker.gmail_client.save_history_id.assert_not_called()
+        self.assertFalse(tracker._is_already_processed(EMAIL['id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+import unittest
+
+from pipeline import Pipeline, Stage
+
+
+LOGGER = logging.getLogger('test_pipeline')
+
+
+class PipelineTest(unittest.TestCase):
+
+    def test_ordered_stage_sees_items_in_source_order(self):
+        seen = []
+
+        def slow_for_early_items(n):
+            # Early items finish last on the parallel stage
+            time.sleep(0.002 * (10 - n))
+            return n
+
+        pipeline = Pipeline([
+            Stage('work', slow_for_early_items, workers=4),
+            Stage('collect', seen.append, ordered=True)
+        ], logger=LOGGER)
+        stats = pipeline.run(range(10))
+
+        self.assertEqual(seen, list(range(10)))
+        self.assertEqual(stats['work']['items'], 10)
+
+    def test_stage_error_is_counted_and_passed_on_as_none(self):
+        seen = []
+
+        def fail_on_three(n):
+            if n == 3:
+                raise ValueError('bad item')
+            return n
+
+        pipeline = Pipeline([
+            Stage('work', fail_on_three, workers=2),
+            Stage('collect', seen.append, ordered=True)
+        ], logger=LOGGER)
+        stats = pipeline.run(range(5))
+
+        self.assertEqual(stats['work']['errors'], 1)
+        # Downstream stages skip a failed item instead of calling their function
+        self.assertEqual(seen, [0, 1, 2, 4])
+        self.assertEqual(stats['collect']['items'], 5)
+
+    def test_source_error_keeps_queued_items(self):
+        seen = []
+
+        def source():
+            yield 1
+            yield 2
+            raise RuntimeError('listing failed')
+
+        pipeline = Pipeline([Stage('collect', seen.append, ordered=True)], logger=LOGGER)
+        pipeline.run(source())
+
+        self.assertEqual(seen, [1, 2])
+        self.assertIsInstance(pipeline.source_error, RuntimeError)
+
+    def test_drain_runs_once_after_the_last_item(self):
+        seen = []
+        drained = []
+        lock = threading.Lock()
+
+        def collect(n):
+            with lock:
+                seen.append(n)
+
+        pipeline = Pipeline([
+            Stage('collect', collect, workers=3, drain=lambda: drained.append(len(seen)))
+        ], logger=LOGGER)
+        pipeline.run(range(7))
+
+        self.assertEqual(drained, [7])
+
+    def test_drain_error_is_counted(self):
+        def fail():
+            raise RuntimeError('drain failed')
+
+        pipeline = Pipeline([Stage('collect', lambda n: n, ordered=True, drain=fail)], logger=LOGGER)
+        stats = pipeline.run(range(3))
+
+        self.assertEqual(stats['collect']['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
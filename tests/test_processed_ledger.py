@@ -0,0 +1,37 @@
+import unittest
+
+from processed_ledger import ProcessedLedger
+
+
+class ProcessedLedgerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = ProcessedLedger(':memory:')
+
+    def tearDown(self):
+        self.ledger.close()
+
+    def test_entries_are_keyed_by_analysis_version(self):
+        self.ledger.mark_processed({'id': 'm1', 'thread_id': 't1'}, '3', 'not_job_related')
+
+        self.assertTrue(self.ledger.is_processed('m1', '3'))
+        # Bumping the prompt version makes the message eligible again
+        self.assertFalse(self.ledger.is_processed('m1', '4'))
+        self.assertFalse(self.ledger.is_processed('m2', '3'))
+
+    def test_messages_without_id_are_never_recorded(self):
+        self.ledger.mark_processed({'id': ''}, '3', 'not_job_related')
+        self.assertFalse(self.ledger.is_processed('', '3'))
+        self.assertEqual(self.ledger.labeled_messages(), [])
+
+    def test_labeled_messages_keep_the_latest_action(self):
+        self.ledger.mark_processed({'id': 'm1'}, '3', 'not_job_related')
+        self.ledger.mark_processed({'id': 'm1'}, '4', 'updated_application')
+        self.ledger.mark_processed({'id': 'm2'}, '4', 'new_application')
+
+        self.assertEqual(dict(self.ledger.labeled_messages()),
+                         {'m1': 'updated_application', 'm2': 'new_application'})
+
+
+if __name__ == '__main__':
+    unittest.main()
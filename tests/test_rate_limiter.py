@@ -0,0 +1,30 @@
+import unittest
+
+from rate_limiter import RateLimiter
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_oversized_request_debits_the_whole_budget_only(self):
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=1000)
+        self.assertEqual(limiter.acquire(5000), 1000)
+
+        # Crediting back what acquire debited leaves the bucket at budget minus real usage
+        limiter.record_usage(1000, 300)
+        self.assertAlmostEqual(limiter._token_allowance, 700, delta=1)
+
+    def test_usage_above_the_estimate_is_charged(self):
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=1000)
+        debited = limiter.acquire(100)
+        limiter.record_usage(debited, 400)
+        self.assertAlmostEqual(limiter._token_allowance, 600, delta=1)
+
+    def test_disabled_limits_never_block(self):
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+        for _ in range(100):
+            self.assertEqual(limiter.acquire(10 ** 6), 10 ** 6)
+        self.assertEqual(limiter.total_wait_seconds, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+
+from reconciler import ApplicationReconciler
+from sheets_client import HEADERS
+
+
+def existing_app(row_number, company, position, status):
+    app = {header: '' for header in HEADERS}
+    app.update({'Company': company, 'Position': position, 'Status': status, 'row_number': row_number})
+    return app
+
+
+def make_reconciler(apps=()):
+    """Reconciler over a mocked SheetsClient holding `apps`"""
+    sheets = mock.MagicMock()
+    by_row = {app['row_number']: app for app in apps}
+    sheets.find_application_by_row.side_effect = lambda row_number: by_row.get(row_number)
+    sheets.find_application_by_company_position.side_effect = lambda company, position: next(
+        (app for app in apps if (app['Company'], app['Position']) == (company, position)), None)
+    sheets.find_application_by_job_id.return_value = None
+    sheets.find_application_by_thread_id.return_value = None
+    sheets.add_new_application.return_value = True
+    sheets.update_application.return_value = True
+    reconciler = ApplicationReconciler(sheets)
+    reconciler.begin()
+    return reconciler, sheets
+
+
+class ReconcilerTest(unittest.TestCase):
+
+    def test_updates_to_one_row_become_one_write(self):
+        reconciler, sheets = make_reconciler([existing_app(2, 'Acme', 'Engineer', 'Applied')])
+
+        reconciler.update_application(2, {'status': 'Phone Screen', 'notes': 'first'})
+        reconciler.update_application(2, {'status': 'Technical Interview'})
+        self.assertTrue(reconciler.commit())
+
+        sheets.update_application.assert_called_once_with(
+            2, {'status': 'Technical Interview', 'notes': 'first'})
+        self.assertEqual(reconciler.stats, {'emails': 2, 'applications': 1})
+
+    def test_lookups_see_staged_changes(self):
+        reconciler, sheets = make_reconciler([existing_app(2, 'Acme', 'Engineer', 'Applied')])
+
+        reconciler.update_application(2, {'status': 'Phone Screen'})
+        staged = reconciler.find_application_by_company_position('Acme', 'Engineer')
+
+        self.assertEqual(staged['Status'], 'Phone Screen')
+        sheets.update_application.assert_not_called()
+
+    def test_new_application_and_its_follow_up_become_one_add(self):
+        reconciler, sheets = make_reconciler()
+
+        reconciler.add_new_application({'company': 'Beta', 'position': 'PM', 'status': 'Applied'})
+        staged = reconciler.find_application_by_company_position('Beta', 'PM')
+        self.assertLess(staged['row_number'], 0)
+        reconciler.update_application(staged['row_number'], {'status': 'Under Review'})
+        reconciler.commit()
+
+        sheets.add_new_application.assert_called_once_with(
+            {'company': 'Beta', 'position': 'PM', 'status': 'Under Review'})
+        sheets.update_application.assert_not_called()
+
+    def test_writes_follow_first_touch_order(self):
+        reconciler, sheets = make_reconciler([existing_app(2, 'Acme', 'Engineer', 'Applied'),
+                                              existing_app(3, 'Gamma', 'QA', 'Applied')])
+
+        reconciler.update_application(3, {'status': 'Offer'})
+        reconciler.add_new_application({'company': 'Beta', 'position': 'PM'})
+        reconciler.update_application(2, {'status': 'Rejected'})
+        reconciler.update_application(3, {'notes': 'call'})
+        reconciler.commit()
+
+        written = [call[0] for call in sheets.method_calls
+                   if call[0] in ('add_new_application', 'update_application')]
+        self.assertEqual(written, ['update_application', 'add_new_application', 'update_application'])
+        self.assertEqual(sheets.update_application.call_args_list[0].args[0], 3)
+
+    def test_failed_write_fails_the_commit_and_stops_staging(self):
+        reconciler, sheets = make_reconciler([existing_app(2, 'Acme', 'Engineer', 'Applied')])
+        sheets.update_application.return_value = False
+
+        reconciler.update_application(2, {'status': 'Offer'})
+        self.assertFalse(reconciler.commit())
+        self.assertFalse(reconciler.active)
+
+    def test_inactive_reconciler_passes_through(self):
+        reconciler, sheets = make_reconciler()
+        reconciler.commit()
+
+        reconciler.update_application(5, {'status': 'Offer'})
+        sheets.update_application.assert_called_once_with(5, {'status': 'Offer'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from unittest import mock
+
+from googleapiclient.errors import HttpError
+
+from sheets_client import HEADERS, ApplicationIndex, SheetsClient, application_id
+
+
+def make_client(rows=None):
+    """SheetsClient without OAuth whose snapshot holds `rows` (lists of A:M values) from row 2"""
+    with mock.patch.object(SheetsClient, 'authenticate'), \
+            mock.patch.object(SheetsClient, 'setup_headers'), \
+            mock.patch.object(SheetsClient, 'setup_events_sheet'):
+        client = SheetsClient()
+    client.service = mock.MagicMock()
+    applications = []
+    for row_number, values in enumerate(rows or [], start=2):
+        app = dict(zip(HEADERS, values))
+        app['row_number'] = row_number
+        applications.append(app)
+    client.index = ApplicationIndex(list(HEADERS), applications)
+    return client
+
+
+def row(company, position, status='Applied', notes=''):
+    values = [''] * len(HEADERS)
+    values[0], values[1], values[3], values[11] = company, position, status, notes
+    return values
+
+
+def http_error(status=500):
+    return HttpError(mock.Mock(status=status, reason='error'), b'error')
+
+
+class WriteBufferTest(unittest.TestCase):
+
+    def test_failed_early_flush_fails_the_batch(self):
+        client = make_client([row('Acme', 'Engineer')])
+        client.begin_write_batch()
+        values = client.service.spreadsheets().values()
+        values.append().execute.side_effect = http_error()
+
+        client.add_new_application({'company': 'Beta', 'position': 'PM'})
+        self.assertFalse(client.flush_writes())
+
+        values.append().execute.side_effect = None
+        values.append().execute.return_value = {'updates': {'updatedRange': "'Job Applications'!A3:M3"}}
+        client.add_new_application({'company': 'Gamma', 'position': 'QA'})
+        self.assertFalse(client.end_write_batch())
+
+    def test_provisional_rows_never_match_existing_rows_after_a_failed_flush(self):
+        client = make_client([row('Acme', 'Engineer')])
+        client.begin_write_batch()
+        values = client.service.spreadsheets().values()
+        values.append().execute.side_effect = http_error()
+
+        client.add_new_application({'company': 'Beta', 'position': 'PM'})
+        client.flush_writes()
+        self.assertIsNone(client.index)
+
+        values.get().execute.return_value = {'values': [row('Acme', 'Engineer')]}
+        client.add_new_application({'company': 'Gamma', 'position': 'QA'})
+        client.update_application(2, {'status': 'Offer'})
+
+        buffer = client.write_buffer
+        self.assertTrue(all(row_number < 0 for row_number in buffer.appends))
+        self.assertEqual(buffer.updates[2][3], 'Offer')
+        (pending_row,) = buffer.appends.values()
+        self.assertEqual(pending_row[:2], ['Gamma', 'QA'])
+        self.assertEqual(pending_row[3], 'Applied')
+
+    def test_appended_rows_are_renumbered_in_append_order(self):
+        client = make_client([row('Acme', 'Engineer')])
+        client.begin_write_batch()
+        client.add_new_application({'company': 'Beta', 'position': 'PM'})
+        client.add_new_application({'company': 'Gamma', 'position': 'QA'})
+
+        values = client.service.spreadsheets().values()
+        values.append().execute.return_value = {'updates': {'updatedRange': "'Job Applications'!A3:M4"}}
+        self.assertTrue(client.end_write_batch())
+
+        sent = values.append.call_args.kwargs['body']['values']
+        self.assertEqual([r[0] for r in sent], ['Beta', 'Gamma'])
+        self.assertEqual(client.find_application_by_company_position('Beta', 'PM')['row_number'], 3)
+        self.assertEqual(client.find_application_by_company_position('Gamma', 'QA')['row_number'], 4)
+
+
+class EventHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = make_client()
+        self.acme = application_id('Acme', 'Engineer')
+        other = application_id('Beta', 'PM')
+        self.values = self.client.service.spreadsheets().values()
+        # Event rows 2-6; Acme's are 2, 3 and 5
+        self.values.get().execute.return_value = {'values': [
+            [self.acme, 'm1'], [self.acme, 'm2'], [other, 'm3'], [self.acme, 'm4'], [other, 'm5']
+        ]}
+        self.values.batchGet().execute.return_value = {'valueRanges': [
+            {'values': [['2026-01-01', 'Application Confirmation', 'Applied', 'Thanks for applying'],
+                        ['2026-01-05', 'Status Update', 'Under Review']]},
+            {'values': [['2026-01-09', 'Interview Invitation', 'Phone Screen', 'Call on Monday']]}
+        ]}
+        self.values.get.reset_mock()
+        self.values.batchGet.reset_mock()
+
+    def test_keys_read_covers_only_the_key_columns(self):
+        self.client.event_history('Acme', 'Engineer')
+        self.assertTrue(self.values.get.call_args.kwargs['range'].endswith('!A2:B'))
+
+    def test_history_reads_only_the_application_rows_once(self):
+        history = self.client.event_history('Acme', 'Engineer')
+        self.client.event_history('Acme', 'Engineer')
+
+        self.values.batchGet.assert_called_once()
+        ranges = self.values.batchGet.call_args.kwargs['ranges']
+        self.assertEqual([r.split('!')[1] for r in ranges], ['E2:H3', 'E5:H5'])
+        self.assertEqual([event['details'] for event in history],
+                         ['Thanks for applying', '', 'Call on Monday'])
+
+    def test_application_without_events_needs_no_read(self):
+        self.assertEqual(self.client.event_history('Gamma', 'QA'), [])
+        self.values.batchGet.assert_not_called()
+
+    def test_recorded_events_join_the_history(self):
+        self.values.append().execute.return_value = {}
+        self.client.add_event({'company': 'Acme', 'position': 'Engineer', 'message_id': 'm9',
+                               'email_date': '2026-01-12', 'email_type': 'Offer', 'details': 'Offer call'})
+        self.client.add_event({'company': 'Acme', 'position': 'Engineer', 'message_id': 'm1'})
+
+        history = self.client.event_history('Acme', 'Engineer')
+        self.assertEqual(history[-1]['details'], 'Offer call')
+        self.assertEqual(len(history), 4)
+        self.assertEqual(self.client.write_stats['duplicate_events'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
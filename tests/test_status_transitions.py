@@ -0,0 +1,39 @@
+import unittest
+
+from status_transitions import ADVANCE, NO_STATUS, REDUNDANT, REGRESSION, classify_transition
+
+
+class ClassifyTransitionTest(unittest.TestCase):
+
+    def test_forward_moves_advance(self):
+        self.assertEqual(classify_transition('Applied', 'Phone Screen'), ADVANCE)
+        self.assertEqual(classify_transition('Phone Screen', 'Offer'), ADVANCE)
+
+    def test_backward_moves_are_regressions(self):
+        self.assertEqual(classify_transition('Offer', 'Applied'), REGRESSION)
+        self.assertEqual(classify_transition('Final Interview', 'Under Review'), REGRESSION)
+
+    def test_terminal_status_closes_any_open_application(self):
+        self.assertEqual(classify_transition('Applied', 'Rejected'), ADVANCE)
+        self.assertEqual(classify_transition('Offer', 'Withdrawn'), ADVANCE)
+
+    def test_nothing_reopens_a_terminal_status(self):
+        self.assertEqual(classify_transition('Rejected', 'Phone Screen'), REGRESSION)
+        self.assertEqual(classify_transition('Rejected', 'Withdrawn'), REGRESSION)
+
+    def test_same_status_is_redundant(self):
+        self.assertEqual(classify_transition('Under Review', 'Under Review'), REDUNDANT)
+        self.assertEqual(classify_transition(' Applied ', 'Applied'), REDUNDANT)
+
+    def test_empty_or_hand_typed_current_status_can_be_replaced(self):
+        self.assertEqual(classify_transition('', 'Applied'), ADVANCE)
+        self.assertEqual(classify_transition(None, 'Offer'), ADVANCE)
+        self.assertEqual(classify_transition('Waiting to hear back', 'Applied'), ADVANCE)
+
+    def test_missing_or_unknown_new_status(self):
+        self.assertEqual(classify_transition('Applied', None), NO_STATUS)
+        self.assertEqual(classify_transition('Applied', 'Ghosted'), NO_STATUS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to a character-based estimate
+    tiktoken = None
+
+
+# Lines that start quoted history from earlier in the thread; everything after is dropped
+QUOTE_MARKERS = [
+    re.compile(r'^\s*On .{0,200}wrote:\s*$', re.IGNORECASE),
+    re.compile(r'^\s*-{2,}\s*Original Message\s*-{2,}', re.IGNORECASE),
+    re.compile(r'^\s*-{2,}\s*Forwarded message\s*-{2,}', re.IGNORECASE),
+    re.compile(r'^\s*From:\s.*(@|<).*$', re.IGNORECASE),
+    re.compile(r'^\s*_{10,}\s*$'),
+]
+
+# Lines that start a signature or legal footer; everything after is dropped
+FOOTER_MARKERS = [
+    re.compile(r'^--\s*$'),
+    re.compile(r'^\s*Sent from my (iPhone|iPad|Android|mobile)', re.IGNORECASE),
+    re.compile(r'^\s*(confidentiality notice|this (e-?mail|message) (and any attachments )?(is|may be) confidential)',
+               re.IGNORECASE),
+]
+
+# Individual boilerplate lines dropped wherever they appear
+BOILERPLATE_LINE = re.compile(
+    r'unsubscribe|manage (your )?(email )?preferences|privacy policy|terms of (use|service)|'
+    r'all rights reserved|©|\(c\) \d{4}|this email was sent to|view (this email )?in (your )?browser|'
+    r'do not reply to this (email|message)|you are receiving this',
+    re.IGNORECASE
+)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    """Load the tokenizer once; None if tiktoken is missing or can't load its data"""
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed or tiktoken is None:
+        return _encoding
+
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                _encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception as error:
+                print(f'Could not load tokenizer, estimating token counts instead: {error}')
+                _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count for the GPT-4 family tokenizer (estimated at ~4 characters per token without tiktoken)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most `max_tokens` tokens"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def html_to_text(html: str) -> str:
+    """Convert an HTML body to plain text, dropping markup, scripts, images and quoted blocks"""
+    try:
+        soup = BeautifulSoup(html, 'lxml')
+    except Exception:
+        soup = BeautifulSoup(html, 'html.parser')
+
+    for tag in soup(['script', 'style', 'head', 'title', 'meta', 'img', 'noscript', 'blockquote']):
+        tag.decompose()
+
+    # Gmail and Outlook wrap quoted history in these containers
+    for tag in soup.select('.gmail_quote, .gmail_extra, #divRplyFwdMsg, #appendonsend'):
+        tag.decompose()
+
+    for tag in soup.find_all(style=re.compile(r'display\s*:\s*none', re.IGNORECASE)):
+        tag.decompose()
+
+    for br in soup.find_all('br'):
+        br.replace_with('\n')
+
+    return soup.get_text('\n')
+
+
+def looks_like_html(text: str) -> bool:
+    """Cheap check for HTML bodies"""
+    return bool(re.search(r'<(html|body|div|p|table|br|span)\b', text[:5000], re.IGNORECASE))
+
+
+@lru_cache(maxsize=256)
+def compact_email_body(body: Optional[str], max_tokens: int) -> str:
+    """Reduce an email body to the text worth sending to the model.
+
+    Converts HTML to text, drops quoted replies, signatures and boilerplate
+    footer lines, collapses whitespace and truncates to `max_tokens` tokens.
+    """
+    if not body:
+        return ''
+
+    text = html_to_text(body) if looks_like_html(body) else body
+
+    kept = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if any(marker.match(line) for marker in QUOTE_MARKERS + FOOTER_MARKERS):
+            break
+        if stripped.startswith('>'):
+            continue
+        if BOILERPLATE_LINE.search(stripped) and len(stripped) < 300:
+            continue
+        kept.append(re.sub(r'[ \t\u00a0\u200b\u200c]+', ' ', stripped))
+
+    # Collapse runs of blank lines left by removed markup
+    compacted = re.sub(r'\n{3,}', '\n\n', '\n'.join(kept)).strip()
+
+    # A quote marker on the very first line would leave nothing; keep the original then
+    if not compacted:
+        compacted = re.sub(r'\s+', ' ', text).strip()
+
+    return truncate_to_tokens(compacted, max_tokens)
@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from text_compaction import compact_email_body, count_tokens
+
+
+class ThreadStateStore:
+    """SQLite record of what the tracker already knows about each Gmail thread.
+
+    For every analyzed thread it keeps the last message included in an analysis
+    and a short summary of the state that analysis produced, so the next run
+    only sends messages added since then, plus that summary.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.THREAD_STATE_FILE
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the thread state table if it doesn't exist"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS thread_state (
+                    thread_id TEXT PRIMARY KEY,
+                    last_message_id TEXT NOT NULL,
+                    last_internal_date INTEGER NOT NULL,
+                    summary TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, thread_id: str) -> Optional[Dict]:
+        """Stored state for a thread, or None if it was never analyzed"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_message_id, last_internal_date, summary FROM thread_state WHERE thread_id = ?",
+                (thread_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'last_message_id': row[0], 'last_internal_date': row[1], 'summary': json.loads(row[2])}
+
+    def save(self, thread_id: str, last_message_id: str, last_internal_date: int, summary: Dict):
+        """Record the newest analyzed message of a thread and the state it led to"""
+        if not thread_id:
+            return
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO thread_state
+                    (thread_id, last_message_id, last_internal_date, summary, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (thread_id, last_message_id, int(last_internal_date), json.dumps(summary),
+                 datetime.now().isoformat())
+            )
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.conn.close()
+
+
+def summarize_analysis(analysis: Dict, email_date: str = '', previous: Optional[Dict] = None) -> Dict:
+    """The parts of an analysis worth carrying into the next analysis of the same thread.
+
+    Fields the new analysis left empty keep their value from the `previous` summary.
+    """
+    previous = previous or {}
+    summary = {
+        # A reply like "thanks!" doesn't make a recruiting thread unrelated
+        'is_job_related': bool(analysis.get('is_job_related') or previous.get('is_job_related')),
+        'company_name': analysis.get('company_name'),
+        'position_title': analysis.get('position_title'),
+        'job_id': analysis.get('job_id'),
+        'job_status': analysis.get('job_status'),
+        'last_email_type': analysis.get('email_type'),
+        'last_email_date': email_date,
+        'interview_date': analysis.get('interview_date'),
+    }
+    merged = dict(previous)
+    merged.update({key: value for key, value in summary.items() if value not in (None, '')})
+    return merged
+
+
+def format_summary(summary: Dict) -> str:
+    """One-line description of a thread's earlier state for the prompt"""
+    if not summary.get('is_job_related'):
+        return 'Earlier messages in this thread were not job-related.'
+
+    details = [
+        f"{label}: {summary[key]}"
+        for key, label in (('company_name', 'Company'), ('position_title', 'Position'), ('job_id', 'Job ID'),
+                           ('job_status', 'Status'), ('interview_date', 'Interview'))
+        if summary.get(key)
+    ]
+    if summary.get('last_email_type'):
+        details.append(f"Last update: {summary['last_email_type'].replace('_', ' ')} "
+                       f"({summary.get('last_email_date', 'unknown date')})")
+    return 'Already recorded from earlier messages in this thread: ' + '; '.join(details)
+
+
+def thread_delta(messages: List[Dict], state: Optional[Dict],
+                 is_processed: Callable[[str], bool]) -> List[Dict]:
+    """Messages of a thread (oldest first) that no earlier analysis has covered"""
+    if state:
+        return [m for m in messages if m.get('internal_date', 0) > state['last_internal_date']]
+    # Never analyzed as a thread: everything the per-message ledger hasn't seen
+    return [m for m in messages if not is_processed(m['id'])]
+
+
+def build_thread_email(messages: List[Dict], delta: List[Dict], state: Optional[Dict],
+                       token_budget: Optional[int] = None) -> Dict:
+    """One email dict standing for a thread's new messages, ready for analysis.
+
+    The body holds the prior-state summary followed by the compacted new
+    messages in order; when they don't all fit in `token_budget` tokens the
+    oldest are left out. Header fields come from the newest message, and
+    'message_ids' lists every message the analysis covers.
+    """
+    token_budget = token_budget or Config.THREAD_ANALYSIS_TOKEN_BUDGET
+    latest = delta[-1]
+
+    header = format_summary(state['summary']) if state else ''
+    remaining = token_budget - count_tokens(header)
+
+    sections = []
+    for message in reversed(delta):
+        section = (f"--- {message.get('date', '')} | {message.get('sender', '')} ---\n"
+                   f"{compact_email_body(message.get('body', ''), Config.ANALYSIS_BODY_TOKEN_BUDGET)}")
+        tokens = count_tokens(section)
+        if sections and tokens > remaining:
+            break
+        sections.append(section)
+        remaining -= tokens
+
+    omitted = len(delta) - len(sections)
+    if omitted:
+        sections.append(f'({omitted} earlier new messages omitted)')
+    body = '\n\n'.join(([header] if header else []) + list(reversed(sections)))
+
+    return {
+        'id': latest['id'],
+        'subject': latest.get('subject') or messages[0].get('subject', ''),
+        'sender': latest.get('sender', ''),
+        'date': latest.get('date', ''),
+        'body': body,
+        'snippet': latest.get('snippet', ''),
+        'thread_id': latest.get('thread_id', ''),
+        'labels': latest.get('labels', []),
+        'internal_date': latest.get('internal_date', 0),
+        'message_ids': [m['id'] for m in delta],
+        'prior_summary': state['summary'] if state else {},
+        'is_thread_update': True
+    }